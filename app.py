@@ -1111,6 +1111,9 @@ def process_part_three(job_id: str, selected_instrumental: Optional[str] = None)
                 keep_brand_code=False,  # Don't keep existing brand code, generate new one
                 user_youtube_credentials=youtube_credentials,  # Pass user's YouTube credentials
                 server_side_mode=True,  # CRITICAL: enable server-side mode for Modal deployment
+                encoder_probe_cache_dir="/cache/encoders",  # Skip AAC/NVENC probing once this container image has been probed
+                youtube_channel_index_dir="/cache/youtube-channels",  # Check for duplicate uploads without a 100 unit YouTube search
+                upload_deliverables=config.get("upload_deliverables"),  # e.g. ["final_videos", "packages"], or None to upload everything
             )
                 
             # Log which features are enabled
@@ -2988,20 +2991,25 @@ async def get_youtube_metadata(request: YouTubeMetadataRequest, user: dict = Dep
         
         # Extract metadata using the same function as full processing
         from karaoke_gen.metadata import extract_info_for_online_media, parse_track_metadata
+        from karaoke_gen.metadata_cache import MetadataCache
         import logging
+        import tempfile
         
         # Create a logger for this operation
         logger = logging.getLogger("metadata_extraction")
         logger.setLevel(logging.DEBUG)
         
         try:
-            # Extract info from YouTube
+            # Extract info from YouTube, reusing recent lookups made by this container.
+            # The cache lives on local disk rather than the /cache volume, as SQLite locking isn't reliable on network volumes.
+            metadata_cache = MetadataCache(os.path.join(tempfile.gettempdir(), "karaoke-gen-metadata-cache"), logger)
             extracted_info = extract_info_for_online_media(
                 input_url=youtube_url, 
                 input_artist=None, 
                 input_title=None, 
                 logger=logger, 
-                cookies_str=stored_cookies
+                cookies_str=stored_cookies,
+                metadata_cache=metadata_cache,
             )
             
             if not extracted_info:
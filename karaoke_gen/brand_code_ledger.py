@@ -0,0 +1,98 @@
+import os
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class SQLiteBrandCodeLedger:
+    """Allocates brand code sequence numbers from a SQLite ledger of the last number used for each brand prefix.
+
+    Allocation is a single locked read-and-increment, so it takes the same time however many folders exist and two
+    finalisations running at once never get the same number. The ledger is built from a scan of the existing folders
+    the first time a prefix is used (or when rebuild=True), after which no scan is needed.
+
+    Any object with the same allocate(brand_prefix, scan_existing_numbers, rebuild=False) method can be used as a
+    KaraokeFinalise brand code ledger, e.g. one backed by a database shared between remote workers.
+    """
+
+    def __init__(self, db_path, logger):
+        self.db_path = db_path
+        self.logger = logger
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS brand_codes (brand_prefix TEXT PRIMARY KEY, last_number INTEGER NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # Autocommit mode, so transactions are only the explicit BEGIN IMMEDIATE blocks below.
+        # The long timeout lets a waiting allocation outlast another process's one-off rebuild scan.
+        connection = sqlite3.connect(self.db_path, timeout=300, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def allocate(self, brand_prefix, scan_existing_numbers, rebuild=False):
+        """Reserve and return the next sequence number for brand_prefix.
+
+        scan_existing_numbers is called (with the ledger locked) to list the numbers already in use only if this prefix
+        isn't in the ledger yet, or rebuild is set. A reserved number is never handed out again, even if it ends up unused.
+        """
+        with self._connect() as connection:
+            # Take the write lock before reading, so concurrent allocations are serialised
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute("SELECT last_number FROM brand_codes WHERE brand_prefix = ?", (brand_prefix,)).fetchone()
+
+                if row is None or rebuild:
+                    self.logger.info(f"Building brand code ledger for {brand_prefix} from a scan of existing folders")
+                    last_number = max(scan_existing_numbers(), default=0)
+                    # Never go backwards on rebuild, in case numbers were reserved for folders which weren't created
+                    if row is not None:
+                        last_number = max(last_number, row[0])
+                else:
+                    last_number = row[0]
+
+                next_number = last_number + 1
+                connection.execute(
+                    "INSERT OR REPLACE INTO brand_codes (brand_prefix, last_number, updated_at) VALUES (?, ?, ?)",
+                    (brand_prefix, next_number, time.time()),
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+        self.logger.info(f"Reserved sequence number {next_number} for brand {brand_prefix} in ledger {self.db_path}")
+        return next_number
+
+
+class InMemoryBrandCodeLedger:
+    """Allocates brand code sequence numbers within one process, scanning the existing folders once per brand prefix.
+
+    Used by a batch finalise without a SQLite ledger, so tracks finalised at the same time get distinct numbers
+    without each one rescanning the organised folders. Numbers aren't remembered once the process exits.
+    """
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.last_numbers = {}
+        self.lock = threading.Lock()
+
+    def allocate(self, brand_prefix, scan_existing_numbers, rebuild=False):
+        """Reserve and return the next sequence number for brand_prefix, scanning only on first use or when rebuild is set."""
+        with self.lock:
+            if brand_prefix not in self.last_numbers or rebuild:
+                self.logger.info(f"Building in-memory brand code ledger for {brand_prefix} from a scan of existing folders")
+                self.last_numbers[brand_prefix] = max(max(scan_existing_numbers(), default=0), self.last_numbers.get(brand_prefix, 0))
+
+            self.last_numbers[brand_prefix] += 1
+            next_number = self.last_numbers[brand_prefix]
+
+        self.logger.info(f"Reserved sequence number {next_number} for brand {brand_prefix} in memory")
+        return next_number
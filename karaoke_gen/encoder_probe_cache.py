@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import subprocess
+
+# Bump when the cached data format changes, so stale entries are ignored rather than misread
+ENCODER_PROBE_CACHE_VERSION = 1
+
+# NVENC can be unavailable only for a while (driver not loaded yet, GPU busy, container started without the GPU), so
+# a negative probe result is only trusted for this long
+NEGATIVE_NVENC_TTL_SECONDS = 60 * 60
+
+NVIDIA_DRIVER_VERSION_FILE = "/proc/driver/nvidia/version"
+
+
+def get_ffmpeg_version(ffmpeg_path):
+    """Return the first line of `ffmpeg -version`, or None if ffmpeg can't be run."""
+    try:
+        result = subprocess.run([ffmpeg_path, "-version"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0 or not result.stdout:
+        return None
+    return result.stdout.splitlines()[0].strip()
+
+
+def get_gpu_driver_fingerprint():
+    """Describe the NVIDIA driver without running nvidia-smi: where nvidia-smi is installed and the kernel module version."""
+    try:
+        with open(NVIDIA_DRIVER_VERSION_FILE, "r") as f:
+            driver_version = f.readline().strip()
+    except OSError:
+        driver_version = None
+    return {"nvidia_smi": shutil.which("nvidia-smi"), "driver": driver_version}
+
+
+class EncoderProbeCache:
+    """Caches KaraokeFinalise's AAC codec and NVENC probe results as JSON files in a local directory.
+
+    Entries are keyed by the ffmpeg binary path, its version and the GPU driver, so upgrading ffmpeg or the
+    driver (or moving to a machine without a GPU) runs the probes again. Entries can also be given an expiry, used for
+    negative NVENC results. Use refresh=True to ignore cached entries.
+    """
+
+    def __init__(self, cache_dir, logger, refresh=False):
+        self.cache_dir = cache_dir
+        self.logger = logger
+        self.refresh = refresh
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, f"encoder_probe_{key}.json")
+
+    def get_cache_key(self, ffmpeg_path):
+        """Return the cache key for this ffmpeg binary and GPU driver, or None if ffmpeg's version can't be read."""
+        ffmpeg_version = get_ffmpeg_version(ffmpeg_path)
+        if ffmpeg_version is None:
+            return None
+
+        key_data = json.dumps(
+            {
+                "version": ENCODER_PROBE_CACHE_VERSION,
+                "ffmpeg_path": shutil.which(ffmpeg_path) or ffmpeg_path,
+                "ffmpeg_version": ffmpeg_version,
+                "gpu": get_gpu_driver_fingerprint(),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached probe results for key, or None if they aren't cached, have expired, can't be read or refresh is set."""
+        if self.refresh:
+            return None
+
+        cache_path = self._get_path(key)
+        try:
+            with open(cache_path, "r") as f:
+                entry = json.load(f)
+            results, expires_at = entry["results"], entry.get("expires_at")
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+            self.logger.warning(f"Ignoring unreadable encoder probe cache file {cache_path}: {e}")
+            return None
+
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return results
+
+    def put(self, key, results, ttl_seconds=None):
+        """Store probe results for key, expiring after ttl_seconds if given.
+
+        Writes to a temporary file first so readers never see a partial entry.
+        """
+        entry = {"results": results, "expires_at": time.time() + ttl_seconds if ttl_seconds is not None else None}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=self.cache_dir)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(entry, f)
+                os.replace(temp_path, self._get_path(key))
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        except OSError as e:
+            self.logger.warning(f"Failed to cache encoder probe results in {self.cache_dir}: {e}")
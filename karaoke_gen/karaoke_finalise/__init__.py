@@ -1 +1,2 @@
-from .karaoke_finalise import KaraokeFinalise
+from .karaoke_finalise import KaraokeFinalise, UPLOAD_DELIVERABLE_CLASSES
+from .batch_finalise import BatchKaraokeFinalise
@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+from karaoke_gen.brand_code_ledger import InMemoryBrandCodeLedger
+from .karaoke_finalise import KaraokeFinalise
+
+
+class BatchKaraokeFinalise:
+    """Finalises many track directories, setting up the resources they share once rather than for every track.
+
+    The encoder capabilities, YouTube credentials, channel ID and channel index, and brand code allocator are set up once
+    and handed to a KaraokeFinalise per track. Each one works on its track directory by path rather than by changing the
+    current directory, so tracks are finalised by a bounded pool of worker threads.
+
+    Any interactive setup (feature confirmation, YouTube sign-in) happens once up front; the tracks themselves always
+    run non-interactively, as prompts from several tracks at once would be unusable. finalise_kwargs are passed to
+    every KaraokeFinalise.
+    """
+
+    def __init__(self, track_dirs, max_workers=1, non_interactive=False, **finalise_kwargs):
+        self.track_dirs = list(track_dirs)
+        self.max_workers = max(1, max_workers)
+        self.non_interactive = non_interactive
+        self.finalise_kwargs = finalise_kwargs
+
+        # Used for setup and to hold the shared resources; its logger is shared too, so it's only configured once
+        self.session = KaraokeFinalise(non_interactive=non_interactive, **finalise_kwargs)
+        self.logger = self.session.logger
+        self.shared_session_ready = False
+
+    def setup_shared_session(self):
+        """Validate the enabled features and set up the YouTube session and brand code allocator for the whole batch."""
+        self.logger.info(f"Setting up shared session for batch of {len(self.track_dirs)} tracks...")
+        self.session.validate_input_parameters_for_features()
+
+        if self.session.youtube_upload_enabled and not self.session.dry_run:
+            self.logger.info("Authenticating with YouTube once for the whole batch...")
+            self.session.authenticate_youtube()
+            self.session.youtube_channel_id = self.session.get_channel_id()
+            self.logger.info(f"Using YouTube channel ID {self.session.youtube_channel_id} for the whole batch")
+
+        # Tracks finalised at the same time must not scan the organised folders and pick the same brand code
+        if self.session.brand_code_ledger is None:
+            self.session.brand_code_ledger = InMemoryBrandCodeLedger(self.logger)
+
+        self.shared_session_ready = True
+
+    def create_track_finaliser(self, track_dir):
+        finaliser = KaraokeFinalise(
+            **{
+                **self.finalise_kwargs,
+                "logger": self.logger,
+                "non_interactive": True,
+                "track_dir": track_dir,
+                "encoder_capabilities": (self.session.aac_codec, self.session.nvenc_available),
+            }
+        )
+        finaliser.youtube_credentials = self.session.youtube_credentials
+        finaliser.youtube_channel_id = self.session.youtube_channel_id
+        # Share one channel index, so tracks see each other's uploads and don't overwrite each other's index file
+        finaliser.youtube_channel_index = self.session.youtube_channel_index
+        finaliser.brand_code_ledger = self.session.brand_code_ledger
+        return finaliser
+
+    def finalise_track(self, finaliser, replace_existing=False):
+        self.logger.info(f"Finalising track in {finaliser.track_dir}")
+        return finaliser.process(replace_existing=replace_existing)
+
+    def process(self, replace_existing=False):
+        """Finalise every track directory, returning a dict per track with its track_dir and either result or error."""
+        if not self.shared_session_ready:
+            self.setup_shared_session()
+
+        finalisers = [self.create_track_finaliser(track_dir) for track_dir in self.track_dirs]
+        # Only rebuild the brand code ledger once for the batch, not once per track
+        for finaliser in finalisers[1:]:
+            finaliser.rebuild_brand_code_ledger = False
+
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.finalise_track, finaliser, replace_existing) for finaliser in finalisers]
+
+            for track_dir, future in zip(self.track_dirs, futures):
+                try:
+                    results.append({"track_dir": track_dir, "result": future.result(), "error": None})
+                except Exception as e:
+                    self.logger.error(f"Failed to finalise track in {track_dir}: {e}")
+                    results.append({"track_dir": track_dir, "result": None, "error": str(e)})
+
+        failed_count = sum(1 for result in results if result["error"])
+        self.logger.info(f"Batch finalisation complete: {len(results) - failed_count} succeeded, {failed_count} failed")
+        return results
@@ -6,20 +6,64 @@ import logging
 import zipfile
 import shutil
 import re
+import glob
+import fcntl
 import requests
 import pickle
 from lyrics_converter import LyricsConverter
 from thefuzz import fuzz
 from googleapiclient.discovery import build
 from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
+from google.auth.transport.requests import Request, AuthorizedSession
 from googleapiclient.http import MediaFileUpload
 import subprocess
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from google.oauth2.credentials import Credentials
 import base64
 from email.mime.text import MIMEText
 from lyrics_transcriber.output.cdg import CDGGenerator
+from karaoke_gen.encoder_probe_cache import EncoderProbeCache, NEGATIVE_NVENC_TTL_SECONDS
+from karaoke_gen.youtube_channel_index import YouTubeChannelIndex
+from karaoke_gen.brand_code_ledger import SQLiteBrandCodeLedger
+from karaoke_gen.resumable_upload import ResumableUpload, YOUTUBE_UPLOAD_URL
+from karaoke_gen.step_executor import run_steps_concurrently
+
+# Encoders able to produce title/end cards which can be joined to the karaoke video by stream copy, keyed by codec
+STREAM_COPY_CONCAT_VIDEO_ENCODERS = {"h264": "libx264", "hevc": "libx265"}
+STREAM_COPY_CONCAT_AUDIO_ENCODERS = {"pcm_s16le": "pcm_s16le", "aac": "aac", "flac": "flac -strict experimental"}
+
+# Video codecs which can be stream copied into an MP4 container, with any extra flags they need there
+MP4_STREAM_COPY_VIDEO_CODECS = {"h264": "", "hevc": "-tag:v hvc1 "}
+
+# Classes of files which can be chosen for upload to the organised folder, as keys of KaraokeFinalise.suffixes.
+# "stems" is special: the stems directory plus the separated instrumental audio files
+UPLOAD_DELIVERABLE_CLASSES = {
+    "final_videos": ("final_karaoke_lossless_mp4", "final_karaoke_lossless_mkv", "final_karaoke_lossy_mp4", "final_karaoke_lossy_720p_mp4"),
+    "packages": ("final_karaoke_cdg_zip", "final_karaoke_txt_zip"),
+    "karaoke_videos": ("with_vocals_mp4", "karaoke_mp4", "karaoke_mkv"),
+    "title_end": ("title_mov", "title_jpg", "end_mov", "end_jpg"),
+    "lyrics": ("karaoke_lrc", "karaoke_txt"),
+    "stems": (),
+}
+
+# Journal in the public share dir listing files copied there since the last sync, relative to the public share dir
+PUBLIC_SHARE_SYNC_JOURNAL = ".karaoke-gen-sync-journal"
+
+# rclone link is retried with exponential backoff until the remote has indexed the new folder, for up to the deadline
+RCLONE_LINK_INITIAL_RETRY_DELAY_SECONDS = 0.5
+RCLONE_LINK_MAX_RETRY_DELAY_SECONDS = 8
+RCLONE_LINK_DEADLINE_SECONDS = 60
+
+# ffprobe profile names which differ from the encoder's -profile:v values
+ENCODER_PROFILES = {
+    "constrained baseline": "baseline",
+    "high 10": "high10",
+    "high 4:2:2": "high422",
+    "high 4:4:4 predictive": "high444",
+    "main 10": "main10",
+}
 
 
 class KaraokeFinalise:
@@ -46,6 +90,26 @@ class KaraokeFinalise:
         non_interactive=False,
         user_youtube_credentials=None,  # Add support for pre-stored credentials
         server_side_mode=False,  # New parameter for server-side deployment
+        single_pass_encode=False,
+        concat_stream_copy=False,
+        parallel_encode=False,
+        cpu_budget=None,
+        flac_intermediate=False,
+        encoder_probe_cache_dir=None,
+        refresh_encoder_probe=False,
+        brand_code_ledger_file=None,
+        rebuild_brand_code_ledger=False,
+        upload_deliverables=None,
+        rclone_transfers=None,
+        rclone_checkers=None,
+        incremental_public_share_sync=False,
+        youtube_resumable_upload=False,
+        youtube_upload_chunk_mb=None,
+        concurrent_distribution=False,
+        youtube_channel_index_dir=None,
+        refresh_youtube_channel_index=False,
+        track_dir=None,
+        encoder_capabilities=None,
     ):
         self.log_level = log_level
         self.log_formatter = log_formatter
@@ -72,6 +136,7 @@ class KaraokeFinalise:
         ffmpeg_path = os.path.join(sys._MEIPASS, "ffmpeg.exe") if getattr(sys, "frozen", False) else "ffmpeg"
 
         self.ffmpeg_base_command = f"{ffmpeg_path} -hide_banner -nostats"
+        self.ffprobe_path = os.path.join(sys._MEIPASS, "ffprobe.exe") if getattr(sys, "frozen", False) else "ffprobe"
 
         if self.log_level == logging.DEBUG:
             self.ffmpeg_base_command += " -loglevel verbose"
@@ -103,6 +168,40 @@ class KaraokeFinalise:
         self.non_interactive = non_interactive
         self.user_youtube_credentials = user_youtube_credentials
         self.server_side_mode = server_side_mode
+        self.single_pass_encode = single_pass_encode
+        self.concat_stream_copy = concat_stream_copy
+        self.parallel_encode = parallel_encode
+        self.cpu_budget = cpu_budget or os.cpu_count() or 1
+        self.flac_intermediate = flac_intermediate
+
+        unknown_deliverables = set(upload_deliverables or []) - set(UPLOAD_DELIVERABLE_CLASSES)
+        if unknown_deliverables:
+            raise ValueError(f"Unknown upload deliverables: {sorted(unknown_deliverables)}, choose from {sorted(UPLOAD_DELIVERABLE_CLASSES)}")
+        self.upload_deliverables = upload_deliverables
+        self.rclone_transfers = rclone_transfers
+        self.rclone_checkers = rclone_checkers
+        self.incremental_public_share_sync = incremental_public_share_sync
+        self.youtube_resumable_upload = youtube_resumable_upload
+        self.youtube_upload_chunk_mb = youtube_upload_chunk_mb or 64
+        self.concurrent_distribution = concurrent_distribution
+        self.distribution_step_results = None
+
+        # Directory of the track to finalise; if not set, the current working directory is used
+        self.track_dir = os.path.abspath(track_dir) if track_dir else None
+
+        # Brand codes are allocated from the ledger if configured, rather than from a scan of the organised folders
+        self.brand_code_ledger = SQLiteBrandCodeLedger(brand_code_ledger_file, self.logger) if brand_code_ledger_file else None
+        self.rebuild_brand_code_ledger = rebuild_brand_code_ledger
+
+        # Dry runs skip the real probes, so their results mustn't be cached
+        self.encoder_probe_cache = None
+        if encoder_probe_cache_dir and not dry_run:
+            self.encoder_probe_cache = EncoderProbeCache(encoder_probe_cache_dir, self.logger, refresh=refresh_encoder_probe)
+
+        # Duplicate uploads are looked for in a local index of the channel's videos if configured, rather than by search
+        self.youtube_channel_index = None
+        if youtube_channel_index_dir:
+            self.youtube_channel_index = YouTubeChannelIndex(youtube_channel_index_dir, self.logger, refresh=refresh_youtube_channel_index)
 
         self.suffixes = {
             "title_mov": " (Title).mov",
@@ -115,6 +214,7 @@ class KaraokeFinalise:
             "karaoke_lrc": " (Karaoke).lrc",
             "karaoke_txt": " (Karaoke).txt",
             "karaoke_mp4": " (Karaoke).mp4",
+            "karaoke_mkv": " (Karaoke).mkv",
             "karaoke_cdg": " (Karaoke).cdg",
             "karaoke_mp3": " (Karaoke).mp3",
             "final_karaoke_lossless_mp4": " (Final Karaoke Lossless 4k).mp4",
@@ -128,6 +228,8 @@ class KaraokeFinalise:
         self.youtube_url_prefix = "https://www.youtube.com/watch?v="
 
         self.youtube_url = None
+        self.youtube_credentials = None
+        self.youtube_channel_id = None
         self.brand_code = None
         self.new_brand_code_dir = None
         self.new_brand_code_dir_path = None
@@ -138,39 +240,48 @@ class KaraokeFinalise:
 
         self.cdg_styles = cdg_styles
 
-        # Determine best available AAC codec
-        self.aac_codec = self.detect_best_aac_codec()
-
         self.keep_brand_code = keep_brand_code
 
         # MP4 output flags for better compatibility and streaming
-        self.mp4_flags = "-pix_fmt yuv420p -movflags +faststart+frag_keyframe+empty_moov"
+        self.mp4_movflags = "-movflags +faststart+frag_keyframe+empty_moov"
+        self.mp4_flags = f"-pix_fmt yuv420p {self.mp4_movflags}"
 
         # Update ffmpeg base command to include -y if non-interactive
         if self.non_interactive:
             self.ffmpeg_base_command += " -y"
 
-        # Detect and configure hardware acceleration
-        self.nvenc_available = self.detect_nvenc_support()
+        # Determine best available AAC codec, then detect and configure hardware acceleration
+        # A batch passes in the capabilities it has already detected, rather than probing again for every track
+        if encoder_capabilities is not None:
+            self.aac_codec, self.nvenc_available = encoder_capabilities
+        else:
+            self.aac_codec, self.nvenc_available = self.detect_encoder_capabilities(ffmpeg_path)
         self.configure_hardware_acceleration()
 
+    def get_track_dir(self):
+        return self.track_dir or os.getcwd()
+
+    def get_track_file_path(self, file_name):
+        """Return the path of a file in the track directory, left relative to the current directory if no track_dir is set."""
+        return os.path.join(self.track_dir, file_name) if self.track_dir else file_name
+
     def check_input_files_exist(self, base_name, with_vocals_file, instrumental_audio_file):
         self.logger.info(f"Checking required input files exist...")
 
         input_files = {
-            "title_mov": f"{base_name}{self.suffixes['title_mov']}",
-            "title_jpg": f"{base_name}{self.suffixes['title_jpg']}",
-            "instrumental_audio": instrumental_audio_file,
-            "with_vocals_mov": with_vocals_file,
+            "title_mov": self.get_track_file_path(f"{base_name}{self.suffixes['title_mov']}"),
+            "title_jpg": self.get_track_file_path(f"{base_name}{self.suffixes['title_jpg']}"),
+            "instrumental_audio": self.get_track_file_path(instrumental_audio_file),
+            "with_vocals_mov": self.get_track_file_path(with_vocals_file),
         }
 
         optional_input_files = {
-            "end_mov": f"{base_name}{self.suffixes['end_mov']}",
-            "end_jpg": f"{base_name}{self.suffixes['end_jpg']}",
+            "end_mov": self.get_track_file_path(f"{base_name}{self.suffixes['end_mov']}"),
+            "end_jpg": self.get_track_file_path(f"{base_name}{self.suffixes['end_jpg']}"),
         }
 
         if self.enable_cdg or self.enable_txt:
-            input_files["karaoke_lrc"] = f"{base_name}{self.suffixes['karaoke_lrc']}"
+            input_files["karaoke_lrc"] = self.get_track_file_path(f"{base_name}{self.suffixes['karaoke_lrc']}")
 
         for key, file_path in input_files.items():
             if not os.path.isfile(file_path):
@@ -189,7 +300,8 @@ class KaraokeFinalise:
 
     def prepare_output_filenames(self, base_name):
         output_files = {
-            "karaoke_mp4": f"{base_name}{self.suffixes['karaoke_mp4']}",
+            # With a FLAC intermediate the karaoke video is an MKV, as FLAC in MP4 isn't widely supported by players
+            "karaoke_mp4": f"{base_name}{self.suffixes['karaoke_mkv' if self.flac_intermediate else 'karaoke_mp4']}",
             "karaoke_mp3": f"{base_name}{self.suffixes['karaoke_mp3']}",
             "karaoke_cdg": f"{base_name}{self.suffixes['karaoke_cdg']}",
             "with_vocals_mp4": f"{base_name}{self.suffixes['with_vocals_mp4']}",
@@ -206,7 +318,7 @@ class KaraokeFinalise:
             output_files["karaoke_txt"] = f"{base_name}{self.suffixes['karaoke_txt']}"
             output_files["final_karaoke_txt_zip"] = f"{base_name}{self.suffixes['final_karaoke_txt_zip']}"
 
-        return output_files
+        return {key: self.get_track_file_path(file_name) for key, file_name in output_files.items()}
 
     def prompt_user_confirmation_or_raise_exception(self, prompt_message, exit_message, allow_empty=False):
         if self.non_interactive:
@@ -234,7 +346,7 @@ class KaraokeFinalise:
     def validate_input_parameters_for_features(self):
         self.logger.info(f"Validating input parameters for enabled features...")
 
-        current_directory = os.getcwd()
+        current_directory = self.get_track_dir()
         self.logger.info(f"Current directory to process: {current_directory}")
 
         # Enable youtube upload if client secrets file is provided and is valid JSON
@@ -324,6 +436,10 @@ class KaraokeFinalise:
         import pickle
         import os
 
+        # Reuse credentials from an earlier call (or shared by a batch), which refresh themselves when they expire
+        if self.youtube_credentials is not None:
+            return build("youtube", "v3", credentials=self.youtube_credentials)
+
         # Check if we have pre-stored credentials (for non-interactive mode)
         if self.user_youtube_credentials and self.non_interactive:
             try:
@@ -343,6 +459,7 @@ class KaraokeFinalise:
                 
                 # Build YouTube service with credentials
                 youtube = build('youtube', 'v3', credentials=credentials)
+                self.youtube_credentials = credentials
                 self.logger.info("Successfully authenticated with YouTube using pre-stored credentials")
                 return youtube
                 
@@ -381,9 +498,13 @@ class KaraokeFinalise:
             with open(youtube_token_file, "wb") as token:
                 pickle.dump(credentials, token)
 
+        self.youtube_credentials = credentials
         return build("youtube", "v3", credentials=credentials)
 
     def get_channel_id(self):
+        if self.youtube_channel_id is not None:
+            return self.youtube_channel_id
+
         youtube = self.authenticate_youtube()
 
         # Get the authenticated user's channel
@@ -393,43 +514,64 @@ class KaraokeFinalise:
         # Extract the channel ID
         if "items" in response:
             channel_id = response["items"][0]["id"]
+            self.youtube_channel_id = channel_id
             return channel_id
         else:
             return None
 
-    def check_if_video_title_exists_on_youtube_channel(self, youtube_title):
-        youtube = self.authenticate_youtube()
-        channel_id = self.get_channel_id()
+    def find_youtube_videos_like_title(self, youtube, channel_id, youtube_title):
+        """Return (video_id, title) for videos on the channel which may have youtube_title, from the local index if configured."""
+        if self.youtube_channel_index is not None:
+            self.logger.info(f"Checking local index of YouTube channel {channel_id} for title: {youtube_title}")
+            self.youtube_channel_index.sync(youtube, channel_id)
+            return self.youtube_channel_index.get_videos(channel_id)
 
         self.logger.info(f"Searching YouTube channel {channel_id} for title: {youtube_title}")
         request = youtube.search().list(part="snippet", channelId=channel_id, q=youtube_title, type="video", maxResults=10)
         response = request.execute()
+        return [(item["id"]["videoId"], item["snippet"]["title"]) for item in response.get("items", [])]
 
-        # Check if any videos were found
-        if "items" in response and len(response["items"]) > 0:
-            for item in response["items"]:
-                found_title = item["snippet"]["title"]
-                similarity_score = fuzz.ratio(youtube_title.lower(), found_title.lower())
-                if similarity_score >= 70:  # 70% similarity
-                    found_id = item["id"]["videoId"]
-                    self.logger.info(
-                        f"Potential match found on YouTube channel with ID: {found_id} and title: {found_title} (similarity: {similarity_score}%)"
-                    )
-                    
-                    # In non-interactive mode, automatically confirm if similarity is high enough
-                    if self.non_interactive:
-                        self.logger.info(f"Non-interactive mode, automatically confirming match with similarity score {similarity_score}%")
-                        self.youtube_video_id = found_id
-                        self.youtube_url = f"{self.youtube_url_prefix}{self.youtube_video_id}"
-                        self.skip_notifications = True
-                        return True
-                    
-                    confirmation = input(f"Is '{found_title}' the video you are finalising? (y/n): ").strip().lower()
-                    if confirmation == "y":
-                        self.youtube_video_id = found_id
-                        self.youtube_url = f"{self.youtube_url_prefix}{self.youtube_video_id}"
-                        self.skip_notifications = True
-                        return True
+    def youtube_video_exists(self, youtube, video_id):
+        """Return whether a video is still on YouTube, which costs 1 API quota unit."""
+        response = youtube.videos().list(part="id", id=video_id).execute()
+        return bool(response.get("items"))
+
+    def check_if_video_title_exists_on_youtube_channel(self, youtube_title):
+        youtube = self.authenticate_youtube()
+        channel_id = self.get_channel_id()
+
+        matches = []
+        for found_id, found_title in self.find_youtube_videos_like_title(youtube, channel_id, youtube_title):
+            similarity_score = fuzz.ratio(youtube_title.lower(), found_title.lower())
+            if similarity_score >= 70:  # 70% similarity
+                matches.append((similarity_score, found_id, found_title))
+
+        # Offer the closest match first
+        for similarity_score, found_id, found_title in sorted(matches, key=lambda match: match[0], reverse=True):
+            self.logger.info(
+                f"Potential match found on YouTube channel with ID: {found_id} and title: {found_title} (similarity: {similarity_score}%)"
+            )
+
+            # The index keeps videos deleted outside karaoke-gen, so check a match from it is still there before offering it
+            if self.youtube_channel_index is not None and not self.youtube_video_exists(youtube, found_id):
+                self.logger.info(f"Video {found_id} is no longer on YouTube, removing it from the channel index")
+                self.youtube_channel_index.remove_video(channel_id, found_id)
+                continue
+
+            # In non-interactive mode, automatically confirm if similarity is high enough
+            if self.non_interactive:
+                self.logger.info(f"Non-interactive mode, automatically confirming match with similarity score {similarity_score}%")
+                self.youtube_video_id = found_id
+                self.youtube_url = f"{self.youtube_url_prefix}{self.youtube_video_id}"
+                self.skip_notifications = True
+                return True
+
+            confirmation = input(f"Is '{found_title}' the video you are finalising? (y/n): ").strip().lower()
+            if confirmation == "y":
+                self.youtube_video_id = found_id
+                self.youtube_url = f"{self.youtube_url_prefix}{self.youtube_video_id}"
+                self.skip_notifications = True
+                return True
 
         self.logger.info(f"No matching video found with title: {youtube_title}")
         return False
@@ -454,6 +596,8 @@ class KaraokeFinalise:
             youtube = self.authenticate_youtube()
             youtube.videos().delete(id=video_id).execute()
             self.logger.info(f"Successfully deleted YouTube video with ID: {video_id}")
+            if self.youtube_channel_index is not None:
+                self.youtube_channel_index.remove_video(self.get_channel_id(), video_id)
             return True
         except Exception as e:
             self.logger.error(f"Failed to delete YouTube video with ID {video_id}: {e}")
@@ -517,40 +661,86 @@ class KaraokeFinalise:
                 "status": {"privacyStatus": "public"},
             }
 
-            # Use MediaFileUpload to handle the video file - using the MKV with FLAC audio
-            media_file = MediaFileUpload(output_files["final_karaoke_lossless_mkv"], mimetype="video/x-matroska", resumable=True)
-
-            # Call the API's videos.insert method to create and upload the video.
             self.logger.info(f"Uploading final MKV to YouTube...")
-            request = youtube.videos().insert(part="snippet,status", body=body, media_body=media_file)
-            response = request.execute()
+            if self.youtube_resumable_upload:
+                response = self.upload_video_to_youtube_resumably(output_files["final_karaoke_lossless_mkv"], body)
+            else:
+                # Use MediaFileUpload to handle the video file - using the MKV with FLAC audio
+                media_file = MediaFileUpload(output_files["final_karaoke_lossless_mkv"], mimetype="video/x-matroska", resumable=True)
+
+                # Call the API's videos.insert method to create and upload the video.
+                request = youtube.videos().insert(part="snippet,status", body=body, media_body=media_file)
+                response = request.execute()
 
             self.youtube_video_id = response.get("id")
             self.youtube_url = f"{self.youtube_url_prefix}{self.youtube_video_id}"
             self.logger.info(f"Uploaded video to YouTube: {self.youtube_url}")
 
+            # Record our own upload straight away, the next sync may not reach it yet if it's still processing
+            if self.youtube_channel_index is not None:
+                self.youtube_channel_index.add_video(self.get_channel_id(), self.youtube_video_id, youtube_title)
+
             # Uploading the thumbnail
             if input_files["title_jpg"]:
                 media_thumbnail = MediaFileUpload(input_files["title_jpg"], mimetype="image/jpeg")
                 youtube.thumbnails().set(videoId=self.youtube_video_id, media_body=media_thumbnail).execute()
                 self.logger.info(f"Uploaded thumbnail for video ID {self.youtube_video_id}")
 
-    def get_next_brand_code(self):
+    def log_youtube_upload_progress(self, bytes_uploaded, total_bytes):
+        self.logger.info(f"Uploaded {bytes_uploaded / (1024 * 1024):.1f} of {total_bytes / (1024 * 1024):.1f} MB to YouTube ({bytes_uploaded / total_bytes:.0%})")
+
+    def upload_video_to_youtube_resumably(self, video_file, body):
+        """Upload video_file in chunks, saving the upload session next to it so a failed or interrupted upload resumes where it stopped."""
+        uploader = ResumableUpload(
+            session=AuthorizedSession(self.youtube_credentials),
+            upload_url=YOUTUBE_UPLOAD_URL,
+            params={"part": "snippet,status"},
+            metadata=body,
+            file_path=video_file,
+            mimetype="video/x-matroska",
+            state_file=f"{video_file}.youtube-upload.json",
+            logger=self.logger,
+            chunk_size=self.youtube_upload_chunk_mb * 1024 * 1024,
+            progress_callback=self.log_youtube_upload_progress,
+        )
+        return uploader.upload()
+
+    def scan_brand_code_numbers(self):
         """
-        Calculate the next sequence number based on existing directories in the organised_dir.
+        List the sequence numbers of existing directories in the organised_dir.
         Assumes directories are named with the format: BRAND-XXXX Artist - Title
         """
-        max_num = 0
         pattern = re.compile(rf"^{re.escape(self.brand_prefix)}-(\d{{4}})")
 
         if not os.path.isdir(self.organised_dir):
             raise Exception(f"Target directory does not exist: {self.organised_dir}")
 
+        numbers = []
         for dir_name in os.listdir(self.organised_dir):
             match = pattern.match(dir_name)
             if match:
-                num = int(match.group(1))
-                max_num = max(max_num, num)
+                numbers.append(int(match.group(1)))
+
+        return numbers
+
+    def allocate_brand_code_from_ledger(self, scan_existing_numbers):
+        """Reserve the next brand code from the ledger, which only calls scan_existing_numbers when it needs (re)building."""
+        next_seq_number = self.brand_code_ledger.allocate(self.brand_prefix, scan_existing_numbers, rebuild=self.rebuild_brand_code_ledger)
+        # A rebuild is a one-off, later codes allocated by this instance come straight from the ledger
+        self.rebuild_brand_code_ledger = False
+        return f"{self.brand_prefix}-{next_seq_number:04d}"
+
+    def get_next_brand_code(self):
+        """
+        Calculate the next sequence number based on existing directories in the organised_dir.
+        Assumes directories are named with the format: BRAND-XXXX Artist - Title
+        If a brand code ledger is configured, the next code is reserved from it instead.
+        """
+        # Dry runs mustn't reserve a code, so scan instead
+        if self.brand_code_ledger is not None and not self.dry_run:
+            return self.allocate_brand_code_from_ledger(self.scan_brand_code_numbers)
+
+        max_num = max(self.scan_brand_code_numbers(), default=0)
 
         self.logger.info(f"Next sequence number for brand {self.brand_prefix} calculated as: {max_num + 1}")
         next_seq_number = max_num + 1
@@ -575,7 +765,7 @@ class KaraokeFinalise:
         ]
 
         # First try to find a properly named with vocals file in any supported format
-        with_vocals_files = [f for f in os.listdir(".") if any(f.endswith(suffix) for suffix in with_vocals_suffixes)]
+        with_vocals_files = [f for f in os.listdir(self.track_dir or ".") if any(f.endswith(suffix) for suffix in with_vocals_suffixes)]
 
         if with_vocals_files:
             self.logger.info(f"Found with vocals file: {with_vocals_files[0]}")
@@ -583,7 +773,7 @@ class KaraokeFinalise:
 
         # If no with vocals file found, look for potentially misnamed karaoke files
         karaoke_suffixes = [" (Karaoke).mov", " (Karaoke).mp4", " (Karaoke).mkv"]
-        karaoke_files = [f for f in os.listdir(".") if any(f.endswith(suffix) for suffix in karaoke_suffixes)]
+        karaoke_files = [f for f in os.listdir(self.track_dir or ".") if any(f.endswith(suffix) for suffix in karaoke_suffixes)]
 
         if karaoke_files:
             for file in karaoke_files:
@@ -603,7 +793,7 @@ class KaraokeFinalise:
                         allow_empty=True,
                     )
 
-                    os.rename(file, new_file)
+                    os.rename(self.get_track_file_path(file), self.get_track_file_path(new_file))
                     self.logger.info(f"Renamed '{file}' to '{new_file}'")
                     return new_file
                 else:
@@ -617,7 +807,7 @@ class KaraokeFinalise:
         search_string = " (Instrumental"
         self.logger.info(f"Searching for files in current directory containing {search_string}")
 
-        all_instrumental_files = [f for f in os.listdir(".") if search_string in f]
+        all_instrumental_files = [f for f in os.listdir(self.track_dir or ".") if search_string in f]
         flac_files = set(f.rsplit(".", 1)[0] for f in all_instrumental_files if f.endswith(".flac"))
         mp3_files = set(f.rsplit(".", 1)[0] for f in all_instrumental_files if f.endswith(".mp3"))
         wav_files = set(f.rsplit(".", 1)[0] for f in all_instrumental_files if f.endswith(".wav"))
@@ -735,14 +925,47 @@ class KaraokeFinalise:
         """Remux the video with instrumental audio to create karaoke version"""
         # This operation is primarily I/O bound (remuxing), so hardware acceleration doesn't provide significant benefit
         # Keep the existing approach but use the new execute method
+        # FLAC is lossless like PCM but around half the size; prepare_output_filenames names the output .mkv for it
+        audio_codec = "flac" if self.flac_intermediate else "pcm_s16le"
         ffmpeg_command = (
             f'{self.ffmpeg_base_command} -an -i "{with_vocals_file}" '
-            f'-vn -i "{instrumental_audio}" -c:v copy -c:a pcm_s16le "{output_file}"'
+            f'-vn -i "{instrumental_audio}" -c:v copy -c:a {audio_codec} "{output_file}"'
         )
         self.execute_command(ffmpeg_command, "Remuxing video with instrumental audio")
 
+    def remux_mov_to_mp4(self, input_file, output_file):
+        """Change the container to MP4 without re-encoding the video, if its codec and pixel format allow it.
+
+        The audio is copied if it is already AAC, otherwise encoded to AAC. Returns True if the MP4 was created.
+        """
+        if self.dry_run:
+            return False
+
+        params = self.probe_concat_stream_params(input_file)
+        if params is None or params["video_codec"] not in MP4_STREAM_COPY_VIDEO_CODECS or params["pix_fmt"] != "yuv420p":
+            self.logger.info(f"Video in {input_file} can't be copied into MP4 as-is, it will be re-encoded: {params}")
+            return False
+
+        audio_codec = "copy" if params["audio_codec"] == "aac" else self.aac_codec
+        ffmpeg_command = (
+            f'{self.ffmpeg_base_command} -i "{input_file}" -map 0:v:0 -map 0:a:0 '
+            f'-c:v copy {MP4_STREAM_COPY_VIDEO_CODECS[params["video_codec"]]}-c:a {audio_codec} {self.mp4_movflags} "{output_file}"'
+        )
+        try:
+            self.execute_command(ffmpeg_command, f"Remuxing {params['video_codec']} video to MP4 without re-encoding")
+        except Exception as e:
+            self.logger.warning(f"Failed to remux {input_file} to MP4, re-encoding instead: {e}")
+            if os.path.isfile(output_file):
+                os.remove(output_file)
+            return False
+
+        return True
+
     def convert_mov_to_mp4(self, input_file, output_file):
-        """Convert MOV file to MP4 format with hardware acceleration support"""
+        """Convert MOV file to MP4 format, by remuxing if the video codec allows it, otherwise encoding with hardware acceleration support"""
+        if self.remux_mov_to_mp4(input_file, output_file):
+            return
+
         # Hardware-accelerated version
         gpu_command = (
             f'{self.ffmpeg_base_command} {self.hwaccel_decode_flags} -i "{input_file}" '
@@ -776,45 +999,256 @@ class KaraokeFinalise:
         
         self.execute_command_with_fallback(gpu_command, cpu_command, "Creating MP4 version with PCM audio")
 
-    def encode_lossy_mp4(self, input_file, output_file):
+    def probe_concat_stream_params(self, input_file):
+        """Return the video/audio stream parameters which must match to join files by stream copy, or None if unreadable.
+
+        These include a hash of the video codec extradata (e.g. H.264 SPS/PPS), as an MP4 written by the concat demuxer
+        only keeps the first segment's, so segments encoded with different settings would decode wrongly at the joins.
+        """
+        probe_command = (
+            f"{self.ffprobe_path} -v error -show_data_hash sha256 -show_entries "
+            f"stream=codec_type,codec_name,profile,level,refs,width,height,pix_fmt,time_base,r_frame_rate,"
+            f"extradata_size,extradata_hash,sample_rate,channels "
+            f'-of json "{input_file}"'
+        )
+        try:
+            result = subprocess.run(probe_command, shell=True, capture_output=True, text=True, timeout=60)
+            streams = json.loads(result.stdout)["streams"]
+        except (subprocess.TimeoutExpired, ValueError, KeyError, TypeError) as e:
+            self.logger.warning(f"Failed to probe stream parameters of {input_file}: {e}")
+            return None
+
+        video = next((stream for stream in streams if stream.get("codec_type") == "video"), None)
+        audio = next((stream for stream in streams if stream.get("codec_type") == "audio"), None)
+        if video is None or audio is None:
+            self.logger.warning(f"Expected a video and an audio stream in {input_file}, found: {streams}")
+            return None
+
+        return {
+            "video_codec": video.get("codec_name"),
+            "profile": video.get("profile"),
+            "level": video.get("level"),
+            "refs": video.get("refs"),
+            "width": video.get("width"),
+            "height": video.get("height"),
+            "pix_fmt": video.get("pix_fmt"),
+            "time_base": video.get("time_base"),
+            "r_frame_rate": video.get("r_frame_rate"),
+            "extradata_size": video.get("extradata_size"),
+            "extradata_hash": video.get("extradata_hash"),
+            "audio_codec": audio.get("codec_name"),
+            "sample_rate": audio.get("sample_rate"),
+            "channels": audio.get("channels"),
+        }
+
+    def render_concat_card(self, input_file, params, output_file):
+        """Re-encode a short title/end card with the karaoke video's stream parameters, so it can be joined by stream copy."""
+        profile = (params["profile"] or "").lower()
+        # Pin the H.264 level and reference frames, which are written into the SPS, to improve the chance of its matching
+        h264_options = ""
+        if params["video_codec"] == "h264":
+            h264_options += f'-level:v {params["level"]} ' if params.get("level") else ""
+            h264_options += f'-refs {params["refs"]} ' if params.get("refs") else ""
+        ffmpeg_command = (
+            f'{self.ffmpeg_base_command} -i "{input_file}" '
+            f'-vf "scale={params["width"]}:{params["height"]},fps={params["r_frame_rate"]}" '
+            f'-c:v {STREAM_COPY_CONCAT_VIDEO_ENCODERS[params["video_codec"]]} -profile:v {ENCODER_PROFILES.get(profile, profile)} '
+            f'{h264_options}-pix_fmt {params["pix_fmt"]} -video_track_timescale {params["time_base"].split("/")[1]} '
+            f'-c:a {STREAM_COPY_CONCAT_AUDIO_ENCODERS[params["audio_codec"]]} -ar {params["sample_rate"]} -ac {params["channels"]} '
+            f'"{output_file}"'
+        )
+        self.execute_command(ffmpeg_command, f"Rendering {os.path.basename(input_file)} to match the karaoke video")
+
+    def encode_lossless_mp4_stream_copy(self, input_files, karaoke_mp4_file, output_file):
+        """Join the title, karaoke and end videos with the concat demuxer, copying the karaoke video rather than re-encoding it.
+
+        Only the short title/end cards are encoded, with parameters matching the karaoke video, and each is checked with
+        ffprobe before joining. Returns False if that isn't possible, so the caller can use the concat filter instead.
+        """
+        if self.dry_run:
+            self.logger.info("DRY RUN: Would join title, karaoke and end videos by stream copy if their parameters match")
+            return False
+
+        karaoke_params = self.probe_concat_stream_params(karaoke_mp4_file)
+        if (
+            karaoke_params is None
+            or karaoke_params["video_codec"] not in STREAM_COPY_CONCAT_VIDEO_ENCODERS
+            or karaoke_params["audio_codec"] not in STREAM_COPY_CONCAT_AUDIO_ENCODERS
+        ):
+            self.logger.info(f"Karaoke video streams can't be matched for stream copy ({karaoke_params}), using concat filter")
+            return False
+
+        card_files = [input_files["title_mov"]]
+        if "end_mov" in input_files and os.path.isfile(input_files["end_mov"]):
+            card_files.append(input_files["end_mov"])
+
+        work_dir = tempfile.mkdtemp(prefix=".concat-", dir=os.path.dirname(os.path.abspath(output_file)))
+        try:
+            matched_cards = []
+            for card_file in card_files:
+                matched_card = os.path.join(work_dir, f"card_{len(matched_cards)}.mp4")
+                self.render_concat_card(card_file, karaoke_params, matched_card)
+
+                card_params = self.probe_concat_stream_params(matched_card)
+                if card_params != karaoke_params:
+                    self.logger.warning(
+                        f"Rendered {os.path.basename(card_file)} doesn't match the karaoke video "
+                        f"({card_params} != {karaoke_params}), using concat filter"
+                    )
+                    return False
+                matched_cards.append(matched_card)
+
+            concat_list_file = os.path.join(work_dir, "concat.txt")
+            with open(concat_list_file, "w") as f:
+                for segment in [matched_cards[0], os.path.abspath(karaoke_mp4_file)] + matched_cards[1:]:
+                    escaped_segment = segment.replace("'", "'\\''")
+                    f.write(f"file '{escaped_segment}'\n")
+
+            ffmpeg_command = (
+                f'{self.ffmpeg_base_command} -f concat -safe 0 -i "{concat_list_file}" '
+                f'-map 0 -c:v copy -c:a pcm_s16le {self.mp4_flags} "{output_file}"'
+            )
+            self.execute_command(ffmpeg_command, "Joining title, karaoke and end videos by stream copy")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Stream copy concat failed, using concat filter instead: {e}")
+            if os.path.isfile(output_file):
+                os.remove(output_file)
+            return False
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def encode_lossy_mp4(self, input_file, output_file, threads=None):
         """Create MP4 with AAC audio (lossy, for wider compatibility)"""
         # This is primarily an audio re-encoding operation, video is copied
         # Hardware acceleration doesn't provide significant benefit for copy operations
+        threads_option = f"-threads {threads} " if threads else ""
         ffmpeg_command = (
             f'{self.ffmpeg_base_command} -i "{input_file}" '
-            f'-c:v copy -c:a {self.aac_codec} -b:a 320k {self.mp4_flags} "{output_file}"'
+            f'-c:v copy -c:a {self.aac_codec} -b:a 320k {threads_option}{self.mp4_flags} "{output_file}"'
         )
         self.execute_command(ffmpeg_command, "Creating MP4 version with AAC audio")
 
-    def encode_lossless_mkv(self, input_file, output_file):
+    def encode_lossless_mkv(self, input_file, output_file, threads=None):
         """Create MKV with FLAC audio (for YouTube)"""
         # This is primarily an audio re-encoding operation, video is copied
         # Hardware acceleration doesn't provide significant benefit for copy operations
+        threads_option = f"-threads {threads} " if threads else ""
         ffmpeg_command = (
             f'{self.ffmpeg_base_command} -i "{input_file}" '
-            f'-c:v copy -c:a flac "{output_file}"'
+            f'-c:v copy -c:a flac {threads_option}"{output_file}"'
         )
         self.execute_command(ffmpeg_command, "Creating MKV version with FLAC audio for YouTube")
 
-    def encode_720p_version(self, input_file, output_file):
+    def encode_720p_version(self, input_file, output_file, threads=None):
         """Create 720p MP4 with AAC audio (for smaller file size) using hardware acceleration when available"""
+        threads_option = f"-threads {threads} " if threads else ""
+
         # Hardware-accelerated version with GPU scaling and encoding
         gpu_command = (
             f'{self.ffmpeg_base_command} {self.hwaccel_decode_flags} -i "{input_file}" '
             f'-c:v {self.video_encoder} -vf "{self.scale_filter}=1280:720" '
             f'{self.get_nvenc_quality_settings("medium")} -b:v 2000k '
-            f'-c:a {self.aac_codec} -b:a 128k {self.mp4_flags} "{output_file}"'
+            f'-c:a {self.aac_codec} -b:a 128k {threads_option}{self.mp4_flags} "{output_file}"'
         )
         
         # Software fallback version
         cpu_command = (
             f'{self.ffmpeg_base_command} -i "{input_file}" '
             f'-c:v libx264 -vf "scale=1280:720" -b:v 2000k -preset medium -tune animation '
-            f'-c:a {self.aac_codec} -b:a 128k {self.mp4_flags} "{output_file}"'
+            f'-c:a {self.aac_codec} -b:a 128k {threads_option}{self.mp4_flags} "{output_file}"'
         )
         
         self.execute_command_with_fallback(gpu_command, cpu_command, "Encoding 720p version of the final video")
 
+    def encode_derived_outputs_in_parallel(self, output_files):
+        """Encode the lossy MP4, MKV and 720p versions from the lossless MP4 at the same time, within the CPU budget.
+
+        The MP4 and MKV remuxes copy the video and only encode audio, so get one thread each, leaving the rest of the
+        budget to the 720p video encode. A budget too small to give every encode a thread runs them one at a time
+        instead, each with the whole budget. All encodes run to completion and any failures are reported together.
+        """
+        lossless_mp4 = output_files["final_karaoke_lossless_mp4"]
+        encodes = {
+            "Lossy 4K MP4": (self.encode_lossy_mp4, output_files["final_karaoke_lossy_mp4"], 1),
+            "Lossless 4K MKV": (self.encode_lossless_mkv, output_files["final_karaoke_lossless_mkv"], 1),
+            "Lossy 720p MP4": (self.encode_720p_version, output_files["final_karaoke_lossy_720p_mp4"], self.cpu_budget - 2),
+        }
+
+        max_workers = len(encodes)
+        if self.cpu_budget < len(encodes):
+            max_workers = 1
+            encodes = {name: (encode, output_file, self.cpu_budget) for name, (encode, output_file, _) in encodes.items()}
+            self.logger.info(f"Encoding {len(encodes)} final video versions one at a time with a budget of {self.cpu_budget} CPU threads")
+        else:
+            self.logger.info(f"Encoding {len(encodes)} final video versions in parallel with a budget of {self.cpu_budget} CPU threads")
+
+        errors = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                name: executor.submit(encode, lossless_mp4, output_file, threads=threads)
+                for name, (encode, output_file, threads) in encodes.items()
+            }
+            for name, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to encode {name}: {e}")
+                    errors.append(f"{name}: {e}")
+
+        if errors:
+            raise Exception(f"Failed to encode {len(errors)} final video version(s): {'; '.join(errors)}")
+
+    def escape_tee_output_path(self, path):
+        """Escape the characters the tee muxer treats specially in its list of outputs."""
+        return re.sub(r"([\\'|\[\]])", r"\\\1", path)
+
+    def encode_all_outputs_single_pass(self, title_mov_file, karaoke_mp4_file, env_mov_input, ffmpeg_filter, output_files):
+        """Create all four final videos with one ffmpeg run, so the inputs are decoded and concatenated only once.
+
+        The concatenated video is encoded once and the tee muxer writes it to the lossless MP4 (PCM), lossy MP4 (AAC)
+        and MKV (FLAC), which share that video stream just as the separate copy remuxes did. The 720p version is scaled
+        from the same decoded frames, using split/asplit to feed each output.
+        """
+        # Extend the concat filter graph with the split for the 720p version and an audio branch per output
+        ladder_filter = (
+            ffmpeg_filter.rstrip('"') + f";[outv]split=2[v4k][v720in];[v720in]{self.scale_filter}=1280:720[v720];"
+            '[outa]asplit=4[apcm][aaac][aflac][a720]"'
+        )
+
+        movflags = self.mp4_flags.split("-movflags ", 1)[1]
+        tee_outputs = "|".join(
+            [
+                f"[select=\\'v:0,a:0\\':f=mp4:movflags={movflags}]{self.escape_tee_output_path(output_files['final_karaoke_lossless_mp4'])}",
+                f"[select=\\'v:0,a:1\\':f=mp4:movflags={movflags}]{self.escape_tee_output_path(output_files['final_karaoke_lossy_mp4'])}",
+                f"[select=\\'v:0,a:2\\':f=matroska]{self.escape_tee_output_path(output_files['final_karaoke_lossless_mkv'])}",
+            ]
+        )
+        tee_maps = '-map "[v4k]" -map "[apcm]" -map "[aaac]" -map "[aflac]"'
+        # The tee muxer can't tell the encoder its MP4/MKV outputs need global headers, so ask for them explicitly
+        tee_settings = f"-flags:v +global_header -c:a:0 pcm_s16le -c:a:1 {self.aac_codec} -b:a:1 320k -c:a:2 flac -pix_fmt yuv420p"
+        output_720p_file = output_files["final_karaoke_lossy_720p_mp4"]
+
+        # Hardware-accelerated version
+        gpu_command = (
+            f"{self.ffmpeg_base_command} {self.hwaccel_decode_flags} -i {title_mov_file} "
+            f"{self.hwaccel_decode_flags} -i {karaoke_mp4_file} {env_mov_input} {ladder_filter} "
+            f'{tee_maps} -c:v {self.video_encoder} {self.get_nvenc_quality_settings("lossless")} '
+            f"{tee_settings} -f tee {shlex.quote(tee_outputs)} "
+            f'-map "[v720]" -map "[a720]" -c:v {self.video_encoder} {self.get_nvenc_quality_settings("medium")} -b:v 2000k '
+            f'-c:a {self.aac_codec} -b:a 128k {self.mp4_flags} "{output_720p_file}"'
+        )
+
+        # Software fallback version
+        cpu_command = (
+            f"{self.ffmpeg_base_command} -i {title_mov_file} -i {karaoke_mp4_file} {env_mov_input} {ladder_filter} "
+            f"{tee_maps} -c:v libx264 {tee_settings} -f tee {shlex.quote(tee_outputs)} "
+            f'-map "[v720]" -map "[a720]" -c:v libx264 -b:v 2000k -preset medium -tune animation '
+            f'-c:a {self.aac_codec} -b:a 128k {self.mp4_flags} "{output_720p_file}"'
+        )
+
+        self.execute_command_with_fallback(gpu_command, cpu_command, "Encoding all final video versions in a single pass")
+
     def prepare_concat_filter(self, input_files):
         """Prepare the concat filter and additional input for end credits if present"""
         env_mov_input = ""
@@ -858,11 +1292,34 @@ class KaraokeFinalise:
         # Prepare concat filter for combining videos
         env_mov_input, ffmpeg_filter = self.prepare_concat_filter(input_files)
 
-        # Create all output versions
-        self.encode_lossless_mp4(title_mov_file, karaoke_mp4_file, env_mov_input, ffmpeg_filter, output_files["final_karaoke_lossless_mp4"])
-        self.encode_lossy_mp4(output_files["final_karaoke_lossless_mp4"], output_files["final_karaoke_lossy_mp4"])
-        self.encode_lossless_mkv(output_files["final_karaoke_lossless_mp4"], output_files["final_karaoke_lossless_mkv"])
-        self.encode_720p_version(output_files["final_karaoke_lossless_mp4"], output_files["final_karaoke_lossy_720p_mp4"])
+        # Join the inputs by stream copy if enabled, so only the short title/end cards are encoded
+        lossless_mp4_created = False
+        if self.concat_stream_copy:
+            lossless_mp4_created = self.encode_lossless_mp4_stream_copy(
+                input_files, output_files["karaoke_mp4"], output_files["final_karaoke_lossless_mp4"]
+            )
+
+        # Create all output versions, in one pass if enabled, otherwise (or if that fails) one after another
+        encoded_single_pass = False
+        if self.single_pass_encode and not lossless_mp4_created:
+            try:
+                self.encode_all_outputs_single_pass(title_mov_file, karaoke_mp4_file, env_mov_input, ffmpeg_filter, output_files)
+                encoded_single_pass = True
+            except Exception as e:
+                self.logger.warning(f"Single-pass encode failed, falling back to encoding each version separately: {e}")
+                for output_key in ["final_karaoke_lossless_mp4", "final_karaoke_lossy_mp4", "final_karaoke_lossless_mkv", "final_karaoke_lossy_720p_mp4"]:
+                    if os.path.isfile(output_files[output_key]):
+                        os.remove(output_files[output_key])
+
+        if not encoded_single_pass:
+            if not lossless_mp4_created:
+                self.encode_lossless_mp4(title_mov_file, karaoke_mp4_file, env_mov_input, ffmpeg_filter, output_files["final_karaoke_lossless_mp4"])
+            if self.parallel_encode:
+                self.encode_derived_outputs_in_parallel(output_files)
+            else:
+                self.encode_lossy_mp4(output_files["final_karaoke_lossless_mp4"], output_files["final_karaoke_lossy_mp4"])
+                self.encode_lossless_mkv(output_files["final_karaoke_lossless_mp4"], output_files["final_karaoke_lossless_mkv"])
+                self.encode_720p_version(output_files["final_karaoke_lossless_mp4"], output_files["final_karaoke_lossy_720p_mp4"])
 
         # Skip user confirmation in non-interactive mode for Modal deployment
         if not self.non_interactive:
@@ -910,7 +1367,7 @@ class KaraokeFinalise:
             if self.cdg_styles is None:
                 raise ValueError("CDG styles configuration is required when enable_cdg is True")
 
-            generator = CDGGenerator(output_dir=os.getcwd(), logger=self.logger)
+            generator = CDGGenerator(output_dir=self.get_track_dir(), logger=self.logger)
             cdg_file, mp3_file, zip_file = generator.generate_cdg_from_lrc(
                 lrc_file=input_files["karaoke_lrc"],
                 audio_file=input_files["instrumental_audio"],
@@ -926,7 +1383,7 @@ class KaraokeFinalise:
 
         if not os.path.isfile(output_files["final_karaoke_cdg_zip"]):
             self.logger.error(f"Failed to find any CDG ZIP file. Listing directory contents:")
-            for file in os.listdir():
+            for file in os.listdir(self.get_track_dir()):
                 self.logger.error(f" - {file}")
             raise Exception(f"Failed to create CDG ZIP file: {output_files['final_karaoke_cdg_zip']}")
 
@@ -935,7 +1392,7 @@ class KaraokeFinalise:
         # Extract the CDG ZIP file
         self.logger.info(f"Extracting CDG ZIP file: {output_files['final_karaoke_cdg_zip']}")
         with zipfile.ZipFile(output_files["final_karaoke_cdg_zip"], "r") as zip_ref:
-            zip_ref.extractall()
+            zip_ref.extractall(self.track_dir)
 
         if os.path.isfile(output_files["karaoke_mp3"]):
             self.logger.info(f"Found extracted MP3 file: {output_files['karaoke_mp3']}")
@@ -988,14 +1445,20 @@ class KaraokeFinalise:
         #     allow_empty=True,
         # )
 
-        orig_dir = os.getcwd()
-        os.chdir(os.path.dirname(orig_dir))
-        self.logger.info(f"Changed dir to parent directory: {os.getcwd()}")
+        if self.track_dir:
+            orig_dir = self.track_dir
+        else:
+            # The current directory is about to be moved, so step out of it first
+            orig_dir = os.getcwd()
+            os.chdir(os.path.dirname(orig_dir))
+            self.logger.info(f"Changed dir to parent directory: {os.getcwd()}")
 
         if self.dry_run:
             self.logger.info(f"DRY RUN: Would move original directory {orig_dir} to: {self.new_brand_code_dir_path}")
         else:
             os.rename(orig_dir, self.new_brand_code_dir_path)
+            if self.track_dir:
+                self.track_dir = self.new_brand_code_dir_path
 
         # Update output_files dictionary with the new paths after moving
         self.logger.info(f"Updating output file paths to reflect move to {self.new_brand_code_dir_path}")
@@ -1053,7 +1516,127 @@ class KaraokeFinalise:
                 
             self.logger.info(f"Copied final files to public share directory")
 
+            if self.incremental_public_share_sync:
+                copied_files = [dest_mp4_file, dest_720p_mp4_file]
+                if self.enable_cdg and "final_karaoke_cdg_zip" in output_files:
+                    copied_files.append(dest_zip_file)
+                self.append_to_public_share_journal(copied_files)
+
+    def append_to_public_share_journal(self, file_paths):
+        """Record files copied into the public share dir, so the next incremental sync uploads just those."""
+        journal_path = os.path.join(self.public_share_dir, PUBLIC_SHARE_SYNC_JOURNAL)
+        with open(journal_path, "a") as journal:
+            journal.write("".join(f"{os.path.relpath(file_path, self.public_share_dir)}\n" for file_path in file_paths))
+        self.logger.info(f"Added {len(file_paths)} files to public share sync journal: {journal_path}")
+
+    def take_public_share_journal(self):
+        """Move the journal aside for this sync, returning it opened and locked (or None if it is empty or missing).
+
+        Each sync gets a uniquely named copy, so concurrent syncs never share one, and files copied by other
+        finalisations while this sync runs go into a new journal. The copy stays locked until the sync succeeds
+        (release_public_share_journal) or fails (restore_public_share_journal puts the entries back). Copies left
+        behind by a sync which crashed are no longer locked, so are folded back into the journal first.
+        """
+        journal_path = os.path.join(self.public_share_dir, PUBLIC_SHARE_SYNC_JOURNAL)
+        with open(f"{journal_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+
+            for leftover_path in glob.glob(f"{glob.escape(journal_path)}.*.syncing"):
+                leftover = self.lock_public_share_journal_copy(leftover_path)
+                if leftover is not None:
+                    self.logger.info(f"Restoring entries from an interrupted public share sync: {leftover_path}")
+                    self.restore_public_share_journal(leftover)
+
+            fd, syncing_path = tempfile.mkstemp(prefix=f"{PUBLIC_SHARE_SYNC_JOURNAL}.", suffix=".syncing", dir=self.public_share_dir)
+            os.close(fd)
+            try:
+                os.replace(journal_path, syncing_path)
+            except FileNotFoundError:
+                os.remove(syncing_path)
+                return None
+            return self.lock_public_share_journal_copy(syncing_path)
+
+    def lock_public_share_journal_copy(self, syncing_path):
+        """Open and lock a journal copy, returning None if another sync holds it or it has already been removed."""
+        try:
+            syncing = open(syncing_path, "r+")
+        except FileNotFoundError:
+            return None
+        try:
+            fcntl.flock(syncing.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            syncing.close()
+            return None
+        # The sync which held it may have finished and removed it between us opening and locking it
+        if os.fstat(syncing.fileno()).st_nlink == 0:
+            syncing.close()
+            return None
+        return syncing
+
+    def release_public_share_journal(self, syncing):
+        """Remove a journal copy once its files have been synced, then unlock it."""
+        os.remove(syncing.name)
+        syncing.close()
+
+    def restore_public_share_journal(self, syncing):
+        """Put the entries from a failed sync back into the journal, so the next sync retries them."""
+        syncing.seek(0)
+        with open(os.path.join(self.public_share_dir, PUBLIC_SHARE_SYNC_JOURNAL), "a") as journal:
+            journal.write(syncing.read())
+        self.release_public_share_journal(syncing)
+
+    def sync_public_share_journal_to_rclone_destination(self):
+        """Upload only the files recorded in the public share journal, then clear it."""
+        self.logger.info(f"Copying files added to public share directory to rclone destination...")
+
+        if self.dry_run:
+            self.logger.info(f"DRY RUN: Would copy files listed in {PUBLIC_SHARE_SYNC_JOURNAL} to {self.rclone_destination}")
+            return
+
+        syncing = self.take_public_share_journal()
+        if syncing is None:
+            self.logger.info("Public share sync journal is empty, nothing to copy")
+            return
+
+        try:
+            # Skip duplicate entries and files since removed from the share
+            entries = dict.fromkeys(line.strip() for line in syncing.read().splitlines() if line.strip())
+            syncing.seek(0)
+            syncing.truncate()
+            syncing.write("".join(f"{entry}\n" for entry in entries if os.path.isfile(os.path.join(self.public_share_dir, entry))))
+            syncing.flush()
+
+            rclone_cmd = (
+                f"rclone copy -v --files-from {shlex.quote(syncing.name)}{self.get_rclone_transfer_options()} "
+                f"{shlex.quote(self.public_share_dir)} {shlex.quote(self.rclone_destination)}"
+            )
+            self.execute_command(rclone_cmd, "Copying new files to cloud destination")
+        except Exception:
+            self.restore_public_share_journal(syncing)
+            raise
+
+        self.release_public_share_journal(syncing)
+
+    def reconcile_public_share_dir_to_rclone_destination(self):
+        """Copy the whole public share dir to the rclone destination, catching anything the incremental syncs missed."""
+        syncing = None if self.dry_run else self.take_public_share_journal()
+        try:
+            self.sync_full_public_share_dir_to_rclone_destination()
+        except Exception:
+            if syncing:
+                self.restore_public_share_journal(syncing)
+            raise
+
+        if syncing:
+            self.release_public_share_journal(syncing)
+
     def sync_public_share_dir_to_rclone_destination(self):
+        if self.incremental_public_share_sync:
+            self.sync_public_share_journal_to_rclone_destination()
+        else:
+            self.sync_full_public_share_dir_to_rclone_destination()
+
+    def sync_full_public_share_dir_to_rclone_destination(self):
         self.logger.info(f"Copying public share directory to rclone destination...")
 
         # Delete .DS_Store files recursively before copying
@@ -1065,6 +1648,9 @@ class KaraokeFinalise:
                     self.logger.info(f"Deleted .DS_Store file: {file_path}")
 
         rclone_cmd = f"rclone copy -v {shlex.quote(self.public_share_dir)} {shlex.quote(self.rclone_destination)}"
+        # The sync journal and its in-progress copies are only needed locally
+        if self.incremental_public_share_sync:
+            rclone_cmd += f" --exclude {shlex.quote('/' + PUBLIC_SHARE_SYNC_JOURNAL + '*')}"
         self.execute_command(rclone_cmd, "Copying to cloud destination")
 
     def post_discord_notification(self):
@@ -1082,6 +1668,36 @@ class KaraokeFinalise:
             discord_message = f"New upload: {self.youtube_url}"
             self.post_discord_message(discord_message, self.discord_webhook_url)
 
+    def run_rclone_link_with_backoff(self, rclone_link_cmd):
+        """Run rclone link until the remote has indexed the folder, retrying with exponential backoff up to a deadline.
+
+        The link is usually available straight away, so this returns as soon as it is rather than always waiting.
+        The deadline is wall-clock time including the rclone runs themselves, which are killed if it passes. Raises the
+        last subprocess.CalledProcessError, or subprocess.TimeoutExpired, if the link isn't available by the deadline.
+        """
+        delay = RCLONE_LINK_INITIAL_RETRY_DELAY_SECONDS
+        deadline = time.monotonic() + RCLONE_LINK_DEADLINE_SECONDS
+        while True:
+            try:
+                self.logger.info(f"Running command: {rclone_link_cmd}")
+                result = subprocess.run(
+                    rclone_link_cmd, shell=True, check=True, capture_output=True, text=True, timeout=max(deadline - time.monotonic(), 0)
+                )
+
+                # Log command output for debugging
+                if result.stdout and result.stdout.strip():
+                    self.logger.debug(f"Command STDOUT: {result.stdout.strip()}")
+                if result.stderr and result.stderr.strip():
+                    self.logger.debug(f"Command STDERR: {result.stderr.strip()}")
+
+                return result.stdout.strip()
+            except subprocess.CalledProcessError as e:
+                if time.monotonic() + delay > deadline:
+                    raise
+                self.logger.info(f"Sharing link not available yet (exit code {e.returncode}), retrying in {delay} seconds...")
+                time.sleep(delay)
+                delay = min(delay * 2, RCLONE_LINK_MAX_RETRY_DELAY_SECONDS)
+
     def generate_organised_folder_sharing_link(self):
         self.logger.info(f"Getting Organised Folder sharing link for new brand code directory...")
 
@@ -1092,27 +1708,16 @@ class KaraokeFinalise:
             self.logger.info(f"DRY RUN: Would get sharing link with: {rclone_link_cmd}")
             return "https://file-sharing-service.com/example"
 
-        # Add a 5-second delay to allow dropbox to index the folder before generating a link
-        self.logger.info("Waiting 5 seconds before generating link...")
-        time.sleep(5)
-
         try:
-            self.logger.info(f"Running command: {rclone_link_cmd}")
-            result = subprocess.run(rclone_link_cmd, shell=True, check=True, capture_output=True, text=True)
-            
-            # Log command output for debugging
-            if result.stdout and result.stdout.strip():
-                self.logger.debug(f"Command STDOUT: {result.stdout.strip()}")
-            if result.stderr and result.stderr.strip():
-                self.logger.debug(f"Command STDERR: {result.stderr.strip()}")
-                
-            self.brand_code_dir_sharing_link = result.stdout.strip()
+            self.brand_code_dir_sharing_link = self.run_rclone_link_with_backoff(rclone_link_cmd)
             self.logger.info(f"Got organised folder sharing link: {self.brand_code_dir_sharing_link}")
         except subprocess.CalledProcessError as e:
             self.logger.error(f"Failed to get organised folder sharing link. Exit code: {e.returncode}")
             self.logger.error(f"Command output (stdout): {e.stdout}")
             self.logger.error(f"Command output (stderr): {e.stderr}")
             self.logger.error(f"Full exception: {e}")
+        except subprocess.TimeoutExpired as e:
+            self.logger.error(f"Failed to get organised folder sharing link, rclone link timed out after {e.timeout:.0f} seconds")
 
     def get_next_brand_code_server_side(self):
         """
@@ -1123,17 +1728,32 @@ class KaraokeFinalise:
             raise Exception("organised_dir_rclone_root not configured for server-side brand code generation")
 
         self.logger.info(f"Getting next brand code from remote organized directory: {self.organised_dir_rclone_root}")
-        
-        max_num = 0
-        pattern = re.compile(rf"^{re.escape(self.brand_prefix)}-(\d{{4}})")
 
-        # Use rclone lsf --dirs-only for clean, machine-readable directory listing
-        rclone_list_cmd = f"rclone lsf --dirs-only {shlex.quote(self.organised_dir_rclone_root)}"
-        
         if self.dry_run:
+            rclone_list_cmd = f"rclone lsf --dirs-only {shlex.quote(self.organised_dir_rclone_root)}"
             self.logger.info(f"DRY RUN: Would run: {rclone_list_cmd}")
             return f"{self.brand_prefix}-0001"
 
+        if self.brand_code_ledger is not None:
+            return self.allocate_brand_code_from_ledger(self.scan_brand_code_numbers_server_side)
+
+        max_num = max(self.scan_brand_code_numbers_server_side(), default=0)
+        next_seq_number = max_num + 1
+        brand_code = f"{self.brand_prefix}-{next_seq_number:04d}"
+
+        self.logger.info(f"Highest existing number: {max_num}, next sequence number for brand {self.brand_prefix} calculated as: {next_seq_number}")
+        return brand_code
+
+    def scan_brand_code_numbers_server_side(self):
+        """
+        List the sequence numbers of existing directories in the remote organised_dir using rclone.
+        Assumes directories are named with the format: BRAND-XXXX Artist - Title
+        """
+        pattern = re.compile(rf"^{re.escape(self.brand_prefix)}-(\d{{4}})")
+
+        # Use rclone lsf --dirs-only for clean, machine-readable directory listing
+        rclone_list_cmd = f"rclone lsf --dirs-only {shlex.quote(self.organised_dir_rclone_root)}"
+
         try:
             self.logger.info(f"Running command: {rclone_list_cmd}")
             result = subprocess.run(rclone_list_cmd, shell=True, check=True, capture_output=True, text=True)
@@ -1154,18 +1774,11 @@ class KaraokeFinalise:
                     # Check if directory matches our brand pattern
                     match = pattern.match(dir_name)
                     if match:
-                        num = int(match.group(1))
-                        max_num = max(max_num, num)
-                        matching_dirs.append((dir_name, num))
+                        matching_dirs.append((dir_name, int(match.group(1))))
 
             self.logger.info(f"Found {len(matching_dirs)} matching directories with pattern {self.brand_prefix}-XXXX")
+            return [num for _, num in matching_dirs]
 
-            next_seq_number = max_num + 1
-            brand_code = f"{self.brand_prefix}-{next_seq_number:04d}"
-            
-            self.logger.info(f"Highest existing number: {max_num}, next sequence number for brand {self.brand_prefix} calculated as: {next_seq_number}")
-            return brand_code
-            
         except subprocess.CalledProcessError as e:
             self.logger.error(f"Failed to list remote organized directory. Exit code: {e.returncode}")
             self.logger.error(f"Command output (stdout): {e.stdout}")
@@ -1186,20 +1799,75 @@ class KaraokeFinalise:
         self.logger.info(f"Uploading files to remote organized directory: {remote_dest}")
 
         # Get current directory path to upload
-        current_dir = os.getcwd()
-        
-        # Use rclone copy to upload the entire current directory to the remote destination
-        rclone_upload_cmd = f"rclone copy -v {shlex.quote(current_dir)} {shlex.quote(remote_dest)}"
-        
-        if self.dry_run:
-            self.logger.info(f"DRY RUN: Would upload current directory to: {remote_dest}")
-            self.logger.info(f"DRY RUN: Command: {rclone_upload_cmd}")
+        current_dir = self.get_track_dir()
+
+        if self.upload_deliverables:
+            self.upload_deliverables_to_remote(current_dir, remote_dest)
         else:
-            self.execute_command(rclone_upload_cmd, f"Uploading files to organized folder: {remote_dest}")
+            # Use rclone copy to upload the entire current directory to the remote destination
+            rclone_upload_cmd = f"rclone copy -v{self.get_rclone_transfer_options()} {shlex.quote(current_dir)} {shlex.quote(remote_dest)}"
+
+            if self.dry_run:
+                self.logger.info(f"DRY RUN: Would upload current directory to: {remote_dest}")
+                self.logger.info(f"DRY RUN: Command: {rclone_upload_cmd}")
+            else:
+                self.execute_command(rclone_upload_cmd, f"Uploading files to organized folder: {remote_dest}")
 
         # Generate a sharing link for the uploaded folder
         self.generate_organised_folder_sharing_link_server_side(remote_dest)
 
+    def get_rclone_transfer_options(self):
+        """Return rclone's parallel transfer/checker options if configured, otherwise an empty string to use its defaults."""
+        options = ""
+        if self.rclone_transfers:
+            options += f" --transfers {self.rclone_transfers}"
+        if self.rclone_checkers:
+            options += f" --checkers {self.rclone_checkers}"
+        return options
+
+    def get_upload_manifest(self, directory):
+        """List the files in directory belonging to the configured upload deliverable classes, as paths relative to it."""
+        suffixes = tuple(self.suffixes[key] for deliverable in self.upload_deliverables for key in UPLOAD_DELIVERABLE_CLASSES[deliverable])
+
+        manifest = []
+        for file_name in sorted(os.listdir(directory)):
+            if not os.path.isfile(os.path.join(directory, file_name)):
+                continue
+            if file_name.endswith(suffixes) or ("stems" in self.upload_deliverables and " (Instrumental" in file_name):
+                manifest.append(file_name)
+
+        if "stems" in self.upload_deliverables:
+            for root, _, file_names in os.walk(os.path.join(directory, "stems")):
+                manifest.extend(os.path.relpath(os.path.join(root, file_name), directory) for file_name in sorted(file_names))
+
+        return manifest
+
+    def upload_deliverables_to_remote(self, directory, remote_dest):
+        """Upload only the configured deliverable classes from directory to remote_dest.
+
+        rclone compares checksums, which it computes locally, so files already on the remote with the same content
+        are skipped, e.g. when a track is finalised again or an upload is retried.
+        """
+        manifest = self.get_upload_manifest(directory)
+        self.logger.info(f"Uploading {len(manifest)} files in deliverable classes {self.upload_deliverables} to {remote_dest}")
+
+        if self.dry_run:
+            self.logger.info(f"DRY RUN: Would upload these files to {remote_dest}: {manifest}")
+            return
+
+        fd, manifest_file = tempfile.mkstemp(prefix="karaoke-upload-manifest-", suffix=".txt")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write("".join(f"{path}\n" for path in manifest))
+
+            rclone_upload_cmd = (
+                f"rclone copy -v --checksum --files-from {shlex.quote(manifest_file)}{self.get_rclone_transfer_options()} "
+                f"{shlex.quote(directory)} {shlex.quote(remote_dest)}"
+            )
+            self.execute_command(rclone_upload_cmd, f"Uploading deliverables to organized folder: {remote_dest}")
+        finally:
+            os.remove(manifest_file)
+
     def generate_organised_folder_sharing_link_server_side(self, remote_path):
         """Generate a sharing link for the remote organized folder using rclone."""
         self.logger.info(f"Getting sharing link for remote organized folder: {remote_path}")
@@ -1211,31 +1879,20 @@ class KaraokeFinalise:
             self.brand_code_dir_sharing_link = "https://file-sharing-service.com/example"
             return
 
-        # Add a 10-second delay to allow the remote service to index the folder before generating a link
-        self.logger.info("Waiting 10 seconds before generating link...")
-        time.sleep(10)
-
         try:
-            self.logger.info(f"Running command: {rclone_link_cmd}")
-            result = subprocess.run(rclone_link_cmd, shell=True, check=True, capture_output=True, text=True)
-            
-            # Log command output for debugging
-            if result.stdout and result.stdout.strip():
-                self.logger.debug(f"Command STDOUT: {result.stdout.strip()}")
-            if result.stderr and result.stderr.strip():
-                self.logger.debug(f"Command STDERR: {result.stderr.strip()}")
-                
-            self.brand_code_dir_sharing_link = result.stdout.strip()
+            self.brand_code_dir_sharing_link = self.run_rclone_link_with_backoff(rclone_link_cmd)
             self.logger.info(f"Got organized folder sharing link: {self.brand_code_dir_sharing_link}")
         except subprocess.CalledProcessError as e:
             self.logger.error(f"Failed to get organized folder sharing link. Exit code: {e.returncode}")
             self.logger.error(f"Command output (stdout): {e.stdout}")
             self.logger.error(f"Command output (stderr): {e.stderr}")
             self.logger.error(f"Full exception: {e}")
+        except subprocess.TimeoutExpired as e:
+            self.logger.error(f"Failed to get organized folder sharing link, rclone link timed out after {e.timeout:.0f} seconds")
 
     def get_existing_brand_code(self):
         """Extract brand code from current directory name"""
-        current_dir = os.path.basename(os.getcwd())
+        current_dir = os.path.basename(self.get_track_dir())
         if " - " not in current_dir:
             raise Exception(f"Current directory '{current_dir}' does not match expected format 'BRAND-XXXX - Artist - Title'")
 
@@ -1246,19 +1903,56 @@ class KaraokeFinalise:
         self.logger.info(f"Using existing brand code: {brand_code}")
         return brand_code
 
+    def upload_to_youtube_or_prompt_for_video_id(self, artist, title, input_files, output_files, replace_existing=False):
+        try:
+            self.upload_final_mp4_to_youtube_with_title_thumbnail(artist, title, input_files, output_files, replace_existing)
+        except Exception as e:
+            self.logger.error(f"Failed to upload video to YouTube: {e}")
+            print("Please manually upload the video to YouTube.")
+            print()
+            self.youtube_video_id = input("Enter the manually uploaded YouTube video ID: ").strip()
+            self.youtube_url = f"{self.youtube_url_prefix}{self.youtube_video_id}"
+            self.logger.info(f"Using manually provided YouTube video ID: {self.youtube_video_id}")
+
+    def assign_brand_code_server_side(self):
+        # Generate brand code from remote directory listing
+        if self.keep_brand_code:
+            self.brand_code = self.get_existing_brand_code()
+        else:
+            self.brand_code = self.get_next_brand_code_server_side()
+
+    def organise_files_locally(self, artist, title, output_files):
+        if self.keep_brand_code:
+            self.brand_code = self.get_existing_brand_code()
+            self.new_brand_code_dir = os.path.basename(self.get_track_dir())
+            self.new_brand_code_dir_path = self.get_track_dir()
+        else:
+            self.brand_code = self.get_next_brand_code()
+            self.move_files_to_brand_code_folder(self.brand_code, artist, title, output_files)
+            # Update output file paths after moving
+            for key in output_files:
+                output_files[key] = os.path.join(self.new_brand_code_dir_path, os.path.basename(output_files[key]))
+
+    def assign_brand_code_for_public_share(self):
+        if self.server_side_mode and self.organised_dir_rclone_root:
+            self.brand_code = self.get_next_brand_code_server_side()
+        elif not self.server_side_mode and self.organised_dir:
+            self.brand_code = self.get_next_brand_code()
+        else:
+            # Fallback to timestamp-based brand code if no organized directory configured
+            import datetime
+            timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+            self.brand_code = f"{self.brand_prefix}-{timestamp}"
+            self.logger.warning(f"No organized directory configured, using timestamp-based brand code: {self.brand_code}")
+
     def execute_optional_features(self, artist, title, base_name, input_files, output_files, replace_existing=False):
         self.logger.info(f"Executing optional features...")
 
+        if self.concurrent_distribution:
+            return self.execute_optional_features_concurrently(artist, title, base_name, input_files, output_files, replace_existing)
+
         if self.youtube_upload_enabled:
-            try:
-                self.upload_final_mp4_to_youtube_with_title_thumbnail(artist, title, input_files, output_files, replace_existing)
-            except Exception as e:
-                self.logger.error(f"Failed to upload video to YouTube: {e}")
-                print("Please manually upload the video to YouTube.")
-                print()
-                self.youtube_video_id = input("Enter the manually uploaded YouTube video ID: ").strip()
-                self.youtube_url = f"{self.youtube_url_prefix}{self.youtube_video_id}"
-                self.logger.info(f"Using manually provided YouTube video ID: {self.youtube_video_id}")
+            self.upload_to_youtube_or_prompt_for_video_id(artist, title, input_files, output_files, replace_existing)
 
             if self.discord_notication_enabled:
                 self.post_discord_notification()
@@ -1266,12 +1960,8 @@ class KaraokeFinalise:
         # Handle folder organization - different logic for server-side vs local mode
         if self.server_side_mode and self.brand_prefix and self.organised_dir_rclone_root:
             self.logger.info("Executing server-side organization...")
-            
-            # Generate brand code from remote directory listing
-            if self.keep_brand_code:
-                self.brand_code = self.get_existing_brand_code()
-            else:
-                self.brand_code = self.get_next_brand_code_server_side()
+
+            self.assign_brand_code_server_side()
 
             # Upload files to organized folder via rclone
             self.upload_files_to_organized_folder_server_side(self.brand_code, artist, title)
@@ -1286,17 +1976,8 @@ class KaraokeFinalise:
 
         elif self.folder_organisation_enabled:
             self.logger.info("Executing local folder organization...")
-            
-            if self.keep_brand_code:
-                self.brand_code = self.get_existing_brand_code()
-                self.new_brand_code_dir = os.path.basename(os.getcwd())
-                self.new_brand_code_dir_path = os.getcwd()
-            else:
-                self.brand_code = self.get_next_brand_code()
-                self.move_files_to_brand_code_folder(self.brand_code, artist, title, output_files)
-                # Update output file paths after moving
-                for key in output_files:
-                    output_files[key] = os.path.join(self.new_brand_code_dir_path, os.path.basename(output_files[key]))
+
+            self.organise_files_locally(artist, title, output_files)
 
             if self.public_share_copy_enabled:
                 self.copy_final_files_to_public_share_dirs(self.brand_code, base_name, output_files)
@@ -1305,21 +1986,12 @@ class KaraokeFinalise:
                 self.sync_public_share_dir_to_rclone_destination()
 
             self.generate_organised_folder_sharing_link()
-        
+
         elif self.public_share_copy_enabled or self.public_share_rclone_enabled:
             # If only public share features are enabled (no folder organization), we still need a brand code
             self.logger.info("No folder organization enabled, but public share features require brand code...")
             if self.brand_prefix:
-                if self.server_side_mode and self.organised_dir_rclone_root:
-                    self.brand_code = self.get_next_brand_code_server_side()
-                elif not self.server_side_mode and self.organised_dir:
-                    self.brand_code = self.get_next_brand_code()
-                else:
-                    # Fallback to timestamp-based brand code if no organized directory configured
-                    import datetime
-                    timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
-                    self.brand_code = f"{self.brand_prefix}-{timestamp}"
-                    self.logger.warning(f"No organized directory configured, using timestamp-based brand code: {self.brand_code}")
+                self.assign_brand_code_for_public_share()
 
                 if self.public_share_copy_enabled:
                     self.copy_final_files_to_public_share_dirs(self.brand_code, base_name, output_files)
@@ -1327,6 +1999,76 @@ class KaraokeFinalise:
                 if self.public_share_rclone_enabled:
                     self.sync_public_share_dir_to_rclone_destination()
 
+    def get_distribution_steps(self, artist, title, base_name, input_files, output_files, replace_existing=False):
+        """Return the enabled distribution steps as (name, func, depends_on) tuples, in the order they'd run sequentially."""
+        steps = []
+        # Steps which need the brand code, or the final file paths after a local move, wait on this one
+        brand_code_step = None
+
+        if self.server_side_mode and self.brand_prefix and self.organised_dir_rclone_root:
+            brand_code_step = "brand_code"
+            steps.append((brand_code_step, self.assign_brand_code_server_side, []))
+            # The organised folder sharing link is generated once this upload has finished
+            steps.append(
+                ("organised_upload", lambda: self.upload_files_to_organized_folder_server_side(self.brand_code, artist, title), [brand_code_step])
+            )
+        elif self.folder_organisation_enabled:
+
+            def organise_files():
+                self.organise_files_locally(artist, title, output_files)
+                # The YouTube upload runs after the move here, and reads the title thumbnail from the input files
+                if not self.keep_brand_code:
+                    for key in input_files:
+                        if input_files[key]:
+                            input_files[key] = os.path.join(self.new_brand_code_dir_path, os.path.basename(input_files[key]))
+
+            brand_code_step = "organise_files"
+            steps.append((brand_code_step, organise_files, []))
+            steps.append(("sharing_link", self.generate_organised_folder_sharing_link, [brand_code_step]))
+        elif (self.public_share_copy_enabled or self.public_share_rclone_enabled) and self.brand_prefix:
+            brand_code_step = "brand_code"
+            steps.append((brand_code_step, self.assign_brand_code_for_public_share, []))
+
+        if brand_code_step is not None:
+            if self.public_share_copy_enabled:
+                steps.append(
+                    ("public_share_copy", lambda: self.copy_final_files_to_public_share_dirs(self.brand_code, base_name, output_files), [brand_code_step])
+                )
+            if self.public_share_rclone_enabled:
+                steps.append(("public_share_sync", self.sync_public_share_dir_to_rclone_destination, ["public_share_copy"]))
+
+        if self.youtube_upload_enabled:
+            # Locally organised files are moved, so upload from their new location rather than racing the move
+            youtube_depends_on = [brand_code_step] if self.folder_organisation_enabled and brand_code_step else []
+            steps.append(
+                (
+                    "youtube_upload",
+                    lambda: self.upload_to_youtube_or_prompt_for_video_id(artist, title, input_files, output_files, replace_existing),
+                    youtube_depends_on,
+                )
+            )
+            if self.discord_notication_enabled:
+                steps.append(("discord_notification", self.post_discord_notification, ["youtube_upload"]))
+
+        return steps
+
+    def execute_optional_features_concurrently(self, artist, title, base_name, input_files, output_files, replace_existing=False):
+        """Run the distribution steps at the same time where they don't depend on each other, recording how each one went.
+
+        A failed step doesn't stop the others (though its dependants are skipped); failures are logged and returned in
+        distribution_step_results rather than raised.
+        """
+        steps = self.get_distribution_steps(artist, title, base_name, input_files, output_files, replace_existing)
+        self.logger.info(f"Running distribution steps concurrently: {', '.join(name for name, _, _ in steps)}")
+
+        start_time = time.time()
+        self.distribution_step_results = run_steps_concurrently(steps, self.logger)
+        self.logger.info(f"Distribution steps finished in {time.time() - start_time:.1f} seconds")
+
+        unsuccessful = [name for name, result in self.distribution_step_results.items() if result["status"] != "succeeded"]
+        if unsuccessful:
+            self.logger.error(f"Distribution steps did not all succeed: {', '.join(unsuccessful)}, please complete them manually")
+
     def authenticate_gmail(self):
         """Authenticate and return a Gmail service object."""
         creds = None
@@ -1398,6 +2140,27 @@ class KaraokeFinalise:
 
         self.logger.info("Email template test complete. Check your Gmail drafts for the test email.")
 
+    def detect_encoder_capabilities(self, ffmpeg_path):
+        """Return (aac_codec, nvenc_available), reusing cached probe results for this ffmpeg binary and GPU driver if enabled."""
+        cache_key = self.encoder_probe_cache.get_cache_key(ffmpeg_path) if self.encoder_probe_cache else None
+        cached_results = self.encoder_probe_cache.get(cache_key) if cache_key else None
+
+        if cached_results is not None:
+            self.logger.info(
+                f"Using cached encoder probe results: AAC codec {cached_results['aac_codec']}, NVENC available: {cached_results['nvenc_available']}"
+            )
+            return cached_results["aac_codec"], cached_results["nvenc_available"]
+
+        aac_codec = self.detect_best_aac_codec()
+        nvenc_available = self.detect_nvenc_support()
+
+        if cache_key:
+            # NVENC may only be missing for now (e.g. the driver wasn't ready), so don't keep a negative result for long
+            ttl_seconds = None if nvenc_available else NEGATIVE_NVENC_TTL_SECONDS
+            self.encoder_probe_cache.put(cache_key, {"aac_codec": aac_codec, "nvenc_available": nvenc_available}, ttl_seconds=ttl_seconds)
+
+        return aac_codec, nvenc_available
+
     def detect_best_aac_codec(self):
         """Detect the best available AAC codec (aac_at > libfdk_aac > aac)"""
         self.logger.info("Detecting best available AAC codec...")
@@ -1615,6 +2378,31 @@ class KaraokeFinalise:
             else:
                 raise
 
+    def create_packages(self, input_files, output_files, artist, title):
+        """Create the enabled CDG and TXT ZIP packages. The TXT ZIP includes the MP3 created by the CDG step, so runs after it."""
+        if self.enable_cdg:
+            self.create_cdg_zip_file(input_files, output_files, artist, title)
+
+        if self.enable_txt:
+            self.create_txt_zip_file(input_files, output_files)
+
+    def create_packages_and_encode_videos(self, with_vocals_file, input_files, output_files, artist, title):
+        """Create the CDG/TXT packages while the final videos are encoded, as they only need the LRC and instrumental audio.
+
+        Both steps may prompt to overwrite existing files, so in interactive mode they run one after the other instead.
+        """
+        if not self.non_interactive or not (self.enable_cdg or self.enable_txt):
+            self.create_packages(input_files, output_files, artist, title)
+            self.remux_and_encode_output_video_files(with_vocals_file, input_files, output_files)
+            return
+
+        self.logger.info("Creating CDG/TXT packages in the background while encoding the final videos")
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            packages_future = executor.submit(self.create_packages, input_files, output_files, artist, title)
+            # If encoding fails, leaving the with block still waits for the packages, so nothing is left half-written
+            self.remux_and_encode_output_video_files(with_vocals_file, input_files, output_files)
+            packages_future.result()
+
     def process(self, replace_existing=False):
         if self.dry_run:
             self.logger.warning("Dry run enabled. No actions will be performed.")
@@ -1630,13 +2418,8 @@ class KaraokeFinalise:
         input_files = self.check_input_files_exist(base_name, with_vocals_file, instrumental_audio_file)
         output_files = self.prepare_output_filenames(base_name)
 
-        if self.enable_cdg:
-            self.create_cdg_zip_file(input_files, output_files, artist, title)
-
-        if self.enable_txt:
-            self.create_txt_zip_file(input_files, output_files)
-
-        self.remux_and_encode_output_video_files(with_vocals_file, input_files, output_files)
+        # with_vocals_file is only the file name, input_files has its path in the track directory
+        self.create_packages_and_encode_videos(input_files["with_vocals_mov"], input_files, output_files, artist, title)
 
         self.execute_optional_features(artist, title, base_name, input_files, output_files, replace_existing)
 
@@ -1655,6 +2438,9 @@ class KaraokeFinalise:
             "brand_code_dir_sharing_link": self.brand_code_dir_sharing_link,
         }
 
+        if self.distribution_step_results is not None:
+            result["distribution_steps"] = self.distribution_step_results
+
         if self.enable_cdg:
             result["final_karaoke_cdg_zip"] = output_files["final_karaoke_cdg_zip"]
 
@@ -11,6 +11,8 @@ import time
 import fcntl
 import errno
 import psutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import importlib.resources as pkg_resources
 import json
@@ -23,7 +25,8 @@ from .config import (
     get_existing_images,
     setup_ffmpeg_command,
 )
-from .metadata import extract_info_for_online_media, parse_track_metadata
+from .metadata import extract_info_for_online_media, extract_playlist_info_lazily, parse_track_metadata
+from .metadata_cache import MetadataCache
 from .file_handler import FileHandler
 from .audio_processor import AudioProcessor
 from .lyrics_processor import LyricsProcessor
@@ -67,10 +70,16 @@ class KaraokePrep:
         subtitle_offset_ms=0,
         # Style Configuration
         style_params_json=None,
+        render_cache_dir=None,
+        transcription_cache_dir=None,
         # Add the new parameter
         skip_separation=False,
         # YouTube/Online Configuration
         cookies_str=None,
+        metadata_cache_dir=None,
+        input_media_info=None,
+        lazy_playlist=False,
+        playlist_prefetch=2,
     ):
         self.log_level = log_level
         self.log_formatter = log_formatter
@@ -125,9 +134,15 @@ class KaraokePrep:
         # Style Config - Keep needed ones
         self.render_bounding_boxes = render_bounding_boxes # Passed to VideoGenerator
         self.style_params_json = style_params_json # Passed to LyricsProcessor
+        self.render_cache_dir = render_cache_dir # Passed to VideoGenerator
+        self.transcription_cache_dir = transcription_cache_dir # Passed to LyricsProcessor
 
         # YouTube/Online Config
         self.cookies_str = cookies_str # Passed to metadata extraction and file download
+        self.metadata_cache = MetadataCache(metadata_cache_dir, self.logger) if metadata_cache_dir else None # Passed to metadata extraction
+        self.input_media_info = input_media_info # Pre-resolved yt-dlp info (e.g. from the bulk metadata pre-pass), skips the lookup
+        self.lazy_playlist = lazy_playlist # Stream playlist entries and resolve each just in time, see process_playlist_lazily
+        self.playlist_prefetch = playlist_prefetch # Number of playlist entries to resolve ahead of the track being processed
 
         # Load style parameters using the config module
         self.style_params = load_style_params(self.style_params_json, self.logger)
@@ -171,6 +186,7 @@ class KaraokePrep:
              skip_transcription_review=self.skip_transcription_review,
              render_video=self.render_video,
              subtitle_offset_ms=self.subtitle_offset_ms,
+             transcription_cache_dir=self.transcription_cache_dir,
         )
 
         self.video_generator = VideoGenerator(
@@ -179,6 +195,7 @@ class KaraokePrep:
              render_bounding_boxes=self.render_bounding_boxes,
              output_png=self.output_png,
              output_jpg=self.output_jpg,
+             render_cache_dir=self.render_cache_dir,
         )
 
         self.logger.debug(f"Initialized title_format with extra_text: {self.title_format['extra_text']}")
@@ -202,7 +219,9 @@ class KaraokePrep:
     # Compatibility methods for tests - these call the new functions in metadata.py
     def extract_info_for_online_media(self, input_url=None, input_artist=None, input_title=None):
         """Compatibility method that calls the function in metadata.py"""
-        self.extracted_info = extract_info_for_online_media(input_url, input_artist, input_title, self.logger, self.cookies_str)
+        self.extracted_info = extract_info_for_online_media(
+            input_url, input_artist, input_title, self.logger, self.cookies_str, metadata_cache=self.metadata_cache
+        )
         return self.extracted_info
 
     def parse_single_track_metadata(self, input_artist, input_title):
@@ -247,7 +266,9 @@ class KaraokePrep:
                 self.logger.warning(f"Input media '{self.input_media}' is not a file and self.url was not set. Attempting to treat as URL.")
                 # This path requires calling extract/parse again, less efficient
                 try:
-                    extracted = extract_info_for_online_media(self.input_media, self.artist, self.title, self.logger, self.cookies_str)
+                    extracted = extract_info_for_online_media(
+                        self.input_media, self.artist, self.title, self.logger, self.cookies_str, metadata_cache=self.metadata_cache
+                    )
                     if extracted:
                          metadata_result = parse_track_metadata(
                              extracted, self.artist, self.title, self.persistent_artist, self.logger
@@ -632,6 +653,56 @@ class KaraokePrep:
         else:
             raise Exception(f"Failed to find 'entries' in playlist, cannot process")
 
+    def _resolve_next_playlist_entry(self, entries):
+        """Pull the next flat entry from a lazy playlist and resolve its full info; None once the playlist is exhausted."""
+        entry = next(entries, None)
+        if entry is None:
+            return None
+
+        entry_url = entry.get("url") or entry.get("webpage_url")
+        try:
+            return extract_info_for_online_media(entry_url, None, None, self.logger, self.cookies_str, metadata_cache=self.metadata_cache)
+        except Exception as e:
+            self.logger.warning(f"Failed to resolve full info for playlist entry {entry_url}, using flat entry instead: {str(e)}")
+            return entry
+
+    async def process_playlist_lazily(self):
+        """Process a playlist whose entries are a generator of flat entries, as returned by extract_playlist_info_lazily.
+
+        Each entry's full info is resolved just in time in a background thread, playlist_prefetch entries ahead of the
+        track being processed, so the first track starts straight away and only a few info dicts are held at once.
+        """
+        if self.artist is None or self.title is None:
+            raise Exception("Error: Artist and Title are required for processing a local file.")
+
+        if "entries" not in self.extracted_info:
+            raise Exception(f"Failed to find 'entries' in playlist, cannot process")
+
+        entries = iter(self.extracted_info["entries"])
+        track_results = []
+        loop = asyncio.get_running_loop()
+
+        # A single worker, as the entries generator must not be advanced from two threads at once
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            lookahead = deque(
+                loop.run_in_executor(executor, self._resolve_next_playlist_entry, entries) for _ in range(self.playlist_prefetch + 1)
+            )
+            while lookahead:
+                entry_info = await lookahead.popleft()
+                if entry_info is None:
+                    break
+                lookahead.append(loop.run_in_executor(executor, self._resolve_next_playlist_entry, entries))
+
+                self.extracted_info = entry_info
+                self.logger.info(f"Processing playlist entry with title: {self.extracted_info.get('title')}")
+                self.parse_single_track_metadata(self.artist, self.title)
+                if not self.dry_run:
+                    track_results.append(await self.prep_single_track())
+                self.artist = self.persistent_artist
+                self.title = None
+
+        return track_results
+
     async def process_folder(self):
         if self.filename_pattern is None or self.artist is None:
             raise Exception("Error: Filename pattern and artist are required for processing a folder.")
@@ -684,10 +755,29 @@ class KaraokePrep:
             return [await self.prep_single_track()]
         else:
             self.url = self.input_media
-            # Use the imported extract_info_for_online_media function
-            self.extracted_info = extract_info_for_online_media(
-                input_url=self.url, input_artist=self.artist, input_title=self.title, logger=self.logger, cookies_str=self.cookies_str
-            )
+            if self.input_media_info is not None:
+                self.logger.info("Using pre-resolved metadata for input media, skipping online lookup")
+                self.extracted_info = self.input_media_info
+            else:
+                if self.lazy_playlist and self.url:
+                    # Any other URL comes back fully resolved, so isn't looked up a second time below
+                    self.extracted_info = extract_playlist_info_lazily(
+                        self.url, self.logger, self.cookies_str, metadata_cache=self.metadata_cache
+                    )
+                    if "entries" in self.extracted_info:
+                        self.persistent_artist = self.artist
+                        self.logger.info(f"Input URL is a playlist, streaming entries lazily with persistent artist: {self.persistent_artist}")
+                        return await self.process_playlist_lazily()
+                else:
+                    # Use the imported extract_info_for_online_media function
+                    self.extracted_info = extract_info_for_online_media(
+                        input_url=self.url,
+                        input_artist=self.artist,
+                        input_title=self.title,
+                        logger=self.logger,
+                        cookies_str=self.cookies_str,
+                        metadata_cache=self.metadata_cache,
+                    )
 
             if self.extracted_info and "playlist_count" in self.extracted_info:
                 self.persistent_artist = self.artist
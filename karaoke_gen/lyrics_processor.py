@@ -7,12 +7,65 @@ from lyrics_transcriber import LyricsTranscriber, OutputConfig, TranscriberConfi
 from lyrics_transcriber.core.controller import LyricsControllerResult
 from dotenv import load_dotenv
 from .utils import sanitize_filename
+from .transcription_cache import LocalDirectoryTranscriptionCacheStorage, TranscriptionCache
+
+# Maximum length of a lyrics line, in characters
+MAX_LINE_LENGTH = 36
+
+_AND_PATTERN = re.compile(" and ")
+
+
+def _find_best_split_point(line):
+    """
+    Find the best split point in a line. In order of preference: a comma within 20 characters of the middle
+    word, the " and " closest to the middle of the line, the middle word, then a forced split at the maximum
+    length - in each case only if the first part is within the maximum length.
+
+    Each candidate is found in a single scan, without logging, as this runs for every line of every song.
+    """
+    words = line.split()
+    mid_word_index = len(words) // 2
+    # Length of the words before the middle word, joined by single spaces
+    mid_point = len(" ".join(words[:mid_word_index]))
+
+    # Check for a comma within one or two words of the middle word
+    comma_index = line.find(",")
+    while comma_index != -1 and comma_index < mid_point + 20:
+        if mid_point - comma_index < 20 and len(line[: comma_index + 1].strip()) <= MAX_LINE_LENGTH:
+            return comma_index + 1  # Include the comma in the first line
+        comma_index = line.find(",", comma_index + 1)
+
+    # Check for the 'and' closest to the middle of the line
+    line_mid_point = len(line) // 2
+    best_and_split, best_and_distance = None, None
+    for match in _AND_PATTERN.finditer(line):
+        and_distance = abs(match.start() - line_mid_point)
+        if (best_and_distance is None or and_distance < best_and_distance) and len(line[: match.end()].strip()) <= MAX_LINE_LENGTH:
+            best_and_split, best_and_distance = match.end(), and_distance
+    if best_and_split is not None:
+        return best_and_split
+
+    # If no better split point is found, try splitting at the middle word
+    if len(words) > 2 and mid_word_index > 0 and mid_point <= MAX_LINE_LENGTH:
+        return mid_point
+
+    # If the line is still too long, forcibly split at the maximum length
+    if len(line) > MAX_LINE_LENGTH:
+        return MAX_LINE_LENGTH
 
 
 # Placeholder class or functions for lyrics processing
 class LyricsProcessor:
     def __init__(
-        self, logger, style_params_json, lyrics_file, skip_transcription, skip_transcription_review, render_video, subtitle_offset_ms
+        self,
+        logger,
+        style_params_json,
+        lyrics_file,
+        skip_transcription,
+        skip_transcription_review,
+        render_video,
+        subtitle_offset_ms,
+        transcription_cache_dir=None,
     ):
         self.logger = logger
         self.style_params_json = style_params_json
@@ -21,50 +74,18 @@ class LyricsProcessor:
         self.skip_transcription_review = skip_transcription_review
         self.render_video = render_video
         self.subtitle_offset_ms = subtitle_offset_ms
+        self.transcription_cache = None
+        if transcription_cache_dir:
+            self.transcription_cache = TranscriptionCache(LocalDirectoryTranscriptionCacheStorage(transcription_cache_dir, logger), logger)
 
     def find_best_split_point(self, line):
         """
         Find the best split point in a line based on the specified criteria.
         """
-
-        self.logger.debug(f"Finding best_split_point for line: {line}")
-        words = line.split()
-        mid_word_index = len(words) // 2
-        self.logger.debug(f"words: {words} mid_word_index: {mid_word_index}")
-
-        # Check for a comma within one or two words of the middle word
-        if "," in line:
-            mid_point = len(" ".join(words[:mid_word_index]))
-            comma_indices = [i for i, char in enumerate(line) if char == ","]
-
-            for index in comma_indices:
-                if abs(mid_point - index) < 20 and len(line[: index + 1].strip()) <= 36:
-                    self.logger.debug(
-                        f"Found comma at index {index} which is within 20 characters of mid_point {mid_point} and results in a suitable line length, accepting as split point"
-                    )
-                    return index + 1  # Include the comma in the first line
-
-        # Check for 'and'
-        if " and " in line:
-            mid_point = len(line) // 2
-            and_indices = [m.start() for m in re.finditer(" and ", line)]
-            for index in sorted(and_indices, key=lambda x: abs(x - mid_point)):
-                if len(line[: index + len(" and ")].strip()) <= 36:
-                    self.logger.debug(f"Found 'and' at index {index} which results in a suitable line length, accepting as split point")
-                    return index + len(" and ")
-
-        # If no better split point is found, try splitting at the middle word
-        if len(words) > 2 and mid_word_index > 0:
-            split_at_middle = len(" ".join(words[:mid_word_index]))
-            if split_at_middle <= 36:
-                self.logger.debug(f"Splitting at middle word index: {mid_word_index}")
-                return split_at_middle
-
-        # If the line is still too long, forcibly split at the maximum length
-        forced_split_point = 36
-        if len(line) > forced_split_point:
-            self.logger.debug(f"Line is still too long, forcibly splitting at position {forced_split_point}")
-            return forced_split_point
+        split_point = _find_best_split_point(line)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Found best_split_point {split_point} for line: {line}")
+        return split_point
 
     def process_line(self, line):
         """
@@ -75,15 +96,15 @@ class LyricsProcessor:
         iteration_count = 0
         max_iterations = 100  # Failsafe limit
 
-        while len(line) > 36:
+        while len(line) > MAX_LINE_LENGTH:
             if iteration_count > max_iterations:
                 self.logger.error(f"Maximum iterations exceeded in process_line for line: {line}")
                 break
 
             # Check if the line contains parentheses
-            if "(" in line and ")" in line:
-                start_paren = line.find("(")
-                end_paren = line.find(")") + 1
+            start_paren = line.find("(")
+            end_paren = line.find(")") + 1
+            if start_paren != -1 and end_paren:
                 if end_paren < len(line) and line[end_paren] == ",":
                     end_paren += 1
 
@@ -92,7 +113,7 @@ class LyricsProcessor:
                 processed_lines.append(line[start_paren:end_paren].strip())
                 line = line[end_paren:].strip()
             else:
-                split_point = self.find_best_split_point(line)
+                split_point = _find_best_split_point(line)
                 processed_lines.append(line[:split_point].strip())
                 line = line[split_point:].strip()
 
@@ -103,6 +124,23 @@ class LyricsProcessor:
 
         return processed_lines
 
+    def process_lyrics(self, lyrics):
+        """
+        Process a whole lyrics document (a string, or an iterable of lines) so every line is within the
+        maximum length. Returns the same lines as calling process_line on each line in turn.
+        """
+        if isinstance(lyrics, str):
+            lyrics = lyrics.splitlines()
+
+        processed_lines = []
+        for line in lyrics:
+            if len(line) > MAX_LINE_LENGTH:
+                processed_lines.extend(self.process_line(line))
+            elif line:
+                processed_lines.append(line)
+
+        return processed_lines
+
     def transcribe_lyrics(self, input_audio_wav, artist, title, track_output_dir, lyrics_artist=None, lyrics_title=None):
         """
         Transcribe lyrics for a track.
@@ -247,6 +285,10 @@ class LyricsProcessor:
             logger=self.logger,
         )
 
+        # Reuse a previous transcription of the same audio, e.g. when re-running or editing lyrics
+        if self.transcription_cache:
+            self.transcription_cache.attach(transcriber, input_audio_wav)
+
         # Process and get results
         results: LyricsControllerResult = transcriber.process()
         self.logger.info(f"Transcriber Results Filepaths:")
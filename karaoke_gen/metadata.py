@@ -1,10 +1,53 @@
 import logging
+from contextlib import ExitStack
 import yt_dlp.YoutubeDL as ydl
 
-def extract_info_for_online_media(input_url, input_artist, input_title, logger, cookies_str=None):
-    """Extracts metadata using yt-dlp, either from a URL or via search."""
+def extract_info_for_online_media(input_url, input_artist, input_title, logger, cookies_str=None, metadata_cache=None):
+    """Extracts metadata using yt-dlp, either from a URL or via search.
+
+    If a MetadataCache is given, cached results (and cached "not found" failures) are returned without calling yt-dlp.
+    """
     logger.info(f"Extracting info for input_url: {input_url} input_artist: {input_artist} input_title: {input_title}")
-    
+
+    if metadata_cache is None:
+        return _extract_info_with_ytdlp(input_url, input_artist, input_title, logger, cookies_str)
+
+    cache_key = metadata_cache.get_cache_key(input_url, input_artist, input_title)
+    cached_info = _get_cached_info(metadata_cache, cache_key, logger)
+    if cached_info is not None:
+        return cached_info
+
+    try:
+        extracted_info = _extract_info_with_ytdlp(input_url, input_artist, input_title, logger, cookies_str)
+    except Exception as e:
+        if metadata_cache.is_not_found_error(e):
+            metadata_cache.put_error(cache_key, e)
+        raise
+
+    # Playlists are expanded entry by entry, so only single tracks are cached
+    if "entries" not in extracted_info and "playlist_count" not in extracted_info:
+        metadata_cache.put(cache_key, extracted_info)
+
+    return extracted_info
+
+
+def _get_cached_info(metadata_cache, cache_key, logger):
+    """Return the cached info for cache_key, or None on a cache miss. A cached lookup failure is raised again."""
+    cached = metadata_cache.get(cache_key)
+    if cached is None:
+        return None
+
+    cached_info, cached_error, cached_error_type = cached
+    if cached_info is not None:
+        logger.info(f"Using cached metadata for {cache_key}")
+        return cached_info
+    logger.info(f"Using cached lookup failure for {cache_key}: {cached_error}")
+    # Raise IndexError for cached "no search results", to match the uncached behaviour
+    raise (IndexError if cached_error_type == "IndexError" else Exception)(cached_error)
+
+
+def _get_ydl_base_opts(logger, cookies_str=None):
+    """Build the yt-dlp options shared by all metadata lookups, writing cookies (if any) to a temporary file."""
     # Set up yt-dlp options with enhanced anti-detection
     base_opts = {
         "quiet": True,
@@ -37,7 +80,23 @@ def extract_info_for_online_media(input_url, input_artist, input_title, logger,
             base_opts['cookiefile'] = f.name
     else:
         logger.info("No cookies provided - attempting standard extraction")
-    
+
+    return base_opts
+
+
+def _remove_cookie_file(base_opts):
+    """Clean up the temporary cookie file created by _get_ydl_base_opts, if any."""
+    if 'cookiefile' in base_opts:
+        try:
+            import os
+            os.unlink(base_opts['cookiefile'])
+        except:
+            pass
+
+
+def _extract_info_with_ytdlp(input_url, input_artist, input_title, logger, cookies_str=None):
+    base_opts = _get_ydl_base_opts(logger, cookies_str)
+
     extracted_info = None
     try:
         if input_url is not None:
@@ -69,12 +128,65 @@ def extract_info_for_online_media(input_url, input_artist, input_title, logger,
         
     finally:
         # Clean up temporary cookie file if it was created
-        if cookies_str and 'cookiefile' in base_opts:
-            try:
-                import os
-                os.unlink(base_opts['cookiefile'])
-            except:
-                pass
+        _remove_cookie_file(base_opts)
+
+
+def extract_playlist_info_lazily(input_url, logger, cookies_str=None, metadata_cache=None):
+    """Extracts the info for a URL without resolving playlist entries up front.
+
+    For a playlist, "entries" is a generator of flat entries (url, id, title), fetched page by page as it is
+    consumed, so processing can start on the first track straight away. Any other URL returns its fully processed
+    info, as from extract_info_for_online_media, resolved from the same extraction rather than a second one.
+
+    If a MetadataCache is given, a cached single track is returned without calling yt-dlp (playlists aren't cached).
+    """
+    logger.info(f"Extracting playlist info lazily for input_url: {input_url}")
+
+    cache_key = metadata_cache.get_cache_key(input_url, None, None) if metadata_cache is not None else None
+    if cache_key is not None:
+        cached_info = _get_cached_info(metadata_cache, cache_key, logger)
+        if cached_info is not None:
+            return cached_info
+
+    base_opts = _get_ydl_base_opts(logger, cookies_str)
+    base_opts.update({"extract_flat": "in_playlist", "lazy_playlist": True})
+
+    with ExitStack() as cleanup:
+        cleanup.callback(_remove_cookie_file, base_opts)
+        ydl_instance = ydl(base_opts)
+        cleanup.enter_context(ydl_instance)
+
+        try:
+            # process=False returns the extractor's own result, whose entries are a lazy generator for playlists
+            extracted_info = ydl_instance.extract_info(input_url, download=False, process=False)
+            if not extracted_info:
+                raise Exception(f"Failed to extract info for URL: {input_url}")
+
+            if "entries" not in extracted_info:
+                # Resolve formats etc. from the page already fetched, rather than extracting the URL again
+                extracted_info = ydl_instance.process_ie_result(extracted_info, download=False)
+        except Exception as e:
+            if cache_key is not None and metadata_cache.is_not_found_error(e):
+                metadata_cache.put_error(cache_key, e)
+            raise
+
+        if "entries" not in extracted_info:
+            if cache_key is not None:
+                metadata_cache.put(cache_key, extracted_info)
+            return extracted_info
+
+        # The yt-dlp instance (and its cookie file) must stay usable until the last page of entries is fetched,
+        # so they're closed by the entries generator instead
+        entries_cleanup = cleanup.pop_all()
+
+    def iter_entries(entries):
+        with entries_cleanup:
+            for entry in entries or []:
+                if entry:
+                    yield entry
+
+    extracted_info["entries"] = iter_entries(extracted_info["entries"])
+    return extracted_info
 
 
 def parse_track_metadata(extracted_info, current_artist, current_title, persistent_artist, logger):
@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import sqlite3
+from contextlib import contextmanager
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Fields kept from yt-dlp info dicts: those parse_track_metadata and KaraokePrep use. "url" isn't kept, as for a
+# resolved video it can be a signed direct media URL which expires long before the cache entry does
+CACHED_INFO_FIELDS = ("webpage_url", "extractor", "extractor_key", "ie_key", "id", "title", "uploader", "duration")
+
+# Query parameters which only track where a link was shared from, and don't change what it points to
+IGNORED_URL_QUERY_PARAMS = {"si", "feature", "pp", "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content"}
+
+YOUTUBE_HOSTS = {"youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com"}
+
+DEFAULT_URL_TTL_SECONDS = 30 * 24 * 60 * 60
+DEFAULT_SEARCH_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_NEGATIVE_TTL_SECONDS = 60 * 60
+
+# Error messages which mean the media doesn't exist (rather than a transient or auth failure), so are worth caching
+NOT_FOUND_ERROR_MESSAGES = ("no search results", "video unavailable", "private video", "has been removed", "does not exist", "not available")
+
+
+def normalise_url(url):
+    """Normalise a media URL so equivalent links share a cache key, e.g. youtu.be and youtube.com watch links."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+    host = parts.netloc.lower()
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key not in IGNORED_URL_QUERY_PARAMS]
+
+    if host == "youtu.be" and parts.path.strip("/"):
+        return f"youtube:{parts.path.strip('/')}"
+    if host in YOUTUBE_HOSTS and parts.path == "/watch":
+        video_id = dict(query).get("v")
+        if video_id and "list" not in dict(query):
+            return f"youtube:{video_id}"
+
+    return urlunsplit((scheme, host, parts.path.rstrip("/"), urlencode(sorted(query)), ""))
+
+
+def normalise_search_query(artist, title):
+    """Normalise an artist/title search so differences in case and whitespace share a cache key."""
+    return " ".join(f"{artist or ''} {title or ''}".lower().split())
+
+
+def get_cacheable_info(info):
+    """Return the CACHED_INFO_FIELDS of a yt-dlp info dict, which can be stored and passed to parse_track_metadata later."""
+    cacheable_info = {field: info[field] for field in CACHED_INFO_FIELDS if field in info}
+    # Flat search results only have "url", which is the video's page rather than its media
+    if "webpage_url" not in cacheable_info and "url" in info:
+        cacheable_info["webpage_url"] = info["url"]
+    return cacheable_info
+
+
+class MetadataCache:
+    """SQLite cache of online media metadata lookups, keyed by normalised URL or by (artist, title) search query.
+
+    Each entry has its own expiry time. Failed lookups are cached too (negative caching) with a shorter TTL, so
+    repeatedly submitting something which can't be found doesn't keep hitting the rate limit.
+    """
+
+    def __init__(
+        self,
+        cache_dir,
+        logger,
+        url_ttl_seconds=DEFAULT_URL_TTL_SECONDS,
+        search_ttl_seconds=DEFAULT_SEARCH_TTL_SECONDS,
+        negative_ttl_seconds=DEFAULT_NEGATIVE_TTL_SECONDS,
+    ):
+        self.logger = logger
+        self.url_ttl_seconds = url_ttl_seconds
+        self.search_ttl_seconds = search_ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, "metadata.sqlite3")
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS metadata ("
+                "cache_key TEXT PRIMARY KEY, info TEXT, error TEXT, error_type TEXT, created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # A connection per operation keeps the cache safe to share between threads
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get_cache_key(self, input_url, input_artist, input_title):
+        if input_url is not None:
+            return f"url:{normalise_url(input_url)}"
+        return f"search:{normalise_search_query(input_artist, input_title)}"
+
+    def get(self, cache_key):
+        """Return (info, error, error_type) for an unexpired entry, or None on a cache miss."""
+        try:
+            with self._connect() as connection:
+                row = connection.execute(
+                    "SELECT info, error, error_type FROM metadata WHERE cache_key = ? AND expires_at > ?", (cache_key, time.time())
+                ).fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Metadata cache lookup failed for {cache_key}: {e}")
+            return None
+
+        if row is None:
+            return None
+
+        info, error, error_type = row
+        return json.loads(info) if info is not None else None, error, error_type
+
+    def put(self, cache_key, info):
+        """Cache the fields of a successful lookup which are needed to process the track."""
+        cached_info = get_cacheable_info(info)
+        ttl_seconds = self.url_ttl_seconds if cache_key.startswith("url:") else self.search_ttl_seconds
+        self._store(cache_key, json.dumps(cached_info), None, None, ttl_seconds)
+
+    def is_not_found_error(self, error):
+        """Whether a lookup error means the media wasn't found; other errors (network, rate limits, sign-in) aren't cached."""
+        return isinstance(error, IndexError) or any(message in str(error).lower() for message in NOT_FOUND_ERROR_MESSAGES)
+
+    def put_error(self, cache_key, error):
+        """Cache a failed lookup, so it is retried only once negative_ttl_seconds has passed."""
+        self._store(cache_key, None, str(error), type(error).__name__, self.negative_ttl_seconds)
+
+    def _store(self, cache_key, info, error, error_type, ttl_seconds):
+        now = time.time()
+        try:
+            with self._connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO metadata (cache_key, info, error, error_type, created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (cache_key, info, error, error_type, now, now + ttl_seconds),
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to store {cache_key} in metadata cache: {e}")
+
+    def clear_expired(self):
+        """Delete expired entries, returning how many were removed."""
+        with self._connect() as connection:
+            return connection.execute("DELETE FROM metadata WHERE expires_at <= ?", (time.time(),)).rowcount
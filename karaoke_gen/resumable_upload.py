@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import tempfile
+import requests
+
+YOUTUBE_UPLOAD_URL = "https://www.googleapis.com/upload/youtube/v3/videos"
+
+# Chunks other than the last must be a multiple of 256 KiB
+CHUNK_SIZE_MULTIPLE = 256 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Statuses worth retrying the same session for, rather than failing the upload
+RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+# Statuses meaning the session has expired or been cancelled, so the upload must start again
+EXPIRED_SESSION_STATUS_CODES = {404, 410}
+
+
+class ResumableUploadError(Exception):
+    pass
+
+
+class ResumableUpload:
+    """Uploads a file with Google's resumable upload protocol, in chunks, persisting the session to a JSON state file.
+
+    If the process dies part way through, running the same upload again asks the server how many bytes it already has
+    and continues from there, instead of starting again from zero. The state file is removed once the upload completes.
+
+    session is any requests.Session-like object which adds authentication, e.g. google.auth's AuthorizedSession.
+    progress_callback, if given, is called with (bytes_uploaded, total_bytes) after each chunk.
+    """
+
+    def __init__(
+        self,
+        session,
+        upload_url,
+        params,
+        metadata,
+        file_path,
+        mimetype,
+        state_file,
+        logger,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        progress_callback=None,
+        max_retries=5,
+    ):
+        if chunk_size % CHUNK_SIZE_MULTIPLE != 0:
+            raise ValueError(f"Chunk size must be a multiple of {CHUNK_SIZE_MULTIPLE} bytes, got {chunk_size}")
+
+        self.session = session
+        self.upload_url = upload_url
+        self.params = params
+        self.metadata = metadata
+        self.file_path = os.path.abspath(file_path)
+        self.mimetype = mimetype
+        self.state_file = state_file
+        self.logger = logger
+        self.chunk_size = chunk_size
+        self.progress_callback = progress_callback
+        self.max_retries = max_retries
+
+    def _file_fingerprint(self):
+        stat = os.stat(self.file_path)
+        return {"file_path": self.file_path, "file_size": stat.st_size, "file_mtime": stat.st_mtime, "metadata": self.metadata}
+
+    def load_state(self):
+        """Return the saved session for this file and metadata, or None if there isn't one or the file has changed."""
+        try:
+            with open(self.state_file, "r") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Ignoring unreadable upload state file {self.state_file}: {e}")
+            return None
+
+        if {key: state.get(key) for key in ("file_path", "file_size", "file_mtime", "metadata")} != self._file_fingerprint():
+            self.logger.info(f"Saved upload session in {self.state_file} is for a different file or metadata, starting a new upload")
+            return None
+        return state
+
+    def save_state(self, session_uri, offset):
+        """Write the session URI and confirmed byte offset, via a temporary file so the state is never left partially written."""
+        state = {**self._file_fingerprint(), "session_uri": session_uri, "offset": offset}
+        fd, temp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=os.path.dirname(os.path.abspath(self.state_file)))
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.state_file)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def clear_state(self):
+        if os.path.exists(self.state_file):
+            os.remove(self.state_file)
+
+    def _sleep_before_retry(self, retries, error, description):
+        """Wait with exponential backoff before retry number `retries`, raising once max_retries have been used up."""
+        if retries > self.max_retries:
+            raise ResumableUploadError(f"{description} failed after {self.max_retries} retries: {error}")
+        delay = 2**retries
+        self.logger.warning(f"{description} failed ({error}), retrying in {delay} seconds")
+        time.sleep(delay)
+
+    def start_session(self, file_size):
+        """Create a new upload session, returning its URI. Connection errors and 5xx responses are retried with backoff."""
+        retries = 0
+        while True:
+            try:
+                response = self.session.post(
+                    self.upload_url,
+                    params={**self.params, "uploadType": "resumable"},
+                    json=self.metadata,
+                    headers={"X-Upload-Content-Type": self.mimetype, "X-Upload-Content-Length": str(file_size)},
+                )
+            except requests.RequestException as e:
+                error = str(e)
+            else:
+                if response.status_code == 200 and "Location" in response.headers:
+                    return response.headers["Location"]
+                error = f"HTTP {response.status_code} {response.text}"
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    raise ResumableUploadError(f"Failed to start resumable upload: {error}")
+
+            retries += 1
+            self._sleep_before_retry(retries, error, "Starting resumable upload")
+
+    def _parse_offset(self, response):
+        # Range is "bytes=0-N" for the bytes received so far, and missing if nothing has been received yet
+        received_range = response.headers.get("Range")
+        return int(received_range.rsplit("-", 1)[1]) + 1 if received_range else 0
+
+    def query_offset(self, session_uri, file_size):
+        """Ask the server how much of the file it has, returning (offset, None), or (None, result) if it is complete."""
+        response = self.session.put(session_uri, headers={"Content-Range": f"bytes */{file_size}", "Content-Length": "0"})
+        if response.status_code in (200, 201):
+            return None, response.json()
+        if response.status_code == 308:
+            return self._parse_offset(response), None
+        if response.status_code in EXPIRED_SESSION_STATUS_CODES:
+            raise ResumableUploadError(f"Upload session has expired: HTTP {response.status_code}")
+        raise ResumableUploadError(f"Failed to query upload progress: HTTP {response.status_code} {response.text}")
+
+    def upload(self):
+        """Upload the file, resuming a saved session if there is one, and return the server's final JSON response."""
+        file_size = os.path.getsize(self.file_path)
+        state = self.load_state()
+
+        session_uri = None
+        offset = 0
+        if state is not None:
+            try:
+                offset, result = self.query_offset(state["session_uri"], file_size)
+            except ResumableUploadError as e:
+                self.logger.warning(f"Can't resume saved upload session, starting a new upload: {e}")
+            else:
+                if result is not None:
+                    self.clear_state()
+                    return result
+                session_uri = state["session_uri"]
+                self.logger.info(f"Resuming upload of {self.file_path} from byte {offset} of {file_size}")
+
+        if session_uri is None:
+            session_uri = self.start_session(file_size)
+            offset = 0
+            self.save_state(session_uri, offset)
+
+        retries = 0
+        with open(self.file_path, "rb") as f:
+            while True:
+                f.seek(offset)
+                chunk = f.read(self.chunk_size)
+                chunk_end = offset + len(chunk) - 1
+                try:
+                    response = self.session.put(
+                        session_uri,
+                        data=chunk,
+                        headers={"Content-Range": f"bytes {offset}-{chunk_end}/{file_size}", "Content-Type": self.mimetype},
+                    )
+                except requests.RequestException as e:
+                    response = None
+                    error = str(e)
+                else:
+                    error = f"HTTP {response.status_code} {response.text}"
+
+                if response is not None and response.status_code in (200, 201):
+                    self.clear_state()
+                    if self.progress_callback:
+                        self.progress_callback(file_size, file_size)
+                    return response.json()
+
+                if response is not None and response.status_code == 308:
+                    new_offset = self._parse_offset(response)
+                    if new_offset > offset:
+                        offset = new_offset
+                        retries = 0
+                        self.save_state(session_uri, offset)
+                        if self.progress_callback:
+                            self.progress_callback(offset, file_size)
+                        continue
+                    # A chunk the server didn't keep any of counts as a failure, so a stalled upload can't loop forever
+                    error = f"HTTP 308 with no bytes received past {offset}"
+                elif response is not None and response.status_code not in RETRYABLE_STATUS_CODES:
+                    if response.status_code in EXPIRED_SESSION_STATUS_CODES:
+                        self.clear_state()
+                    raise ResumableUploadError(f"Upload of {self.file_path} failed: {error}")
+
+                retries += 1
+                self._sleep_before_retry(retries, error, f"Upload of {self.file_path}")
+
+                # The server may have stored part of the failed chunk, so continue from what it confirms
+                try:
+                    new_offset, result = self.query_offset(session_uri, file_size)
+                except (requests.RequestException, ResumableUploadError) as e:
+                    self.logger.warning(f"Failed to check upload progress, retrying from byte {offset}: {e}")
+                    continue
+                if result is not None:
+                    self.clear_state()
+                    return result
+                offset = new_offset
@@ -0,0 +1,62 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+def run_steps_concurrently(steps, logger, max_workers=None):
+    """Run (name, func, depends_on) steps in threads, starting each one as soon as the steps it depends on have succeeded.
+
+    Dependencies on steps which aren't in the list are treated as already met, so optional steps can simply be left out.
+    A failed step doesn't stop the others, but anything depending on it is skipped.
+
+    Returns a dict of step name to {"status": "succeeded" | "failed" | "skipped", "duration_seconds": float, "error": str | None}.
+    """
+    names = [name for name, _, _ in steps]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Step names must be unique, got {names}")
+
+    pending = {name: (func, [dep for dep in depends_on if dep in names]) for name, func, depends_on in steps}
+    results = {}
+
+    def run_step(name, func):
+        start_time = time.time()
+        try:
+            func()
+        except Exception as e:
+            duration = time.time() - start_time
+            logger.error(f"Step {name} failed after {duration:.1f} seconds: {e}")
+            return {"status": "failed", "duration_seconds": duration, "error": str(e)}
+        duration = time.time() - start_time
+        logger.info(f"Step {name} finished in {duration:.1f} seconds")
+        return {"status": "succeeded", "duration_seconds": duration, "error": None}
+
+    with ThreadPoolExecutor(max_workers=max_workers or max(1, len(steps))) as executor:
+        running = {}
+        while pending or running:
+            # Repeat until nothing changes, as skipping a step can mean its own dependants need skipping too
+            scheduled = True
+            while scheduled:
+                scheduled = False
+                for name, (func, depends_on) in list(pending.items()):
+                    if any(results.get(dep, {}).get("status") in ("failed", "skipped") for dep in depends_on):
+                        failed_deps = [dep for dep in depends_on if results.get(dep, {}).get("status") in ("failed", "skipped")]
+                        logger.warning(f"Skipping step {name} because {', '.join(failed_deps)} did not succeed")
+                        results[name] = {"status": "skipped", "duration_seconds": 0.0, "error": f"Dependency did not succeed: {', '.join(failed_deps)}"}
+                    elif all(results.get(dep, {}).get("status") == "succeeded" for dep in depends_on):
+                        logger.info(f"Starting step {name}")
+                        running[executor.submit(run_step, name, func)] = name
+                    else:
+                        continue
+                    del pending[name]
+                    scheduled = True
+
+            if not running:
+                if pending:
+                    # Nothing can start and nothing is running, so the remaining steps depend on each other
+                    raise ValueError(f"Steps have circular dependencies: {sorted(pending)}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+
+    return results
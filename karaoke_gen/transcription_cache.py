@@ -0,0 +1,118 @@
+import os
+import json
+import hashlib
+import tempfile
+from lyrics_transcriber.types import TranscriptionData, TranscriptionResult
+
+# Bump when the cached data format changes, so stale entries are ignored rather than misread
+TRANSCRIPTION_CACHE_VERSION = 1
+
+
+class LocalDirectoryTranscriptionCacheStorage:
+    """Stores cached transcription results as JSON files in a local directory.
+
+    Any object with the same get(key) / put(key, data) methods can be used as TranscriptionCache storage.
+    """
+
+    def __init__(self, cache_dir, logger):
+        self.cache_dir = cache_dir
+        self.logger = logger
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, f"transcription_{key}.json")
+
+    def get(self, key):
+        """Return the cached data for key, or None if it isn't cached or can't be read."""
+        cache_path = self._get_path(key)
+        try:
+            with open(cache_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Ignoring unreadable transcription cache file {cache_path}: {e}")
+            return None
+
+    def put(self, key, data):
+        """Store data for key, writing to a temporary file first so readers never see a partial entry."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self._get_path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+class TranscriptionCache:
+    """Caches the timed transcription from LyricsTranscriber, keyed by audio content and transcriber config.
+
+    On a cache hit the (slow, billed) transcription step is skipped, while lyrics fetching, correction and
+    output generation still run, so re-runs and lyric edits reuse the transcription.
+    """
+
+    def __init__(self, storage, logger):
+        self.storage = storage
+        self.logger = logger
+
+    def get_audio_hash(self, audio_filepath):
+        """Generate a SHA-256 hash of the audio file contents."""
+        sha256_hash = hashlib.sha256()
+        with open(audio_filepath, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha256_hash.update(chunk)
+        return sha256_hash.hexdigest()
+
+    def get_cache_key(self, audio_hash, transcribers):
+        """Combine the audio hash with the configured transcribers (name, class and priority, never API keys)."""
+        transcriber_config = sorted(
+            (name, type(transcriber_info["instance"]).__name__, transcriber_info["priority"])
+            for name, transcriber_info in transcribers.items()
+        )
+        key_data = json.dumps({"version": TRANSCRIPTION_CACHE_VERSION, "audio": audio_hash, "transcribers": transcriber_config})
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    def attach(self, transcriber, audio_filepath):
+        """Make the given LyricsTranscriber load its transcription results from the cache, or store them after transcribing."""
+        original_transcribe = transcriber.transcribe
+
+        def transcribe_with_cache():
+            if not transcriber.transcribers:
+                return original_transcribe()
+
+            cache_key = self.get_cache_key(self.get_audio_hash(audio_filepath), transcriber.transcribers)
+            cached_data = self.storage.get(cache_key)
+
+            if cached_data is not None:
+                self.logger.info(f"Using cached transcription for {audio_filepath} (cache key: {cache_key})")
+                transcriber.results.transcription_results = [
+                    TranscriptionResult(
+                        name=cached_result["name"],
+                        priority=cached_result["priority"],
+                        result=TranscriptionData.from_dict(cached_result["result"]),
+                    )
+                    for cached_result in cached_data["transcription_results"]
+                ]
+                return
+
+            original_transcribe()
+
+            if transcriber.results.transcription_results:
+                try:
+                    self.storage.put(
+                        cache_key,
+                        {
+                            "transcription_results": [
+                                {"name": result.name, "priority": result.priority, "result": result.result.to_dict()}
+                                for result in transcriber.results.transcription_results
+                            ]
+                        },
+                    )
+                    self.logger.info(f"Cached transcription for {audio_filepath} (cache key: {cache_key})")
+                except OSError as e:
+                    self.logger.warning(f"Failed to cache transcription for {audio_filepath}: {e}")
+
+        transcriber.transcribe = transcribe_with_cache
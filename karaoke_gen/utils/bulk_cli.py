@@ -6,16 +6,22 @@ import os
 import csv
 import asyncio
 import json
+import re
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from karaoke_gen import KaraokePrep
 from karaoke_gen.karaoke_finalise import KaraokeFinalise
+from karaoke_gen.metadata import extract_info_for_online_media, parse_track_metadata
+from karaoke_gen.metadata_cache import DEFAULT_SEARCH_TTL_SECONDS, DEFAULT_URL_TTL_SECONDS, MetadataCache, get_cacheable_info
 
 # Global logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)  # Set initial log level
 
 
-async def process_track_prep(row, args, logger, log_formatter):
+async def process_track_prep(row, args, logger, log_formatter, input_media_info=None):
     """First phase: Process a track through prep stage only, without video rendering"""
     original_dir = os.getcwd()
     try:
@@ -37,6 +43,10 @@ async def process_track_prep(row, args, logger, log_formatter):
             dry_run=args.dry_run,
             render_video=False,  # First phase: no video rendering
             create_track_subfolders=True,
+            render_cache_dir=args.render_cache_dir,
+            transcription_cache_dir=args.transcription_cache_dir,
+            metadata_cache_dir=args.metadata_cache_dir,
+            input_media_info=input_media_info,
         )
 
         tracks = await kprep.process()
@@ -48,7 +58,7 @@ async def process_track_prep(row, args, logger, log_formatter):
         os.chdir(original_dir)
 
 
-async def process_track_render(row, args, logger, log_formatter):
+async def process_track_render(row, args, logger, log_formatter, input_media_info=None):
     """Phase 2: Process a track through karaoke-finalise."""
     # First, load CDG styles if CDG generation is enabled
     cdg_styles = None
@@ -123,6 +133,10 @@ async def process_track_render(row, args, logger, log_formatter):
             render_video=True,  # Second phase: with video rendering
             create_track_subfolders=True,
             skip_transcription_review=True,
+            render_cache_dir=args.render_cache_dir,
+            transcription_cache_dir=args.transcription_cache_dir,
+            metadata_cache_dir=args.metadata_cache_dir,
+            input_media_info=input_media_info,
         )
         
         tracks = await kprep.process()
@@ -148,6 +162,118 @@ async def process_track_render(row, args, logger, log_formatter):
         return False
 
 
+class RateLimiter:
+    """Spaces out calls across threads so no more than `rate` start per second (no limit if rate is falsy)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_start - now
+            self.next_start = max(now, self.next_start) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def get_metadata_file_path(csv_path):
+    """Path of the file the resolved metadata for a CSV is stored in, alongside the CSV itself."""
+    return f"{csv_path}.metadata.json"
+
+
+def _needs_metadata_lookup(row):
+    """Rows with a URL or no guide file at all (search by artist/title) need online metadata; local files don't."""
+    guide_file = row["Mixed Audio Filename"].strip()
+    return not guide_file or re.match(r"^https?://", guide_file, re.IGNORECASE) is not None
+
+
+def _get_metadata_key(row):
+    return "|".join(row[column].strip() for column in ("Artist", "Title", "Mixed Audio Filename"))
+
+
+def _resolve_row_metadata(row, metadata_cache, rate_limiter, logger):
+    """Look up and parse the online media metadata for a single row; runs in a worker thread."""
+    artist = row["Artist"].strip()
+    title = row["Title"].strip()
+    guide_file = row["Mixed Audio Filename"].strip()
+
+    rate_limiter.wait()
+    extracted_info = extract_info_for_online_media(guide_file or None, artist, title, logger, metadata_cache=metadata_cache)
+    if "entries" in extracted_info or "playlist_count" in extracted_info:
+        raise ValueError("Input URL is a playlist, leaving it for KaraokePrep to expand")
+
+    info = get_cacheable_info(extracted_info)
+    if guide_file:
+        info.setdefault("webpage_url", guide_file)
+    # Check the stored info has everything KaraokePrep needs from it
+    parse_track_metadata(info, artist, title, None, logger)
+
+    ttl_seconds = DEFAULT_URL_TTL_SECONDS if guide_file else DEFAULT_SEARCH_TTL_SECONDS
+    return {"info": info, "expires_at": time.time() + ttl_seconds}
+
+
+async def resolve_rows_metadata(csv_path, rows, args, logger):
+    """Resolve the online media metadata for all pending rows concurrently, before any track is processed.
+
+    Lookups run in a thread pool, throttled to --metadata_rate_limit lookups per second, and the results are
+    stored alongside the CSV so re-runs skip rows which were already resolved, until they expire (with the same
+    TTLs as the metadata cache).
+
+    Returns:
+        dict: Resolved metadata (info and expires_at) keyed by row index
+    """
+    pending = [
+        (i, row)
+        for i, row in enumerate(rows)
+        if row.get("Status", "").lower() in ["uploaded", "prep_complete"] and _needs_metadata_lookup(row)
+    ]
+    if not pending:
+        return {}
+
+    metadata_path = get_metadata_file_path(csv_path)
+    stored_metadata = {}
+    if os.path.isfile(metadata_path):
+        try:
+            with open(metadata_path, "r") as f:
+                stored_metadata = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable metadata file {metadata_path}: {e}")
+
+    # Expired entries, and those stored before entries had an expiry, are looked up again
+    now = time.time()
+    stored_metadata = {key: entry for key, entry in stored_metadata.items() if entry.get("expires_at", 0) > now}
+
+    unresolved = [(i, row) for i, row in pending if _get_metadata_key(row) not in stored_metadata]
+    if unresolved:
+        logger.info(f"Resolving metadata for {len(unresolved)} tracks with {args.metadata_workers} workers")
+        metadata_cache = MetadataCache(args.metadata_cache_dir, logger) if args.metadata_cache_dir else None
+        rate_limiter = RateLimiter(args.metadata_rate_limit)
+
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=args.metadata_workers) as executor:
+            futures = [
+                (row, loop.run_in_executor(executor, _resolve_row_metadata, row, metadata_cache, rate_limiter, logger))
+                for _, row in unresolved
+            ]
+            for row, future in futures:
+                try:
+                    stored_metadata[_get_metadata_key(row)] = await future
+                except Exception as e:
+                    # Left unresolved, so KaraokePrep looks it up (and reports any error) as before
+                    logger.warning(f"Could not resolve metadata for {row['Artist'].strip()} - {row['Title'].strip()}: {str(e)}")
+
+        if args.dry_run:
+            logger.info(f"DRY RUN: Would write resolved metadata to {metadata_path}")
+        else:
+            with open(metadata_path, "w") as f:
+                json.dump(stored_metadata, f, indent=4)
+
+    return {i: stored_metadata[_get_metadata_key(row)] for i, row in pending if _get_metadata_key(row) in stored_metadata}
+
+
 def update_csv_status(csv_path, row_index, new_status, dry_run=False):
     """Update the status of a processed row in the CSV file.
     
@@ -223,6 +349,30 @@ def parse_arguments():
         default=".",
         help="Optional: directory to write output files (default: <current dir>). Example: --output_dir=/app/karaoke",
     )
+    parser.add_argument(
+        "--render_cache_dir",
+        help="Optional: directory to cache rendered title/end screens in, so identical screens are reused across tracks. Screens unused for 30 days are removed (default: disabled). Example: --render_cache_dir=/app/render-cache",
+    )
+    parser.add_argument(
+        "--transcription_cache_dir",
+        help="Optional: directory to cache lyrics transcriptions in, keyed by audio content, so re-runs don't transcribe again (default: disabled). Example: --transcription_cache_dir=/app/transcription-cache",
+    )
+    parser.add_argument(
+        "--metadata_workers",
+        type=int,
+        default=4,
+        help="Optional: number of online metadata lookups to run concurrently before processing (default: %(default)s). Example: --metadata_workers=8",
+    )
+    parser.add_argument(
+        "--metadata_rate_limit",
+        type=float,
+        default=1.0,
+        help="Optional: maximum online metadata lookups to start per second, to avoid YouTube rate limits (default: %(default)s). Example: --metadata_rate_limit=0.5",
+    )
+    parser.add_argument(
+        "--metadata_cache_dir",
+        help="Optional: directory for the online media metadata cache, so repeated URL/search lookups don't call YouTube again (default: disabled). Example: --metadata_cache_dir=/app/metadata-cache",
+    )
 
     # Finalise-specific arguments
     parser.add_argument(
@@ -353,6 +503,9 @@ async def process_csv_rows(csv_path, rows, args, logger, log_formatter):
         "skipped": 0
     }
     
+    # Resolve online metadata for all pending tracks up front, so prep doesn't wait on each lookup in turn
+    resolved_metadata = await resolve_rows_metadata(csv_path, rows, args, logger)
+
     # Phase 1: Initial prep for all tracks
     logger.info("Starting Phase 1: Initial prep for all tracks")
     for i, row in enumerate(rows):
@@ -362,7 +515,9 @@ async def process_csv_rows(csv_path, rows, args, logger, log_formatter):
             results["skipped"] += 1
             continue
 
-        success = await process_track_prep(row, args, logger, log_formatter)
+        success = await process_track_prep(
+            row, args, logger, log_formatter, input_media_info=resolved_metadata.get(i, {}).get("info")
+        )
         if success:
             results["prep_success"] += 1
             if not args.dry_run:
@@ -380,7 +535,9 @@ async def process_csv_rows(csv_path, rows, args, logger, log_formatter):
             logger.info(f"Skipping {row.get('Artist', 'Unknown')} - {row.get('Title', 'Unknown')} (Status: {row.get('Status', 'Unknown')})")
             continue
 
-        success = await process_track_render(row, args, logger, log_formatter)
+        success = await process_track_render(
+            row, args, logger, log_formatter, input_media_info=resolved_metadata.get(i, {}).get("info")
+        )
         if success:
             results["render_success"] += 1
             if not args.dry_run:
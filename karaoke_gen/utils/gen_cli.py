@@ -10,7 +10,7 @@ import asyncio
 import time
 import pyperclip
 from karaoke_gen import KaraokePrep
-from karaoke_gen.karaoke_finalise import KaraokeFinalise
+from karaoke_gen.karaoke_finalise import KaraokeFinalise, BatchKaraokeFinalise, UPLOAD_DELIVERABLE_CLASSES
 
 
 def is_url(string):
@@ -140,6 +140,15 @@ async def async_main():
         default=True,
         help="Optional: output JPG format for title and end images (default: %(default)s). Example: --output_jpg=False",
     )
+    io_group.add_argument(
+        "--metadata_cache_dir",
+        help="Optional: Directory for the online media metadata cache, so repeated URL/search lookups don't call YouTube again (default: disabled). Example: --metadata_cache_dir=/app/metadata-cache",
+    )
+    io_group.add_argument(
+        "--lazy_playlist",
+        action="store_true",
+        help="Optional: for playlist URLs, stream the entries and fetch each track's metadata just before it is processed, so the first track starts straight away. Example: --lazy_playlist",
+    )
 
     # Audio Processing Configuration
     audio_group = parser.add_argument_group("Audio Processing Configuration")
@@ -203,6 +212,10 @@ async def async_main():
         default=0,
         help="Optional: Adjust subtitle timing by N milliseconds (+ve delays, -ve advances). Example: --subtitle_offset_ms=500",
     )
+    lyrics_group.add_argument(
+        "--transcription_cache_dir",
+        help="Optional: Directory to cache lyrics transcriptions in, keyed by audio content, so re-runs and lyric edits don't transcribe again (default: disabled). Example: --transcription_cache_dir=/app/transcription-cache",
+    )
     lyrics_group.add_argument(
         "--skip_transcription_review",
         action="store_true",
@@ -215,6 +228,10 @@ async def async_main():
         "--style_params_json",
         help="Optional: Path to JSON file containing style configuration. Example: --style_params_json='/path/to/style_params.json'",
     )
+    style_group.add_argument(
+        "--render_cache_dir",
+        help="Optional: Directory to cache rendered title/end screens in, so identical screens are reused across tracks. Screens unused for 30 days are removed (default: disabled). Example: --render_cache_dir=/tmp/karaoke-gen-render-cache",
+    )
 
     # Finalisation Configuration
     finalise_group = parser.add_argument_group("Finalisation Configuration")
@@ -252,10 +269,56 @@ async def async_main():
         "--youtube_description_file",
         help="Optional: Path to youtube description template. Example: --youtube_description_file='/path/to/description.txt'",
     )
+    finalise_group.add_argument(
+        "--youtube_resumable_upload",
+        action="store_true",
+        help="Optional: Upload to YouTube in chunks, saving the upload session next to the video so a failed or interrupted upload resumes where it stopped when run again. Example: --youtube_resumable_upload",
+    )
+    finalise_group.add_argument(
+        "--youtube_upload_chunk_mb",
+        type=int,
+        default=64,
+        help="Optional: Chunk size in MB for --youtube_resumable_upload; must be a multiple of 0.25 MB (default: %(default)s). Example: --youtube_upload_chunk_mb=16",
+    )
+    finalise_group.add_argument(
+        "--youtube_channel_index_dir",
+        help="Optional: Directory to keep a local index of your YouTube channel's video titles in, updated from its uploads playlist, so checking for an existing upload doesn't cost a YouTube search every run. The first run pages through the whole uploads playlist (default: disabled, search instead). Example: --youtube_channel_index_dir=/app/youtube-cache",
+    )
+    finalise_group.add_argument(
+        "--refresh_youtube_channel_index",
+        action="store_true",
+        help="Optional: Rebuild the local YouTube channel index from the whole uploads playlist, e.g. after deleting videos on YouTube. Example: --refresh_youtube_channel_index",
+    )
     finalise_group.add_argument(
         "--rclone_destination",
         help="Optional: Rclone destination for public_share_dir sync. Example: --rclone_destination='googledrive:KaraokeFolder'",
     )
+    finalise_group.add_argument(
+        "--finalise_batch_dirs",
+        nargs="+",
+        help="Optional: With --finalise-only, finalise each of these prepared track directories in one run, setting up YouTube sign-in, encoder detection and brand code allocation once for the whole batch. Tracks run non-interactively. Example: --finalise_batch_dirs 'ABBA - Waterloo' 'Queen - Bohemian Rhapsody'",
+    )
+    finalise_group.add_argument(
+        "--finalise_batch_workers",
+        type=int,
+        default=1,
+        help="Optional: Number of tracks to finalise at once with --finalise_batch_dirs (default: %(default)s). Example: --finalise_batch_workers=2",
+    )
+    finalise_group.add_argument(
+        "--concurrent_distribution",
+        action="store_true",
+        help="Optional: Run the YouTube upload, Discord notification, folder organisation, public share copy/sync and sharing link steps at the same time where they don't depend on each other. A failed step is reported rather than stopping the others. Example: --concurrent_distribution",
+    )
+    finalise_group.add_argument(
+        "--incremental_public_share_sync",
+        action="store_true",
+        help="Optional: Record files copied to public_share_dir in a journal and sync only those to rclone_destination, rather than comparing the whole share. Run --reconcile_public_share now and then to catch anything missed. Example: --incremental_public_share_sync",
+    )
+    finalise_group.add_argument(
+        "--reconcile_public_share",
+        action="store_true",
+        help="Optional: Copy the whole public_share_dir to rclone_destination, clear the incremental sync journal and exit. Example: --reconcile_public_share",
+    )
     finalise_group.add_argument(
         "--discord_webhook_url",
         help="Optional: Discord webhook URL for notifications. Example: --discord_webhook_url='https://discord.com/api/webhooks/...'",
@@ -264,6 +327,65 @@ async def async_main():
         "--email_template_file",
         help="Optional: Path to email template file. Example: --email_template_file='/path/to/template.txt'",
     )
+    finalise_group.add_argument(
+        "--single_pass_encode",
+        action="store_true",
+        help="Optional: Encode all final video versions in a single ffmpeg pass, decoding the inputs only once. Falls back to encoding each version separately if it fails. Example: --single_pass_encode",
+    )
+    finalise_group.add_argument(
+        "--concat_stream_copy",
+        action="store_true",
+        help="Optional: Join the title, karaoke and end videos by stream copy, encoding only the short title/end cards to match the karaoke video. Falls back to re-encoding if they can't be matched. Example: --concat_stream_copy",
+    )
+    finalise_group.add_argument(
+        "--parallel_encode",
+        action="store_true",
+        help="Optional: Encode the lossy MP4, MKV and 720p versions at the same time once the lossless MP4 exists. Example: --parallel_encode",
+    )
+    finalise_group.add_argument(
+        "--cpu_budget",
+        type=int,
+        help="Optional: Number of CPU threads parallel encodes may use in total (default: all CPU cores). Example: --cpu_budget=16",
+    )
+    finalise_group.add_argument(
+        "--flac_intermediate",
+        action="store_true",
+        help="Optional: Save the karaoke video as (Karaoke).mkv with FLAC instrumental audio, rather than (Karaoke).mp4 with uncompressed PCM, roughly halving its size. Both are lossless, so the final videos are unchanged. Example: --flac_intermediate",
+    )
+    finalise_group.add_argument(
+        "--brand_code_ledger",
+        help="Optional: SQLite file to reserve brand codes from, instead of scanning the organised folder for the highest code on every run. Safe for concurrent finalisations on one machine. Example: --brand_code_ledger=/app/brand-codes.sqlite3",
+    )
+    finalise_group.add_argument(
+        "--rebuild_brand_code_ledger",
+        action="store_true",
+        help="Optional: Rebuild the brand code ledger from a scan of the organised folder, e.g. after folders were added by hand. Example: --rebuild_brand_code_ledger",
+    )
+    finalise_group.add_argument(
+        "--upload_deliverables",
+        nargs="+",
+        choices=sorted(UPLOAD_DELIVERABLE_CLASSES),
+        help="Optional: Server-side mode only. Upload just these classes of files to the organised folder, skipping files already there with the same checksum, instead of copying the whole track directory. Example: --upload_deliverables final_videos packages",
+    )
+    finalise_group.add_argument(
+        "--rclone_transfers",
+        type=int,
+        help="Optional: Number of files rclone uploads in parallel to the organised folder (default: rclone's default). Example: --rclone_transfers=8",
+    )
+    finalise_group.add_argument(
+        "--rclone_checkers",
+        type=int,
+        help="Optional: Number of rclone checkers comparing files with the organised folder in parallel (default: rclone's default). Example: --rclone_checkers=16",
+    )
+    finalise_group.add_argument(
+        "--encoder_probe_cache_dir",
+        help="Optional: Directory to cache AAC codec and NVENC detection results in, keyed by ffmpeg version and GPU driver, so finalisation doesn't probe them every run (default: disabled). Example: --encoder_probe_cache_dir=/app/encoder-cache",
+    )
+    finalise_group.add_argument(
+        "--refresh_encoder_probe",
+        action="store_true",
+        help="Optional: Ignore cached encoder detection results and probe again, updating the cache. Example: --refresh_encoder_probe",
+    )
     finalise_group.add_argument(
         "--keep-brand-code",
         action="store_true",
@@ -296,6 +418,22 @@ async def async_main():
         kfinalise.test_email_template()
         return
 
+    # Handle public share reconcile case
+    if args.reconcile_public_share:
+        log_level = getattr(logging, args.log_level.upper())
+        logger.setLevel(log_level)
+        logger.info("Reconciling public share directory with rclone destination...")
+        kfinalise = KaraokeFinalise(
+            log_formatter=log_formatter,
+            log_level=log_level,
+            dry_run=args.dry_run,
+            public_share_dir=args.public_share_dir,
+            rclone_destination=args.rclone_destination,
+            incremental_public_share_sync=True,
+        )
+        kfinalise.reconcile_public_share_dir_to_rclone_destination()
+        return
+
     # Handle edit-lyrics mode
     if args.edit_lyrics:
         log_level = getattr(logging, args.log_level.upper())
@@ -354,6 +492,9 @@ async def async_main():
             skip_transcription_review=args.skip_transcription_review,
             subtitle_offset_ms=args.subtitle_offset_ms,
             style_params_json=args.style_params_json,
+            render_cache_dir=args.render_cache_dir,
+            transcription_cache_dir=args.transcription_cache_dir,
+            metadata_cache_dir=args.metadata_cache_dir,
         )
         # No await needed for constructor
         kprep = kprep_coroutine
@@ -410,6 +551,24 @@ async def async_main():
             cdg_styles=cdg_styles,
             keep_brand_code=True,  # Always keep brand code in edit mode
             non_interactive=args.yes,
+            single_pass_encode=args.single_pass_encode,
+            concat_stream_copy=args.concat_stream_copy,
+            parallel_encode=args.parallel_encode,
+            cpu_budget=args.cpu_budget,
+            flac_intermediate=args.flac_intermediate,
+            encoder_probe_cache_dir=args.encoder_probe_cache_dir,
+            refresh_encoder_probe=args.refresh_encoder_probe,
+            brand_code_ledger_file=args.brand_code_ledger,
+            rebuild_brand_code_ledger=args.rebuild_brand_code_ledger,
+            upload_deliverables=args.upload_deliverables,
+            rclone_transfers=args.rclone_transfers,
+            rclone_checkers=args.rclone_checkers,
+            incremental_public_share_sync=args.incremental_public_share_sync,
+            youtube_resumable_upload=args.youtube_resumable_upload,
+            youtube_upload_chunk_mb=args.youtube_upload_chunk_mb,
+            concurrent_distribution=args.concurrent_distribution,
+            youtube_channel_index_dir=args.youtube_channel_index_dir,
+            refresh_youtube_channel_index=args.refresh_youtube_channel_index,
         )
         
         try:
@@ -504,26 +663,63 @@ async def async_main():
                 sys.exit(1)
                 return # Explicit return for testing
         
-        kfinalise = KaraokeFinalise(
-            log_formatter=log_formatter,
-            log_level=log_level,
-            dry_run=args.dry_run,
-            instrumental_format=args.instrumental_format,
-            enable_cdg=args.enable_cdg,
-            enable_txt=args.enable_txt,
-            brand_prefix=args.brand_prefix,
-            organised_dir=args.organised_dir,
-            organised_dir_rclone_root=args.organised_dir_rclone_root,
-            public_share_dir=args.public_share_dir,
-            youtube_client_secrets_file=args.youtube_client_secrets_file,
-            youtube_description_file=args.youtube_description_file,
-            rclone_destination=args.rclone_destination,
-            discord_webhook_url=args.discord_webhook_url,
-            email_template_file=args.email_template_file,
-            cdg_styles=cdg_styles,
-            keep_brand_code=getattr(args, 'keep_brand_code', False),
-            non_interactive=args.yes,
-        )
+        finalise_kwargs = {
+            "log_formatter": log_formatter,
+            "log_level": log_level,
+            "dry_run": args.dry_run,
+            "instrumental_format": args.instrumental_format,
+            "enable_cdg": args.enable_cdg,
+            "enable_txt": args.enable_txt,
+            "brand_prefix": args.brand_prefix,
+            "organised_dir": args.organised_dir,
+            "organised_dir_rclone_root": args.organised_dir_rclone_root,
+            "public_share_dir": args.public_share_dir,
+            "youtube_client_secrets_file": args.youtube_client_secrets_file,
+            "youtube_description_file": args.youtube_description_file,
+            "rclone_destination": args.rclone_destination,
+            "discord_webhook_url": args.discord_webhook_url,
+            "email_template_file": args.email_template_file,
+            "cdg_styles": cdg_styles,
+            "keep_brand_code": getattr(args, 'keep_brand_code', False),
+            "non_interactive": args.yes,
+            "single_pass_encode": args.single_pass_encode,
+            "concat_stream_copy": args.concat_stream_copy,
+            "parallel_encode": args.parallel_encode,
+            "cpu_budget": args.cpu_budget,
+            "flac_intermediate": args.flac_intermediate,
+            "encoder_probe_cache_dir": args.encoder_probe_cache_dir,
+            "refresh_encoder_probe": args.refresh_encoder_probe,
+            "brand_code_ledger_file": args.brand_code_ledger,
+            "rebuild_brand_code_ledger": args.rebuild_brand_code_ledger,
+            "upload_deliverables": args.upload_deliverables,
+            "rclone_transfers": args.rclone_transfers,
+            "rclone_checkers": args.rclone_checkers,
+            "incremental_public_share_sync": args.incremental_public_share_sync,
+            "youtube_resumable_upload": args.youtube_resumable_upload,
+            "youtube_upload_chunk_mb": args.youtube_upload_chunk_mb,
+            "concurrent_distribution": args.concurrent_distribution,
+            "youtube_channel_index_dir": args.youtube_channel_index_dir,
+            "refresh_youtube_channel_index": args.refresh_youtube_channel_index,
+        }
+
+        if args.finalise_batch_dirs:
+            batch = BatchKaraokeFinalise(args.finalise_batch_dirs, max_workers=args.finalise_batch_workers, **finalise_kwargs)
+            results = batch.process()
+
+            logger.info(f"Batch finalisation results:")
+            for track_result in results:
+                if track_result["error"]:
+                    logger.error(f" FAILED {track_result['track_dir']}: {track_result['error']}")
+                else:
+                    track = track_result["result"]
+                    logger.info(f" {track['brand_code'] or '-'}: {track['artist']} - {track['title']} {track['youtube_url'] or ''}")
+
+            failed_count = sum(1 for track_result in results if track_result["error"])
+            if failed_count:
+                raise Exception(f"{failed_count} of {len(results)} tracks failed to finalise, see errors above")
+            return
+
+        kfinalise = KaraokeFinalise(**finalise_kwargs)
         
         try:
             track = kfinalise.process()
@@ -671,6 +867,10 @@ async def async_main():
         skip_transcription_review=args.skip_transcription_review,
         subtitle_offset_ms=args.subtitle_offset_ms,
         style_params_json=args.style_params_json,
+        render_cache_dir=args.render_cache_dir,
+        transcription_cache_dir=args.transcription_cache_dir,
+        metadata_cache_dir=args.metadata_cache_dir,
+        lazy_playlist=args.lazy_playlist,
     )
     # No await needed for constructor
     kprep = kprep_coroutine
@@ -739,6 +939,24 @@ async def async_main():
             cdg_styles=cdg_styles,
             keep_brand_code=getattr(args, 'keep_brand_code', False),
             non_interactive=args.yes,
+            single_pass_encode=args.single_pass_encode,
+            concat_stream_copy=args.concat_stream_copy,
+            parallel_encode=args.parallel_encode,
+            cpu_budget=args.cpu_budget,
+            flac_intermediate=args.flac_intermediate,
+            encoder_probe_cache_dir=args.encoder_probe_cache_dir,
+            refresh_encoder_probe=args.refresh_encoder_probe,
+            brand_code_ledger_file=args.brand_code_ledger,
+            rebuild_brand_code_ledger=args.rebuild_brand_code_ledger,
+            upload_deliverables=args.upload_deliverables,
+            rclone_transfers=args.rclone_transfers,
+            rclone_checkers=args.rclone_checkers,
+            incremental_public_share_sync=args.incremental_public_share_sync,
+            youtube_resumable_upload=args.youtube_resumable_upload,
+            youtube_upload_chunk_mb=args.youtube_upload_chunk_mb,
+            concurrent_distribution=args.concurrent_distribution,
+            youtube_channel_index_dir=args.youtube_channel_index_dir,
+            refresh_youtube_channel_index=args.refresh_youtube_channel_index,
         )
 
         try:
@@ -2,17 +2,44 @@ import os
 import logging
 import importlib.resources as pkg_resources
 import shutil
-from PIL import Image, ImageDraw, ImageFont
+import json
+import hashlib
+import tempfile
+import time
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+# Resized background images, shared between VideoGenerator instances so bulk runs with one style
+# only decode and resize each background image once
+_resized_background_cache = OrderedDict()
+RESIZED_BACKGROUND_CACHE_SIZE = 4
+
+# Encoder settings for title/end screen clips. They are part of the render cache key, so changing them
+# re-renders cached screens rather than reusing clips encoded with the old settings
+STILL_VIDEO_ENCODER_SETTINGS = {
+    "video_codec": "libx264",
+    "preset": "ultrafast",
+    "tune": "stillimage",
+    "pix_fmt": "yuv420p",
+    "audio_codec": "aac",
+}
+
+# Render cache entries not used for this long are removed when a new entry is stored
+RENDER_CACHE_MAX_AGE_SECONDS = 30 * 24 * 60 * 60
 
 
 # Placeholder class or functions for video/image generation
 class VideoGenerator:
-    def __init__(self, logger, ffmpeg_base_command, render_bounding_boxes, output_png, output_jpg):
+    def __init__(self, logger, ffmpeg_base_command, render_bounding_boxes, output_png, output_jpg, render_cache_dir=None):
         self.logger = logger
         self.ffmpeg_base_command = ffmpeg_base_command
         self.render_bounding_boxes = render_bounding_boxes
         self.output_png = output_png
         self.output_jpg = output_jpg
+        self.render_cache_dir = render_cache_dir
 
     def parse_region(self, region_str):
         if region_str:
@@ -56,27 +83,19 @@ class VideoGenerator:
         if existing_image:
             return self._handle_existing_image(existing_image, output_image_filepath_noext, output_video_filepath, duration)
 
+        font_path = self._resolve_font_path(format)
+
+        cache_key = None
+        if self.render_cache_dir:
+            cache_key = self._get_render_cache_key(extra_text, title_text, artist_text, format, font_path, resolution, duration)
+            if self._restore_from_render_cache(cache_key, output_image_filepath_noext, output_video_filepath, duration):
+                return
+
         # Create or load background
         background = self._create_background(format, resolution)
         draw = ImageDraw.Draw(background)
 
         if format["font"] is not None:
-            self.logger.info(f"Using font: {format['font']}")
-            # Check if the font path is absolute
-            if os.path.isabs(format["font"]):
-                font_path = format["font"]
-                if not os.path.exists(font_path):
-                    self.logger.warning(f"Font file not found at {font_path}, falling back to default font")
-                    font_path = None
-            else:
-                # Try to load from package resources
-                try:
-                    with pkg_resources.path("karaoke_gen.resources", format["font"]) as font_path:
-                        font_path = str(font_path)
-                except Exception as e:
-                    self.logger.warning(f"Could not load font from resources: {e}, falling back to default font")
-                    font_path = None
-
             # Render all text elements
             self._render_all_text(
                 draw,
@@ -94,6 +113,137 @@ class VideoGenerator:
             background, output_image_filepath_noext, output_video_filepath, duration, resolution
         )
 
+        if cache_key:
+            self._store_in_render_cache(cache_key, output_image_filepath_noext, output_video_filepath, duration)
+
+    def _resolve_font_path(self, format):
+        """Resolve the font file path from the format, falling back to None (default font) if it can't be found."""
+        if format["font"] is None:
+            return None
+
+        self.logger.info(f"Using font: {format['font']}")
+        # Check if the font path is absolute
+        if os.path.isabs(format["font"]):
+            font_path = format["font"]
+            if not os.path.exists(font_path):
+                self.logger.warning(f"Font file not found at {font_path}, falling back to default font")
+                font_path = None
+        else:
+            # Try to load from package resources
+            try:
+                with pkg_resources.path("karaoke_gen.resources", format["font"]) as font_path:
+                    font_path = str(font_path)
+            except Exception as e:
+                self.logger.warning(f"Could not load font from resources: {e}, falling back to default font")
+                font_path = None
+
+        return font_path
+
+    def _get_render_cache_key(self, extra_text, title_text, artist_text, format, font_path, resolution, duration):
+        """Hash everything which affects the rendered screen: format, text, resolution, duration, encoder settings
+        and font/background contents.
+
+        Title and artist text are only part of the key when the format draws them, so e.g. an end screen without them
+        is rendered once and reused for every track.
+        """
+        hasher = hashlib.sha256()
+        render_settings = {
+            "format": format,
+            "extra_text": extra_text,
+            "title_text": title_text if format.get("title_region") else None,
+            "artist_text": artist_text if format.get("artist_region") else None,
+            "resolution": list(resolution),
+            "duration": duration,
+            "render_bounding_boxes": self.render_bounding_boxes,
+            "output_png": self.output_png,
+            "output_jpg": self.output_jpg,
+            "encoder_settings": STILL_VIDEO_ENCODER_SETTINGS,
+        }
+        hasher.update(json.dumps(render_settings, sort_keys=True, default=str).encode("utf-8"))
+
+        for file_path in (font_path, format.get("background_image")):
+            if file_path and os.path.isfile(file_path):
+                with open(file_path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                        hasher.update(chunk)
+
+        return hasher.hexdigest()
+
+    def _get_render_cache_outputs(self, output_image_filepath_noext, output_video_filepath, duration):
+        """Map each cached file name to the output path it is materialised to."""
+        outputs = {}
+        if self.output_png:
+            outputs["screen.png"] = f"{output_image_filepath_noext}.png"
+        if self.output_jpg:
+            outputs["screen.jpg"] = f"{output_image_filepath_noext}.jpg"
+        if duration > 0:
+            outputs["screen.mov"] = output_video_filepath
+        return outputs
+
+    def _restore_from_render_cache(self, cache_key, output_image_filepath_noext, output_video_filepath, duration):
+        """Copy a previously rendered screen into place. Returns True on a cache hit."""
+        cache_entry_dir = os.path.join(self.render_cache_dir, cache_key)
+        outputs = self._get_render_cache_outputs(output_image_filepath_noext, output_video_filepath, duration)
+
+        if not all(os.path.isfile(os.path.join(cache_entry_dir, cached_name)) for cached_name in outputs):
+            self.logger.debug(f"Render cache miss for key: {cache_key}")
+            return False
+
+        self.logger.info(f"Render cache hit, reusing previously rendered screen from: {cache_entry_dir}")
+        for cached_name, output_path in outputs.items():
+            shutil.copy2(os.path.join(cache_entry_dir, cached_name), output_path)
+
+        # Mark the entry as recently used, so it isn't evicted while it's still being reused
+        try:
+            os.utime(cache_entry_dir)
+        except OSError:
+            pass
+
+        return True
+
+    def _store_in_render_cache(self, cache_key, output_image_filepath_noext, output_video_filepath, duration):
+        """Store the rendered screen outputs in the render cache. Failures are logged, never raised."""
+        cache_entry_dir = os.path.join(self.render_cache_dir, cache_key)
+        outputs = self._get_render_cache_outputs(output_image_filepath_noext, output_video_filepath, duration)
+
+        if os.path.isdir(cache_entry_dir) or not all(os.path.isfile(output_path) for output_path in outputs.values()):
+            return
+
+        try:
+            os.makedirs(self.render_cache_dir, exist_ok=True)
+            # Populate a temporary directory then rename it into place, so concurrent runs never see a partial entry
+            staging_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.render_cache_dir)
+            for cached_name, output_path in outputs.items():
+                shutil.copy2(output_path, os.path.join(staging_dir, cached_name))
+            try:
+                os.rename(staging_dir, cache_entry_dir)
+                self.logger.info(f"Stored rendered screen in render cache: {cache_entry_dir}")
+            except OSError:
+                # Another run stored the same entry first
+                shutil.rmtree(staging_dir, ignore_errors=True)
+        except OSError as e:
+            self.logger.warning(f"Failed to store rendered screen in render cache {self.render_cache_dir}: {e}")
+
+        self._evict_stale_render_cache_entries()
+
+    def _evict_stale_render_cache_entries(self):
+        """Remove render cache entries (and abandoned staging directories) not used for RENDER_CACHE_MAX_AGE_SECONDS."""
+        cutoff = time.time() - RENDER_CACHE_MAX_AGE_SECONDS
+        try:
+            entry_names = os.listdir(self.render_cache_dir)
+        except OSError:
+            return
+
+        for entry_name in entry_names:
+            entry_dir = os.path.join(self.render_cache_dir, entry_name)
+            try:
+                if os.path.isdir(entry_dir) and os.path.getmtime(entry_dir) < cutoff:
+                    self.logger.debug(f"Evicting stale render cache entry: {entry_dir}")
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+            except OSError:
+                # Removed by another run in the meantime
+                pass
+
     def calculate_text_size_to_fit(self, draw, text, font_path, region):
         font_size = 500  # Start with a large font size
         font = ImageFont.truetype(font_path, size=font_size) if font_path and os.path.exists(font_path) else ImageFont.load_default()
@@ -173,23 +323,17 @@ class VideoGenerator:
             if gradient is None:
                 draw.text(position, text, fill=color, font=font)
             else:
-                # Create a temporary image for this text
-                text_layer = Image.new("RGBA", (bbox[2], bbox[3]), (0, 0, 0, 0))
-                text_draw = ImageDraw.Draw(text_layer)
-
-                # Draw text in first color
-                text_draw.text((0, 0), text, fill=gradient["color1"], font=font)
-
-                # Create and apply gradient mask
-                mask = self._create_gradient_mask((bbox[2], bbox[3]), gradient)
+                # Draw the text once as an alpha mask, then colour it with a blended gradient fill
+                alpha_layer = Image.new("L", (bbox[2], bbox[3]), 0)
+                ImageDraw.Draw(alpha_layer).text((0, 0), text, fill=255, font=font)
 
-                # Create second color layer
-                color2_layer = Image.new("RGBA", (bbox[2], bbox[3]), (0, 0, 0, 0))
-                color2_draw = ImageDraw.Draw(color2_layer)
-                color2_draw.text((0, 0), text, fill=gradient["color2"], font=font)
+                # Create gradient mask and blend the two colours with array ops
+                mask = np.asarray(self._create_gradient_mask((bbox[2], bbox[3]), gradient), dtype=np.float32)[..., np.newaxis] / 255.0
+                color1 = np.array(ImageColor.getrgb(gradient["color1"])[:3], dtype=np.float32)
+                color2 = np.array(ImageColor.getrgb(gradient["color2"])[:3], dtype=np.float32)
+                rgb = (color1 * (1.0 - mask) + color2 * mask).astype(np.uint8)
 
-                # Composite using gradient mask
-                text_layer.paste(color2_layer, mask=mask)
+                text_layer = Image.fromarray(np.dstack([rgb, np.asarray(alpha_layer)]), "RGBA")
 
                 # Paste onto main image
                 draw._image.paste(text_layer, position, text_layer)
@@ -252,41 +396,27 @@ class VideoGenerator:
                 - start: Start point of gradient transition (0-1)
                 - stop: Stop point of gradient transition (0-1)
         """
-        mask = Image.new("L", size)
-        draw = ImageDraw.Draw(mask)
-
         width, height = size
         start = gradient_config["start"]
         stop = gradient_config["stop"]
 
-        if gradient_config["direction"] == "horizontal":
-            for x in range(width):
-                # Calculate position in gradient (0 to 1)
-                pos = x / width
-
-                # Calculate color intensity
-                if pos < start:
-                    intensity = 0
-                elif pos > stop:
-                    intensity = 255
-                else:
-                    # Linear interpolation between start and stop
-                    intensity = int(255 * (pos - start) / (stop - start))
-
-                draw.line([(x, 0), (x, height)], fill=intensity)
-        else:  # vertical
-            for y in range(height):
-                pos = y / height
-                if pos < start:
-                    intensity = 0
-                elif pos > stop:
-                    intensity = 255
-                else:
-                    intensity = int(255 * (pos - start) / (stop - start))
+        horizontal = gradient_config["direction"] == "horizontal"
+        length = width if horizontal else height
+
+        # Position of each column (or row) in the gradient (0 to 1), linearly interpolated between start and stop
+        positions = np.linspace(0.0, 1.0, length, endpoint=False)
+        if stop > start:
+            ramp = np.clip((positions - start) / (stop - start), 0.0, 1.0)
+        else:
+            ramp = (positions >= start).astype(np.float64)
+        ramp = (ramp * 255).astype(np.uint8)
 
-                draw.line([(0, y), (width, y)], fill=intensity)
+        if horizontal:
+            mask = np.broadcast_to(ramp[np.newaxis, :], (height, width))
+        else:  # vertical
+            mask = np.broadcast_to(ramp[:, np.newaxis], (height, width))
 
-        return mask
+        return Image.fromarray(np.ascontiguousarray(mask), "L")
 
     def _handle_existing_image(self, existing_image, output_image_filepath_noext, output_video_filepath, duration):
         """Handle case where an existing image is provided."""
@@ -315,7 +445,20 @@ class VideoGenerator:
         """Create or load the background image."""
         if format["background_image"] and os.path.exists(format["background_image"]):
             self.logger.info(f"Using background image file: {format['background_image']}")
-            background = Image.open(format["background_image"])
+            background_image = format["background_image"]
+            cache_key = (os.path.abspath(background_image), os.path.getmtime(background_image), os.path.getsize(background_image), tuple(resolution))
+
+            cached_background = _resized_background_cache.get(cache_key)
+            if cached_background is not None:
+                self.logger.debug(f"Reusing previously resized background image: {background_image}")
+                _resized_background_cache.move_to_end(cache_key)
+                return cached_background.copy()
+
+            background = Image.open(background_image).resize(resolution)
+            _resized_background_cache[cache_key] = background.copy()
+            while len(_resized_background_cache) > RESIZED_BACKGROUND_CACHE_SIZE:
+                _resized_background_cache.popitem(last=False)
+            return background
         else:
             self.logger.info(f"Using background color: {format['background_color']}")
             background = Image.new("RGB", resolution, color=self.hex_to_rgb(format["background_color"]))
@@ -354,30 +497,78 @@ class VideoGenerator:
     def _save_output_files(
         self, background, output_image_filepath_noext, output_video_filepath, duration, resolution
     ):
-        """Save the output image files and create video if needed."""
-        # Save static background image
-        if self.output_png:
-            background.save(f"{output_image_filepath_noext}.png")
+        """Save the output image files and create video if needed.
 
-        if self.output_jpg:
-            # Save static background image as JPG for smaller filesize
-            background_rgb = background.convert("RGB")
-            background_rgb.save(f"{output_image_filepath_noext}.jpg", quality=95)
+        The video is encoded from the in-memory frame, so it doesn't wait for the PNG/JPG files, which are
+        written in parallel by a thread pool (PIL releases the GIL while compressing).
+        """
+        background_rgb = background if background.mode == "RGB" else background.convert("RGB")
 
-        if duration > 0:
-            self._create_video_from_image(f"{output_image_filepath_noext}.png", output_video_filepath, duration, resolution)
-
-    def _create_video_from_image(self, image_path, video_path, duration, resolution=(3840, 2160)):
-        """Create a video from a static image."""
-        ffmpeg_command = (
-            f'{self.ffmpeg_base_command} -y -loop 1 -framerate 30 -i "{image_path}" '
-            f"-f lavfi -i anullsrc -c:v libx264 -r 30 -t {duration} -pix_fmt yuv420p "
-            f'-vf scale={resolution[0]}:{resolution[1]} -c:a aac -shortest "{video_path}"'
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            image_saves = []
+            # Save static background image
+            if self.output_png:
+                image_saves.append(executor.submit(background.save, f"{output_image_filepath_noext}.png"))
+
+            if self.output_jpg:
+                # Save static background image as JPG for smaller filesize
+                image_saves.append(executor.submit(background_rgb.save, f"{output_image_filepath_noext}.jpg", quality=95))
+
+            if duration > 0:
+                self._create_video_from_frame(background_rgb, output_video_filepath, duration, resolution)
+
+            # Re-raise any error from the image writes
+            for image_save in image_saves:
+                image_save.result()
+
+    def _build_still_video_command(self, input_args, video_path, duration, resolution, framerate):
+        """Build the ffmpeg command which turns a single still frame, read by input_args, into a video clip.
+
+        The frame is decoded and converted to yuv420p only once, then repeated by the loop filter and encoded
+        with x264 tuned for still content, so the identical frames are encoded as near-free skip blocks. Output
+        resolution, frame rate, pixel format and the silent stereo AAC track are unchanged, keeping the clip
+        compatible with the concat step in KaraokeFinalise.
+        """
+        frame_count = max(1, int(round(duration * framerate)))
+        video_filter = (
+            f"[0:v]scale={resolution[0]}:{resolution[1]},format={STILL_VIDEO_ENCODER_SETTINGS['pix_fmt']},"
+            f"loop=loop={frame_count - 1}:size=1:start=0,setpts=N/{framerate}/TB[v]"
+        )
+        encoder = STILL_VIDEO_ENCODER_SETTINGS
+        return (
+            f"{self.ffmpeg_base_command} -y {input_args} "
+            f"-f lavfi -i anullsrc=channel_layout=stereo:sample_rate=44100 "
+            f'-filter_complex "{video_filter}" -map "[v]" -map 1:a '
+            f"-c:v {encoder['video_codec']} -preset {encoder['preset']} -tune {encoder['tune']} -r {framerate} -frames:v {frame_count} "
+            f'-c:a {encoder["audio_codec"]} -t {duration} "{video_path}"'
         )
 
+    def _run_still_video_command(self, ffmpeg_command, video_path, input=None):
+        """Run ffmpeg, raising if it fails so a broken clip is never used or stored in the render cache."""
         self.logger.info("Generating video...")
         self.logger.debug(f"Running command: {ffmpeg_command}")
-        os.system(ffmpeg_command)
+        try:
+            subprocess.run(ffmpeg_command, shell=True, input=input, check=True)
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"ffmpeg failed to generate video {video_path} with exit code {e.returncode}")
+            # Don't leave a partial clip behind for a later step to pick up
+            if os.path.exists(video_path):
+                os.remove(video_path)
+            raise Exception(f"Failed to generate video {video_path}: ffmpeg exited with code {e.returncode}") from e
+
+    def _create_video_from_frame(self, frame, video_path, duration, resolution=(3840, 2160), framerate=30):
+        """Create a video from an in-memory RGB image, streaming its raw pixels to ffmpeg over stdin.
+
+        This avoids compressing the frame to PNG and decoding it again just to encode the video.
+        """
+        input_args = f"-f rawvideo -pix_fmt rgb24 -s {frame.width}x{frame.height} -framerate 1 -i pipe:0"
+        ffmpeg_command = self._build_still_video_command(input_args, video_path, duration, resolution, framerate)
+        self._run_still_video_command(ffmpeg_command, video_path, input=frame.tobytes())
+
+    def _create_video_from_image(self, image_path, video_path, duration, resolution=(3840, 2160), framerate=30):
+        """Create a video from a static image file."""
+        ffmpeg_command = self._build_still_video_command(f'-i "{image_path}"', video_path, duration, resolution, framerate)
+        self._run_still_video_command(ffmpeg_command, video_path)
 
     def _transform_text(self, text, transform_type):
         """Helper method to transform text based on specified type."""
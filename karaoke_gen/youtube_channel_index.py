@@ -0,0 +1,149 @@
+import os
+import json
+import fcntl
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# Bump when the index file format changes, so old files are rebuilt rather than misread
+YOUTUBE_CHANNEL_INDEX_VERSION = 1
+
+# Maximum page size for playlistItems().list
+PLAYLIST_PAGE_SIZE = 50
+
+
+class YouTubeChannelIndex:
+    """A local index of the video IDs and titles uploaded to a YouTube channel, stored as a JSON file per channel.
+
+    The index is kept up to date from the channel's uploads playlist, which costs 1 API quota unit per 50 videos,
+    rather than searching the channel for every title (100 units per search). Each sync only pages back as far as
+    the newest upload seen by the previous sync. Videos we upload or delete ourselves are recorded straight away.
+
+    Several processes (e.g. server jobs) can share an index directory: every update re-reads the index file and
+    writes it back while holding a lock on it, so one job's changes never overwrite another's.
+
+    Videos deleted outside karaoke-gen stay in the index until it's rebuilt with refresh=True.
+    """
+
+    def __init__(self, index_dir, logger, refresh=False):
+        self.index_dir = index_dir
+        self.logger = logger
+        self.refresh = refresh
+        # Channels already rebuilt by this instance, when refresh is set
+        self.refreshed_channels = set()
+        self.lock = threading.Lock()
+
+    def _get_path(self, channel_id):
+        return os.path.join(self.index_dir, f"youtube_channel_{channel_id}.json")
+
+    def _empty_index(self):
+        return {"version": YOUTUBE_CHANNEL_INDEX_VERSION, "uploads_playlist_id": None, "last_synced_video_id": None, "videos": {}}
+
+    @contextmanager
+    def _locked(self, channel_id):
+        """Hold the channel's index lock, shared with other threads and processes, while reading and updating it."""
+        with self.lock:
+            try:
+                os.makedirs(self.index_dir, exist_ok=True)
+                lock_file = open(f"{self._get_path(channel_id)}.lock", "a")
+            except OSError as e:
+                self.logger.warning(f"Failed to lock YouTube channel index in {self.index_dir}, updating it unlocked: {e}")
+                yield
+                return
+
+            with lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                yield
+
+    def _load(self, channel_id):
+        index = None
+        index_path = self._get_path(channel_id)
+        try:
+            with open(index_path, "r") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Ignoring unreadable YouTube channel index {index_path}: {e}")
+
+        if index is None or index.get("version") != YOUTUBE_CHANNEL_INDEX_VERSION:
+            index = self._empty_index()
+        return index
+
+    def _save(self, channel_id, index):
+        """Write the channel's index to a temporary file first, so readers never see a partial index."""
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=self.index_dir)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(index, f)
+                os.replace(temp_path, self._get_path(channel_id))
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        except OSError as e:
+            self.logger.warning(f"Failed to save YouTube channel index in {self.index_dir}: {e}")
+
+    def get_uploads_playlist_id(self, youtube, channel_id, index):
+        if index["uploads_playlist_id"] is None:
+            response = youtube.channels().list(part="contentDetails", id=channel_id).execute()
+            index["uploads_playlist_id"] = response["items"][0]["contentDetails"]["relatedPlaylists"]["uploads"]
+        return index["uploads_playlist_id"]
+
+    def sync(self, youtube, channel_id):
+        """Add uploads made since the last sync to the index, paging through the whole uploads playlist the first time."""
+        with self._locked(channel_id):
+            rebuild = self.refresh and channel_id not in self.refreshed_channels
+            index = self._empty_index() if rebuild else self._load(channel_id)
+            playlist_id = self.get_uploads_playlist_id(youtube, channel_id, index)
+
+            # The uploads playlist lists the newest uploads first
+            new_videos = []
+            newest_video_id = None
+            page_token = None
+            reached_last_sync = False
+            while not reached_last_sync:
+                response = (
+                    youtube.playlistItems()
+                    .list(part="snippet", playlistId=playlist_id, maxResults=PLAYLIST_PAGE_SIZE, pageToken=page_token)
+                    .execute()
+                )
+                for item in response.get("items", []):
+                    video_id = item["snippet"]["resourceId"]["videoId"]
+                    if video_id == index["last_synced_video_id"]:
+                        reached_last_sync = True
+                        break
+                    newest_video_id = newest_video_id or video_id
+                    new_videos.append((video_id, item["snippet"]["title"]))
+
+                page_token = response.get("nextPageToken")
+                if not page_token:
+                    break
+
+            for video_id, title in new_videos:
+                index["videos"][video_id] = title
+            if newest_video_id:
+                index["last_synced_video_id"] = newest_video_id
+
+            self.logger.info(f"Synced YouTube channel index for {channel_id}: {len(new_videos)} new, {len(index['videos'])} videos in total")
+            self._save(channel_id, index)
+            if rebuild:
+                self.refreshed_channels.add(channel_id)
+
+    def get_videos(self, channel_id):
+        """Return (video_id, title) for every video in the channel's index."""
+        return list(self._load(channel_id)["videos"].items())
+
+    def add_video(self, channel_id, video_id, title):
+        with self._locked(channel_id):
+            index = self._load(channel_id)
+            index["videos"][video_id] = title
+            self._save(channel_id, index)
+
+    def remove_video(self, channel_id, video_id):
+        with self._locked(channel_id):
+            index = self._load(channel_id)
+            if index["videos"].pop(video_id, None) is not None:
+                self._save(channel_id, index)
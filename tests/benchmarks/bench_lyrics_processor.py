@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for splitting lyrics into lines of at most 36 characters in LyricsProcessor.
+
+Runs LyricsProcessor.process_lyrics (and process_line, line by line) over a corpus of lyrics files, alongside
+a reference copy of the original iterative splitter, checks all of them produce identical lines and reports
+timings as JSON:
+
+    python -m tests.benchmarks.bench_lyrics_processor --corpus ~/lyrics --output before.json
+
+The corpus is any mix of files and directories of plain text (.txt) or LRC (.lrc) lyrics; LRC timestamps are
+stripped. Without --corpus, a deterministic synthetic corpus is generated instead.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, project_root)
+
+from karaoke_gen.lyrics_processor import LyricsProcessor
+
+LRC_TIMESTAMP_PATTERN = re.compile(r"^\s*(\[[^\]]*\]\s*)+")
+SYNTHETIC_WORDS = (
+    "I you we love heart night baby tonight never forever dancing in the dark and but (oh yeah) (hey), "
+    "gonna wanna feel this way, again under moonlight through the fire running home to you, alright "
+    "somebody everybody nothing everything supercalifragilisticexpialidocious"
+).split()
+
+
+def reference_find_best_split_point(line, logger):
+    """The original find_best_split_point, including its debug logging."""
+    logger.debug(f"Finding best_split_point for line: {line}")
+    words = line.split()
+    mid_word_index = len(words) // 2
+    logger.debug(f"words: {words} mid_word_index: {mid_word_index}")
+
+    if "," in line:
+        mid_point = len(" ".join(words[:mid_word_index]))
+        comma_indices = [i for i, char in enumerate(line) if char == ","]
+        for index in comma_indices:
+            if abs(mid_point - index) < 20 and len(line[: index + 1].strip()) <= 36:
+                logger.debug(
+                    f"Found comma at index {index} which is within 20 characters of mid_point {mid_point} and results in a suitable line length, accepting as split point"
+                )
+                return index + 1
+
+    if " and " in line:
+        mid_point = len(line) // 2
+        and_indices = [m.start() for m in re.finditer(" and ", line)]
+        for index in sorted(and_indices, key=lambda x: abs(x - mid_point)):
+            if len(line[: index + len(" and ")].strip()) <= 36:
+                logger.debug(f"Found 'and' at index {index} which results in a suitable line length, accepting as split point")
+                return index + len(" and ")
+
+    if len(words) > 2 and mid_word_index > 0:
+        split_at_middle = len(" ".join(words[:mid_word_index]))
+        if split_at_middle <= 36:
+            logger.debug(f"Splitting at middle word index: {mid_word_index}")
+            return split_at_middle
+
+    forced_split_point = 36
+    if len(line) > forced_split_point:
+        logger.debug(f"Line is still too long, forcibly splitting at position {forced_split_point}")
+        return forced_split_point
+
+
+def reference_process_line(line, logger):
+    """The original process_line."""
+    processed_lines = []
+    iteration_count = 0
+    max_iterations = 100
+
+    while len(line) > 36:
+        if iteration_count > max_iterations:
+            logger.error(f"Maximum iterations exceeded in process_line for line: {line}")
+            break
+
+        if "(" in line and ")" in line:
+            start_paren = line.find("(")
+            end_paren = line.find(")") + 1
+            if end_paren < len(line) and line[end_paren] == ",":
+                end_paren += 1
+
+            if start_paren > 0:
+                processed_lines.append(line[:start_paren].strip())
+            processed_lines.append(line[start_paren:end_paren].strip())
+            line = line[end_paren:].strip()
+        else:
+            split_point = reference_find_best_split_point(line, logger)
+            processed_lines.append(line[:split_point].strip())
+            line = line[split_point:].strip()
+
+        iteration_count += 1
+
+    if line:
+        processed_lines.append(line)
+
+    return processed_lines
+
+
+def load_corpus(paths):
+    documents = []
+    for path in paths:
+        if os.path.isdir(path):
+            file_paths = sorted(glob.glob(os.path.join(path, "**", "*.txt"), recursive=True))
+            file_paths += sorted(glob.glob(os.path.join(path, "**", "*.lrc"), recursive=True))
+        else:
+            file_paths = [path]
+
+        for file_path in file_paths:
+            with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+            if file_path.endswith(".lrc"):
+                lines = [LRC_TIMESTAMP_PATTERN.sub("", line) for line in lines]
+            documents.append("\n".join(lines))
+    return documents
+
+
+def synthetic_corpus(document_count, seed=0):
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(document_count):
+        lines = []
+        for _ in range(rng.randint(30, 80)):
+            line = " ".join(rng.choice(SYNTHETIC_WORDS) for _ in range(rng.randint(0, 30)))
+            lines.append(line)
+        documents.append("\n".join(lines))
+    return documents
+
+
+def time_best(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=project_root, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark LyricsProcessor line splitting.")
+    parser.add_argument("--corpus", nargs="+", help="Lyrics files or directories of .txt/.lrc files (default: synthetic corpus).")
+    parser.add_argument("--synthetic-documents", type=int, default=500, help="Number of synthetic documents to generate (default: %(default)s).")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs; the fastest is reported (default: %(default)s).")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    logger = logging.getLogger("bench_lyrics_processor")
+    logger.setLevel(logging.INFO)
+    lyrics_processor = LyricsProcessor(
+        logger=logger,
+        style_params_json=None,
+        lyrics_file=None,
+        skip_transcription=True,
+        skip_transcription_review=True,
+        render_video=False,
+        subtitle_offset_ms=0,
+    )
+
+    documents = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.synthetic_documents)
+    all_lines = [line for document in documents for line in document.splitlines()]
+
+    def run_reference():
+        return [[processed for line in document.splitlines() for processed in reference_process_line(line, logger)] for document in documents]
+
+    def run_process_line():
+        return [[processed for line in document.splitlines() for processed in lyrics_processor.process_line(line)] for document in documents]
+
+    def run_process_lyrics():
+        return [lyrics_processor.process_lyrics(document) for document in documents]
+
+    reference_output = run_reference()
+    mismatches = sum(output != reference_output for output in (run_process_line(), run_process_lyrics()))
+    if mismatches:
+        logger.error("Split lyrics do not match the reference implementation")
+
+    timings = {
+        "reference": time_best(run_reference, args.repeat),
+        "process_line": time_best(run_process_line, args.repeat),
+        "process_lyrics": time_best(run_process_lyrics, args.repeat),
+    }
+
+    report = {
+        "benchmark": "lyrics_processor",
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": "files" if args.corpus else "synthetic",
+        "documents": len(documents),
+        "lines": len(all_lines),
+        "lines_over_max_length": sum(len(line) > 36 for line in all_lines),
+        "output_matches_reference": not mismatches,
+        "repeat": args.repeat,
+        "seconds": {name: round(seconds, 4) for name, seconds in timings.items()},
+        "speedup_vs_reference": {
+            name: round(timings["reference"] / seconds, 2) for name, seconds in timings.items() if name != "reference" and seconds
+        },
+    }
+
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report_json + "\n")
+    else:
+        print(report_json)
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
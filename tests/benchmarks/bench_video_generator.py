@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Benchmark title and end screen rendering in VideoGenerator.
+
+Renders title and end screens for real, with the bundled font, across a matrix of title lengths, gradients,
+background image vs colour and output types, and reports per-phase timings and peak memory as JSON so
+results can be compared between commits:
+
+    python -m tests.benchmarks.bench_video_generator --output before.json
+    git checkout <other-commit>
+    python -m tests.benchmarks.bench_video_generator --output after.json
+
+Phases:
+    background - creating or loading/resizing the background image
+    text_fit   - calculate_text_size_to_fit, searching for the font size which fits each region
+    draw       - drawing the text onto the background (excluding text_fit)
+    save       - writing the PNG/JPG outputs, excluding time spent waiting on the video encode
+    encode     - encoding the video clip with ffmpeg
+
+peak_traced_mb is the per-case tracemalloc peak, covering Python and NumPy allocations; PIL image buffers are
+not traced, so the process-wide max_rss_mb is reported too.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import wraps
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, project_root)
+
+from karaoke_gen import video_generator as video_generator_module
+from karaoke_gen.config import DEFAULT_STYLE_PARAMS, setup_end_format, setup_ffmpeg_command, setup_title_format
+from karaoke_gen.video_generator import VideoGenerator
+
+TITLE_LENGTHS = {
+    "short": ("ABBA", "Waterloo"),
+    "medium": ("Fleetwood Mac", "Go Your Own Way"),
+    "long": ("Red Hot Chili Peppers", "Give It Away (Live At Slane Castle, Remastered Extended Version)"),
+}
+BACKGROUNDS = ("color", "image")
+GRADIENTS = ("off", "on")
+OUTPUTS = ("png", "jpg", "video", "all")
+SCREENS = ("title", "end")
+
+BACKGROUND_IMAGE = os.path.join(project_root, "tests", "data", "karaoke-title-screen-background-nomad-4k.png")
+GRADIENT = {"color1": "#ffdf6b", "color2": "#ff7acc", "direction": "horizontal", "start": 0.2, "stop": 0.8}
+PHASES = ("background", "text_fit", "draw", "save", "encode")
+
+
+def build_format(screen, background, gradient):
+    style_params = json.loads(json.dumps(DEFAULT_STYLE_PARAMS))
+    screen_params = style_params["intro" if screen == "title" else "end"]
+    screen_params["font"] = "AvenirNext-Bold.ttf"
+
+    if screen == "end":
+        # Render the same text regions as the title screen, as most real end screen styles do
+        for key in ("title_region", "artist_region", "extra_text_region"):
+            screen_params[key] = DEFAULT_STYLE_PARAMS["intro"][key]
+
+    if background == "image":
+        screen_params["background_image"] = BACKGROUND_IMAGE
+
+    if gradient == "on":
+        screen_params["title_gradient"] = GRADIENT
+        screen_params["artist_gradient"] = GRADIENT
+        screen_params["extra_text_gradient"] = GRADIENT
+
+    return setup_title_format(style_params) if screen == "title" else setup_end_format(style_params)
+
+
+class PhaseTimer:
+    """Wraps VideoGenerator methods on one instance to accumulate wall time per phase."""
+
+    def __init__(self, generator):
+        self.timings = dict.fromkeys(PHASES, 0.0)
+        self._output_files = 0.0
+        self._render_all_text = 0.0
+
+        self._wrap(generator, "_create_background", "background")
+        self._wrap(generator, "calculate_text_size_to_fit", "text_fit")
+        self._wrap(generator, "_render_all_text", "_render_all_text")
+        self._wrap(generator, "_save_output_files", "_output_files")
+        self._wrap(generator, "_create_video_from_frame", "encode")
+        self._wrap(generator, "_create_video_from_image", "encode")
+
+    def _wrap(self, generator, method_name, phase):
+        method = getattr(generator, method_name, None)
+        if method is None:
+            return
+
+        @wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._add(phase, time.perf_counter() - start)
+
+        setattr(generator, method_name, timed)
+
+    def _add(self, phase, elapsed):
+        if phase in self.timings:
+            self.timings[phase] += elapsed
+        else:
+            setattr(self, phase, getattr(self, phase) + elapsed)
+
+    def results(self):
+        timings = dict(self.timings)
+        timings["draw"] = max(0.0, self._render_all_text - timings["text_fit"])
+        timings["save"] = max(0.0, self._output_files - timings["encode"])
+        return {phase: round(seconds, 4) for phase, seconds in timings.items()}
+
+
+def run_case(case, work_dir, ffmpeg_base_command, logger):
+    screen, length, gradient, background, output = case
+    artist, title = TITLE_LENGTHS[length]
+    render_video = output in ("video", "all")
+
+    generator = VideoGenerator(
+        logger=logger,
+        ffmpeg_base_command=ffmpeg_base_command,
+        render_bounding_boxes=False,
+        output_png=output in ("png", "all"),
+        output_jpg=output in ("jpg", "all"),
+    )
+    timer = PhaseTimer(generator)
+    format = build_format(screen, background, gradient)
+
+    output_image_filepath_noext = os.path.join(work_dir, f"{screen}-{length}-{gradient}-{background}-{output}")
+    output_video_filepath = f"{output_image_filepath_noext}.mov"
+    create_method = generator.create_title_video if screen == "title" else generator.create_end_video
+
+    # Measure the cold path; bulk runs only pay for decoding/resizing the background once.
+    # Older commits being compared against don't have the cache.
+    resized_background_cache = getattr(video_generator_module, "_resized_background_cache", None)
+    if resized_background_cache is not None:
+        resized_background_cache.clear()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    create_method(artist, title, format, output_image_filepath_noext, output_video_filepath, None, 5 if render_video else 0)
+    total = time.perf_counter() - start
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    output_sizes = {}
+    for extension in ("png", "jpg", "mov"):
+        output_path = f"{output_image_filepath_noext}.{extension}"
+        if os.path.exists(output_path):
+            output_sizes[extension] = os.path.getsize(output_path)
+
+    return {
+        "screen": screen,
+        "title_length": length,
+        "gradient": gradient,
+        "background": background,
+        "output": output,
+        "phases": timer.results(),
+        "total": round(total, 4),
+        "peak_traced_mb": round(peak_traced / (1024 * 1024), 1),
+        "output_bytes": output_sizes,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=project_root, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def max_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark VideoGenerator title and end screen rendering.")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of times to run each case; the fastest run is reported (default: %(default)s).")
+    parser.add_argument("--screens", nargs="+", choices=SCREENS, default=list(SCREENS))
+    parser.add_argument("--title-lengths", nargs="+", choices=list(TITLE_LENGTHS), default=list(TITLE_LENGTHS))
+    parser.add_argument("--gradients", nargs="+", choices=GRADIENTS, default=list(GRADIENTS))
+    parser.add_argument("--backgrounds", nargs="+", choices=BACKGROUNDS, default=list(BACKGROUNDS))
+    parser.add_argument("--outputs", nargs="+", choices=OUTPUTS, default=list(OUTPUTS))
+    parser.add_argument("--keep-outputs", action="store_true", help="Keep the rendered files and print where they are.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    logger = logging.getLogger("bench_video_generator")
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+
+    outputs = list(args.outputs)
+    if not shutil.which("ffmpeg"):
+        skipped = [output for output in outputs if output in ("video", "all")]
+        if skipped:
+            logger.warning(f"ffmpeg not found, skipping outputs: {', '.join(skipped)}")
+        outputs = [output for output in outputs if output not in skipped]
+
+    cases = list(itertools.product(args.screens, args.title_lengths, args.gradients, args.backgrounds, outputs))
+    work_dir = tempfile.mkdtemp(prefix="karaoke-gen-bench-")
+    ffmpeg_base_command = setup_ffmpeg_command(logging.INFO)
+
+    results = []
+    try:
+        for index, case in enumerate(cases, start=1):
+            runs = [run_case(case, work_dir, ffmpeg_base_command, logger) for _ in range(max(1, args.repeat))]
+            best = min(runs, key=lambda run: run["total"])
+            print(f"[{index}/{len(cases)}] {' '.join(case)}: {best['total']:.3f}s", file=sys.stderr)
+            results.append(best)
+    finally:
+        if args.keep_outputs:
+            print(f"Rendered outputs kept in: {work_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "benchmark": "video_generator",
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "max_rss_mb": max_rss_mb(),
+        "cases": results,
+    }
+
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report_json + "\n")
+    else:
+        print(report_json)
+
+
+if __name__ == "__main__":
+    main()
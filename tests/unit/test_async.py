@@ -456,6 +456,41 @@ class TestAsync:
         with pytest.raises(Exception, match="Failed to find 'entries' in playlist, cannot process"):
             await basic_karaoke_gen.process_playlist()
     
+    @pytest.mark.asyncio
+    async def test_process_playlist_lazily(self, basic_karaoke_gen):
+        """Test lazy playlist processing resolves each flat entry's full info and processes tracks in order."""
+        basic_karaoke_gen.artist = "Test Artist"
+        basic_karaoke_gen.title = "Test Title"
+        basic_karaoke_gen.persistent_artist = "Test Artist"
+        consumed = []
+
+        def flat_entries():
+            for index in range(3):
+                consumed.append(index)
+                yield {"_type": "url", "url": f"https://example.com/{index}", "id": str(index), "title": f"Track {index}"}
+
+        basic_karaoke_gen.extracted_info = {"entries": flat_entries()}
+
+        def resolve(url, *args, **kwargs):
+            index = url.rsplit("/", 1)[1]
+            return {"url": url, "extractor_key": "Youtube", "id": index, "title": f"Test Artist - Track {index}"}
+
+        processed_urls = []
+
+        async def prep_single_track():
+            processed_urls.append(basic_karaoke_gen.url)
+            return {"title": basic_karaoke_gen.title}
+
+        with patch('karaoke_gen.karaoke_gen.extract_info_for_online_media', side_effect=resolve) as mock_extract, \
+             patch.object(basic_karaoke_gen, 'prep_single_track', side_effect=prep_single_track):
+            result = await basic_karaoke_gen.process_playlist_lazily()
+
+        assert consumed == [0, 1, 2]
+        assert mock_extract.call_count == 3
+        assert processed_urls == ["https://example.com/0", "https://example.com/1", "https://example.com/2"]
+        # The first entry keeps the given title, later entries take theirs from the metadata
+        assert result == [{"title": "Test Title"}, {"title": "Track 1"}, {"title": "Track 2"}]
+
     @pytest.mark.asyncio
     async def test_process_folder(self, basic_karaoke_gen, temp_dir):
         """Test processing a folder."""
@@ -594,3 +629,24 @@ class TestAsync:
             assert len(result) == 2
             assert result[0] == {"track": "result1"}
             assert result[1] == {"track": "result2"}
+
+    @pytest.mark.asyncio
+    async def test_process_online_media_lazy_playlist_single_video(self, basic_karaoke_gen):
+        """Test with lazy_playlist a single video URL is resolved once, by the lazy extraction, not looked up again."""
+        basic_karaoke_gen.input_media = "https://example.com/video"
+        basic_karaoke_gen.artist = "Test Artist"
+        basic_karaoke_gen.title = "Test Title"
+        basic_karaoke_gen.lazy_playlist = True
+        video_info = {"title": "Test Video", "extractor_key": "Youtube", "id": "12345", "webpage_url": "https://example.com/video"}
+
+        with patch('karaoke_gen.karaoke_gen.extract_playlist_info_lazily', return_value=video_info) as mock_extract_lazily, \
+             patch('karaoke_gen.karaoke_gen.extract_info_for_online_media') as mock_extract, \
+             patch.object(basic_karaoke_gen, 'prep_single_track', new_callable=AsyncMock, return_value={"track": "result"}):
+            result = await basic_karaoke_gen.process()
+
+        mock_extract_lazily.assert_called_once_with(
+            "https://example.com/video", basic_karaoke_gen.logger, basic_karaoke_gen.cookies_str, metadata_cache=basic_karaoke_gen.metadata_cache
+        )
+        mock_extract.assert_not_called()
+        assert basic_karaoke_gen.extracted_info == video_info
+        assert result == [{"track": "result"}]
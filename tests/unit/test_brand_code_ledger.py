@@ -0,0 +1,77 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+from karaoke_gen.brand_code_ledger import SQLiteBrandCodeLedger, InMemoryBrandCodeLedger
+
+
+@pytest.fixture
+def mock_logger():
+    return MagicMock()
+
+
+@pytest.fixture
+def ledger(tmp_path, mock_logger):
+    return SQLiteBrandCodeLedger(str(tmp_path / "ledger" / "brand-codes.sqlite3"), mock_logger)
+
+
+class TestSQLiteBrandCodeLedger:
+    def test_scans_once_then_increments(self, ledger):
+        """Test the first allocation builds the ledger from a scan, and later ones don't scan at all."""
+        scan = MagicMock(return_value=[1, 5, 3])
+
+        assert ledger.allocate("NOMAD", scan) == 6
+        assert ledger.allocate("NOMAD", scan) == 7
+        scan.assert_called_once()
+
+    def test_prefixes_are_independent(self, ledger):
+        """Test each brand prefix has its own sequence."""
+        assert ledger.allocate("NOMAD", lambda: [10]) == 11
+        assert ledger.allocate("OTHER", lambda: []) == 1
+
+    def test_rebuild_never_goes_backwards(self, ledger):
+        """Test a rebuild picks up higher numbers from the scan but never reuses reserved numbers."""
+        ledger.allocate("NOMAD", lambda: [5])
+
+        assert ledger.allocate("NOMAD", lambda: [20], rebuild=True) == 21
+        assert ledger.allocate("NOMAD", lambda: [1], rebuild=True) == 22
+
+    def test_failed_scan_reserves_nothing(self, ledger):
+        """Test an error while building the ledger leaves it unchanged."""
+        with pytest.raises(RuntimeError):
+            ledger.allocate("NOMAD", MagicMock(side_effect=RuntimeError("rclone failed")))
+
+        assert ledger.allocate("NOMAD", lambda: [2]) == 3
+
+    def test_concurrent_allocations_are_unique(self, tmp_path, mock_logger):
+        """Test allocations from separate ledger instances on the same file never return the same number."""
+        db_path = str(tmp_path / "brand-codes.sqlite3")
+
+        def allocate(_):
+            return SQLiteBrandCodeLedger(db_path, mock_logger).allocate("NOMAD", lambda: [100])
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            numbers = list(executor.map(allocate, range(40)))
+
+        assert sorted(numbers) == list(range(101, 141))
+
+
+class TestInMemoryBrandCodeLedger:
+    def test_scans_once_then_increments(self, mock_logger):
+        """Test the first allocation per prefix scans, later ones don't, and a rebuild never goes backwards."""
+        ledger = InMemoryBrandCodeLedger(mock_logger)
+        scan = MagicMock(return_value=[1, 5, 3])
+
+        assert ledger.allocate("NOMAD", scan) == 6
+        assert ledger.allocate("NOMAD", scan) == 7
+        scan.assert_called_once()
+        assert ledger.allocate("OTHER", lambda: []) == 1
+        assert ledger.allocate("NOMAD", lambda: [1], rebuild=True) == 8
+
+    def test_concurrent_allocations_are_unique(self, mock_logger):
+        """Test threads sharing one ledger never get the same number."""
+        ledger = InMemoryBrandCodeLedger(mock_logger)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            numbers = list(executor.map(lambda _: ledger.allocate("NOMAD", lambda: [100]), range(40)))
+
+        assert sorted(numbers) == list(range(101, 141))
@@ -5,6 +5,7 @@ import csv
 import os
 import logging
 import json
+import time
 from unittest.mock import patch, MagicMock, AsyncMock, mock_open, call
 
 # Import the module/functions to test
@@ -71,6 +72,11 @@ def mock_args(tmp_path):
         enable_txt=False,
         log_level=logging.INFO, # Use numeric level directly as processed in bulk_cli
         dry_run=False,
+        render_cache_dir=str(tmp_path / "render-cache"),
+        transcription_cache_dir=str(tmp_path / "transcription-cache"),
+        metadata_cache_dir=str(tmp_path / "metadata-cache"),
+        metadata_workers=2,
+        metadata_rate_limit=None,
     )
     return args
 
@@ -169,6 +175,10 @@ async def test_process_track_prep_success(mock_getcwd, mock_chdir, mock_kprep, m
         dry_run=mock_args.dry_run,
         render_video=False,
         create_track_subfolders=True,
+        render_cache_dir=mock_args.render_cache_dir,
+        transcription_cache_dir=mock_args.transcription_cache_dir,
+        metadata_cache_dir=mock_args.metadata_cache_dir,
+        input_media_info=None,
     )
     mock_kprep_instance.process.assert_awaited_once()
     mock_chdir.assert_called_once_with("/fake/original/dir") # Changed back at the end
@@ -229,6 +239,10 @@ async def test_process_track_render_success(
         render_video=True,
         create_track_subfolders=True,
         skip_transcription_review=True,
+        render_cache_dir=mock_args.render_cache_dir,
+        transcription_cache_dir=mock_args.transcription_cache_dir,
+        metadata_cache_dir=mock_args.metadata_cache_dir,
+        input_media_info=None,
     )
     mock_kprep_instance.process.assert_awaited_once()
 
@@ -699,16 +713,16 @@ async def test_process_csv_rows(mock_process_prep, mock_process_render, mock_upd
     
     # Verify process_track_prep was called for uploaded tracks
     assert mock_process_prep.call_count == 2
-    mock_process_prep.assert_any_call(rows[0], mock_args, mock_logger, mock_log_formatter)
-    mock_process_prep.assert_any_call(rows[1], mock_args, mock_logger, mock_log_formatter)
+    mock_process_prep.assert_any_call(rows[0], mock_args, mock_logger, mock_log_formatter, input_media_info=None)
+    mock_process_prep.assert_any_call(rows[1], mock_args, mock_logger, mock_log_formatter, input_media_info=None)
     
     # Verify process_track_render was called for 'uploaded' and 'prep_complete' tracks
     # With our changes to process_csv_rows, it's now called for each track
     assert mock_process_render.call_count == 4  # Updated from 2 to 4
-    mock_process_render.assert_any_call(rows[0], mock_args, mock_logger, mock_log_formatter)
-    mock_process_render.assert_any_call(rows[1], mock_args, mock_logger, mock_log_formatter)
-    mock_process_render.assert_any_call(rows[2], mock_args, mock_logger, mock_log_formatter)
-    mock_process_render.assert_any_call(rows[3], mock_args, mock_logger, mock_log_formatter)
+    mock_process_render.assert_any_call(rows[0], mock_args, mock_logger, mock_log_formatter, input_media_info=None)
+    mock_process_render.assert_any_call(rows[1], mock_args, mock_logger, mock_log_formatter, input_media_info=None)
+    mock_process_render.assert_any_call(rows[2], mock_args, mock_logger, mock_log_formatter, input_media_info=None)
+    mock_process_render.assert_any_call(rows[3], mock_args, mock_logger, mock_log_formatter, input_media_info=None)
     
     # Verify update_csv_status was called for each processed track
     assert mock_update_csv.call_count == 6  # Updated from 4 to 6
@@ -753,3 +767,47 @@ async def test_process_csv_rows_dry_run(mock_process_prep, mock_process_render,
     # Verify results
     assert results["prep_success"] == 1
     assert results["prep_failed"] == 0
+
+
+@pytest.mark.asyncio
+@patch("karaoke_gen.utils.bulk_cli.extract_info_for_online_media")
+async def test_resolve_rows_metadata(mock_extract_info, mock_args, mock_logger, tmp_path):
+    """Test metadata is resolved for pending URL/search rows only, stored alongside the CSV and reused on re-runs."""
+    mock_args.metadata_cache_dir = ""
+    mock_extract_info.side_effect = lambda url, artist, title, logger, metadata_cache=None: {
+        "url": url or f"https://www.youtube.com/watch?v={artist[-3:]}",
+        "ie_key": "Youtube",
+        "id": artist[-3:],
+        "title": f"{artist} - {title}",
+        "formats": [],
+    }
+
+    rows = [
+        {"Artist": "Artist One", "Title": "Title One", "Mixed Audio Filename": "https://youtu.be/abc", "Instrumental Audio Filename": "inst1.mp3", "Status": "Uploaded"},
+        {"Artist": "Artist Two", "Title": "Title Two", "Mixed Audio Filename": "", "Instrumental Audio Filename": "inst2.mp3", "Status": "Prep_Complete"},
+        {"Artist": "Artist Three", "Title": "Title Three", "Mixed Audio Filename": "mix3.mp3", "Instrumental Audio Filename": "inst3.mp3", "Status": "Uploaded"},
+        {"Artist": "Artist Four", "Title": "Title Four", "Mixed Audio Filename": "", "Instrumental Audio Filename": "inst4.mp3", "Status": "Completed"},
+    ]
+    csv_path = str(tmp_path / "input.csv")
+
+    resolved = await bulk_cli.resolve_rows_metadata(csv_path, rows, mock_args, mock_logger)
+
+    # Local files and rows which aren't pending are left alone
+    assert set(resolved) == {0, 1}
+    assert mock_extract_info.call_count == 2
+    mock_extract_info.assert_any_call("https://youtu.be/abc", "Artist One", "Title One", mock_logger, metadata_cache=None)
+    mock_extract_info.assert_any_call(None, "Artist Two", "Title Two", mock_logger, metadata_cache=None)
+    assert resolved[0]["info"] == {"webpage_url": "https://youtu.be/abc", "ie_key": "Youtube", "id": "One", "title": "Artist One - Title One"}
+    assert resolved[1]["info"]["webpage_url"] == "https://www.youtube.com/watch?v=Two"
+    assert resolved[0]["expires_at"] > resolved[1]["expires_at"] > time.time()
+
+    # A re-run reads the stored results instead of looking them up again
+    mock_extract_info.reset_mock()
+    assert os.path.isfile(bulk_cli.get_metadata_file_path(csv_path))
+    assert await bulk_cli.resolve_rows_metadata(csv_path, rows, mock_args, mock_logger) == resolved
+    mock_extract_info.assert_not_called()
+
+    # Once they expire, they're looked up again
+    with patch("karaoke_gen.utils.bulk_cli.time.time", return_value=resolved[0]["expires_at"] + 1):
+        assert set(await bulk_cli.resolve_rows_metadata(csv_path, rows, mock_args, mock_logger)) == {0, 1}
+    assert mock_extract_info.call_count == 2
@@ -0,0 +1,69 @@
+import os
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from karaoke_gen.encoder_probe_cache import EncoderProbeCache
+
+
+@pytest.fixture
+def mock_logger():
+    return MagicMock()
+
+
+class TestEncoderProbeCache:
+    def test_round_trip(self, tmp_path, mock_logger):
+        """Test stored results can be read back and missing or corrupt entries are treated as misses."""
+        cache = EncoderProbeCache(str(tmp_path / "cache"), mock_logger)
+
+        assert cache.get("missing") is None
+
+        cache.put("key", {"aac_codec": "libfdk_aac", "nvenc_available": False})
+        assert cache.get("key") == {"aac_codec": "libfdk_aac", "nvenc_available": False}
+
+        with open(os.path.join(tmp_path, "cache", "encoder_probe_corrupt.json"), "w") as f:
+            f.write("{not json")
+        assert cache.get("corrupt") is None
+        mock_logger.warning.assert_called_once()
+
+    def test_refresh_ignores_cached_results(self, tmp_path, mock_logger):
+        """Test refresh=True treats every entry as a miss, while still storing new results."""
+        EncoderProbeCache(str(tmp_path), mock_logger).put("key", {"aac_codec": "aac", "nvenc_available": False})
+
+        refreshing_cache = EncoderProbeCache(str(tmp_path), mock_logger, refresh=True)
+        assert refreshing_cache.get("key") is None
+
+        refreshing_cache.put("key", {"aac_codec": "aac_at", "nvenc_available": False})
+        assert EncoderProbeCache(str(tmp_path), mock_logger).get("key")["aac_codec"] == "aac_at"
+
+    def test_expired_results_are_misses(self, tmp_path, mock_logger):
+        """Test entries stored with a TTL are only returned until they expire, while entries without one don't expire."""
+        cache = EncoderProbeCache(str(tmp_path), mock_logger)
+        cache.put("negative", {"aac_codec": "aac", "nvenc_available": False}, ttl_seconds=60)
+        cache.put("positive", {"aac_codec": "aac", "nvenc_available": True})
+
+        assert cache.get("negative")["nvenc_available"] is False
+
+        with patch("karaoke_gen.encoder_probe_cache.time.time", return_value=time.time() + 61):
+            assert cache.get("negative") is None
+            assert cache.get("positive")["nvenc_available"] is True
+
+    @patch("karaoke_gen.encoder_probe_cache.get_gpu_driver_fingerprint")
+    @patch("karaoke_gen.encoder_probe_cache.get_ffmpeg_version")
+    def test_cache_key_depends_on_ffmpeg_and_gpu(self, mock_ffmpeg_version, mock_gpu_fingerprint, tmp_path, mock_logger):
+        """Test the cache key changes with the ffmpeg version and GPU driver, and there's no key if ffmpeg can't run."""
+        cache = EncoderProbeCache(str(tmp_path), mock_logger)
+        mock_ffmpeg_version.return_value = "ffmpeg version 7.1"
+        mock_gpu_fingerprint.return_value = {"nvidia_smi": None, "driver": None}
+
+        key = cache.get_cache_key("ffmpeg")
+        assert key == cache.get_cache_key("ffmpeg")
+
+        mock_ffmpeg_version.return_value = "ffmpeg version 7.2"
+        assert cache.get_cache_key("ffmpeg") != key
+
+        mock_ffmpeg_version.return_value = "ffmpeg version 7.1"
+        mock_gpu_fingerprint.return_value = {"nvidia_smi": "/usr/bin/nvidia-smi", "driver": "NVRM version: 550.54"}
+        assert cache.get_cache_key("ffmpeg") != key
+
+        mock_ffmpeg_version.return_value = None
+        assert cache.get_cache_key("ffmpeg") is None
@@ -62,6 +62,7 @@ def mock_base_args():
         finalise_only=False,
         edit_lyrics=False,
         test_email_template=False,
+        reconcile_public_share=False,
         skip_transcription=False,
         skip_separation=False,
         skip_lyrics=False,
@@ -87,8 +88,32 @@ def mock_base_args():
         subtitle_offset_ms=0,
         skip_transcription_review=False,
         style_params_json=None,
+        render_cache_dir=None,
+        transcription_cache_dir=None,
+        metadata_cache_dir=None,
+        lazy_playlist=False,
         enable_cdg=False,
         enable_txt=False,
+        single_pass_encode=False,
+        concat_stream_copy=False,
+        parallel_encode=False,
+        cpu_budget=None,
+        flac_intermediate=False,
+        encoder_probe_cache_dir=None,
+        refresh_encoder_probe=False,
+        brand_code_ledger=None,
+        rebuild_brand_code_ledger=False,
+        upload_deliverables=None,
+        rclone_transfers=None,
+        rclone_checkers=None,
+        incremental_public_share_sync=False,
+        youtube_resumable_upload=False,
+        youtube_upload_chunk_mb=64,
+        concurrent_distribution=False,
+        youtube_channel_index_dir=None,
+        refresh_youtube_channel_index=False,
+        finalise_batch_dirs=None,
+        finalise_batch_workers=1,
         brand_prefix=None,
         organised_dir=None,
         organised_dir_rclone_root=None,
@@ -364,6 +389,54 @@ async def test_workflow_test_email_template(mock_kfinalise, mock_base_args, mock
     assert mock_logger.info.called
 
 
+@patch("karaoke_gen.utils.gen_cli.KaraokePrep")
+@patch("karaoke_gen.utils.gen_cli.KaraokeFinalise")
+@patch("karaoke_gen.utils.gen_cli.BatchKaraokeFinalise")
+async def test_workflow_finalise_batch(mock_batch, mock_kfinalise, mock_kprep, mock_base_args, mock_logger):
+    """Test --finalise-only with --finalise_batch_dirs finalises every directory through one batch, and fails if any track did."""
+    mock_base_args.finalise_only = True
+    mock_base_args.finalise_batch_dirs = ["track1", "track2"]
+    mock_base_args.finalise_batch_workers = 2
+    mock_batch.return_value.process.return_value = [
+        {"track_dir": "track1", "result": MOCK_FINAL_TRACK, "error": None},
+        {"track_dir": "track2", "result": None, "error": "No suitable files found for processing."},
+    ]
+
+    with patch("karaoke_gen.utils.gen_cli.argparse.ArgumentParser") as mock_parser, \
+         patch("karaoke_gen.utils.gen_cli.logging.getLogger", return_value=mock_logger):
+        mock_parser.return_value.parse_args.return_value = mock_base_args
+        with pytest.raises(Exception, match="1 of 2 tracks failed"):
+            await gen_cli.async_main()
+
+    mock_batch.assert_called_once()
+    assert mock_batch.call_args.args == (["track1", "track2"],)
+    assert mock_batch.call_args.kwargs["max_workers"] == 2
+    assert mock_batch.call_args.kwargs["brand_prefix"] == mock_base_args.brand_prefix
+    mock_kfinalise.assert_not_called()
+    mock_kprep.assert_not_called()
+
+
+@patch("karaoke_gen.utils.gen_cli.KaraokeFinalise")
+async def test_workflow_reconcile_public_share(mock_kfinalise, mock_base_args, mock_logger):
+    """Test --reconcile_public_share runs a full public share sync and exits."""
+    mock_base_args.reconcile_public_share = True
+    mock_base_args.public_share_dir = "/share"
+    mock_base_args.rclone_destination = "remote:share"
+    mock_kfinalise_instance = mock_kfinalise.return_value
+
+    with patch("karaoke_gen.utils.gen_cli.argparse.ArgumentParser") as mock_parser, \
+         patch("karaoke_gen.utils.gen_cli.logging.getLogger", return_value=mock_logger):
+        mock_parser.return_value.parse_args.return_value = mock_base_args
+        await gen_cli.async_main()
+
+    mock_kfinalise.assert_called_once()
+    finalise_call_kwargs = mock_kfinalise.call_args.kwargs
+    assert finalise_call_kwargs["public_share_dir"] == "/share"
+    assert finalise_call_kwargs["rclone_destination"] == "remote:share"
+    mock_kfinalise_instance.reconcile_public_share_dir_to_rclone_destination.assert_called_once()
+    mock_kfinalise_instance.process.assert_not_called()
+
+
 @patch("karaoke_gen.utils.gen_cli.KaraokePrep") # Use default MagicMock for class
 @patch("karaoke_gen.utils.gen_cli.KaraokeFinalise")
 async def test_workflow_lyrics_only(mock_kfinalise, mock_kprep_class, mock_base_args, mock_logger):
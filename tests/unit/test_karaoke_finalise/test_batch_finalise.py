@@ -0,0 +1,127 @@
+import pytest
+import os
+import threading
+from unittest.mock import patch, MagicMock
+
+from karaoke_gen.karaoke_finalise.karaoke_finalise import KaraokeFinalise
+from karaoke_gen.karaoke_finalise.batch_finalise import BatchKaraokeFinalise
+from karaoke_gen.brand_code_ledger import InMemoryBrandCodeLedger
+from .test_initialization import mock_logger, MINIMAL_CONFIG # Reuse fixtures
+from .test_file_input_validation import BASE_NAME, ARTIST, TITLE # Reuse constants
+
+
+def create_track_dir(parent, name):
+    track_dir = os.path.join(parent, name)
+    os.makedirs(track_dir)
+    for suffix in [" (With Vocals).mov", " (Instrumental Clean).flac", " (Title).mov", " (Title).jpg"]:
+        with open(os.path.join(track_dir, f"{BASE_NAME}{suffix}"), "w") as f:
+            f.write("data")
+    return track_dir
+
+
+@patch.object(KaraokeFinalise, 'detect_encoder_capabilities', return_value=('libfdk_aac', False))
+def test_track_dir_files_resolved_without_chdir(mock_detect, tmp_path, mock_logger):
+    """Test a finaliser with track_dir finds and names its files in that directory, leaving the current directory alone."""
+    track_dir = create_track_dir(str(tmp_path), f"{ARTIST} - {TITLE}")
+    finaliser = KaraokeFinalise(logger=mock_logger, track_dir=track_dir, **MINIMAL_CONFIG)
+    cwd = os.getcwd()
+
+    with_vocals_file = finaliser.find_with_vocals_file()
+    base_name, artist, title = finaliser.get_names_from_withvocals(with_vocals_file)
+    instrumental_file = finaliser.choose_instrumental_audio_file(base_name)
+    input_files = finaliser.check_input_files_exist(base_name, with_vocals_file, instrumental_file)
+    output_files = finaliser.prepare_output_filenames(base_name)
+
+    assert (base_name, artist, title) == (BASE_NAME, ARTIST, TITLE)
+    assert input_files["with_vocals_mov"] == os.path.join(track_dir, f"{BASE_NAME} (With Vocals).mov")
+    assert input_files["instrumental_audio"] == os.path.join(track_dir, f"{BASE_NAME} (Instrumental Clean).flac")
+    assert output_files["final_karaoke_lossless_mkv"] == os.path.join(track_dir, f"{BASE_NAME} (Final Karaoke Lossless 4k).mkv")
+    assert finaliser.get_track_dir() == track_dir
+    assert os.getcwd() == cwd
+
+
+@patch.object(KaraokeFinalise, 'probe_concat_stream_params', return_value=None)
+@patch.object(KaraokeFinalise, 'detect_encoder_capabilities', return_value=('aac', False))
+def test_process_track_dir_from_another_directory(mock_detect, mock_probe, tmp_path, mock_logger, monkeypatch):
+    """Test the real process() reads, converts and deletes the with vocals file in track_dir, whatever the current directory."""
+    track_dir = create_track_dir(str(tmp_path), f"{ARTIST} - {TITLE}")
+    other_dir = tmp_path / "elsewhere"
+    other_dir.mkdir()
+    monkeypatch.chdir(other_dir)
+    finaliser = KaraokeFinalise(logger=mock_logger, track_dir=track_dir, **MINIMAL_CONFIG)
+    commands = []
+
+    with patch.object(KaraokeFinalise, 'execute_command', side_effect=lambda command, description: commands.append(command)), \
+         patch.object(KaraokeFinalise, 'execute_command_with_fallback', side_effect=lambda gpu, cpu, description: commands.append(cpu)):
+        result = finaliser.process()
+
+    with_vocals_mov = os.path.join(track_dir, f"{BASE_NAME} (With Vocals).mov")
+    assert f'-an -i "{with_vocals_mov}"' in commands[0]
+    assert any(f'-i "{with_vocals_mov}"' in command and "(With Vocals).mp4" in command for command in commands)
+    assert not os.path.exists(with_vocals_mov)
+    assert result["video_with_vocals"] == os.path.join(track_dir, f"{BASE_NAME} (With Vocals).mp4")
+    assert os.listdir(other_dir) == []
+
+
+@patch('os.chdir')
+@patch.object(KaraokeFinalise, 'detect_encoder_capabilities', return_value=('aac', False))
+def test_move_track_dir_to_brand_code_folder_without_chdir(mock_detect, mock_chdir, tmp_path, mock_logger):
+    """Test moving a track_dir finaliser's directory doesn't change directory, and later steps use the new location."""
+    organised_dir = tmp_path / "organised"
+    organised_dir.mkdir()
+    track_dir = create_track_dir(str(tmp_path), f"{ARTIST} - {TITLE}")
+    finaliser = KaraokeFinalise(logger=mock_logger, track_dir=track_dir, organised_dir=str(organised_dir), **MINIMAL_CONFIG)
+    output_files = finaliser.prepare_output_filenames(BASE_NAME)
+
+    finaliser.move_files_to_brand_code_folder("TEST-0001", ARTIST, TITLE, output_files)
+
+    new_dir = os.path.join(str(organised_dir), f"TEST-0001 - {ARTIST} - {TITLE}")
+    mock_chdir.assert_not_called()
+    assert os.path.isfile(os.path.join(new_dir, f"{BASE_NAME} (Title).jpg"))
+    assert finaliser.track_dir == new_dir
+    assert output_files["karaoke_mp4"] == os.path.join(new_dir, f"{BASE_NAME} (Karaoke).mp4")
+
+
+@patch.object(KaraokeFinalise, 'get_channel_id', return_value="channel123")
+@patch.object(KaraokeFinalise, 'authenticate_youtube', autospec=True)
+@patch.object(KaraokeFinalise, 'detect_encoder_capabilities', return_value=('libfdk_aac', True))
+def test_batch_shares_session_across_tracks(mock_detect, mock_auth, mock_channel, tmp_path, mock_logger):
+    """Test a batch probes encoders and signs in to YouTube once, and every track gets the shared session and its own directory."""
+    track_dirs = [create_track_dir(str(tmp_path), f"Track {i}") for i in range(3)]
+    processed = []
+    lock = threading.Lock()
+
+    def fake_process(self, replace_existing=False):
+        with lock:
+            processed.append(self)
+        if self.track_dir.endswith("Track 1"):
+            raise Exception("No suitable files found for processing.")
+        return {"track_dir": self.track_dir}
+
+    mock_auth.side_effect = lambda self: setattr(self, "youtube_credentials", "shared-credentials")
+
+    with patch.object(KaraokeFinalise, 'validate_input_parameters_for_features', autospec=True) as mock_validate:
+        mock_validate.side_effect = lambda self: setattr(self, "youtube_upload_enabled", True)
+        batch = BatchKaraokeFinalise(track_dirs, max_workers=2, logger=mock_logger, **MINIMAL_CONFIG)
+        with patch.object(KaraokeFinalise, 'process', autospec=True, side_effect=fake_process):
+            results = batch.process()
+
+    mock_detect.assert_called_once()
+    mock_auth.assert_called_once()
+    mock_channel.assert_called_once()
+
+    assert [result["track_dir"] for result in results] == track_dirs
+    assert results[0] == {"track_dir": track_dirs[0], "result": {"track_dir": track_dirs[0]}, "error": None}
+    assert results[1]["result"] is None
+    assert results[1]["error"] == "No suitable files found for processing."
+    assert results[2]["error"] is None
+
+    assert sorted(finaliser.track_dir for finaliser in processed) == sorted(track_dirs)
+    for finaliser in processed:
+        assert finaliser.non_interactive is True
+        assert finaliser.logger is mock_logger
+        assert (finaliser.aac_codec, finaliser.nvenc_available) == ('libfdk_aac', True)
+        assert finaliser.youtube_credentials == "shared-credentials"
+        assert finaliser.youtube_channel_id == "channel123"
+        assert finaliser.brand_code_ledger is batch.session.brand_code_ledger
+    assert isinstance(batch.session.brand_code_ledger, InMemoryBrandCodeLedger)
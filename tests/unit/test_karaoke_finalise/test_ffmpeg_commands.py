@@ -2,6 +2,8 @@ import pytest
 import os
 import shlex
 import subprocess
+import threading
+import time
 from unittest.mock import patch, MagicMock, call
 
 # Adjust the import path
@@ -131,8 +133,23 @@ def test_remux_with_instrumental(mock_execute, finaliser_with_aac):
     )
     mock_execute.assert_called_once_with(expected_cmd, "Remuxing video with instrumental audio")
 
+@patch.object(KaraokeFinalise, 'execute_command')
+def test_remux_with_instrumental_flac_intermediate(mock_execute, finaliser_with_aac):
+    """Test with flac_intermediate the karaoke video is an MKV with FLAC audio, rather than an MP4 with PCM audio."""
+    finaliser_with_aac.flac_intermediate = True
+    karaoke_file = finaliser_with_aac.prepare_output_filenames(BASE_NAME)["karaoke_mp4"]
+    assert karaoke_file == f"{BASE_NAME} (Karaoke).mkv"
+
+    finaliser_with_aac.remux_with_instrumental(WITH_VOCALS_MOV, INSTRUMENTAL_FLAC, karaoke_file)
+    expected_cmd = (
+        f'{finaliser_with_aac.ffmpeg_base_command} -an -i "{WITH_VOCALS_MOV}" '
+        f'-vn -i "{INSTRUMENTAL_FLAC}" -c:v copy -c:a flac "{karaoke_file}"'
+    )
+    mock_execute.assert_called_once_with(expected_cmd, "Remuxing video with instrumental audio")
+
+@patch.object(KaraokeFinalise, 'probe_concat_stream_params', return_value=None)
 @patch.object(KaraokeFinalise, 'execute_command_with_fallback')
-def test_convert_mov_to_mp4_aac(mock_execute_fallback, finaliser_with_aac):
+def test_convert_mov_to_mp4_aac(mock_execute_fallback, mock_probe, finaliser_with_aac):
     """Test convert_mov_to_mp4 command with basic aac codec (CPU encoding since NVENC disabled)."""
     finaliser_with_aac.convert_mov_to_mp4(WITH_VOCALS_MOV, OUTPUT_FILES["with_vocals_mp4"])
     
@@ -146,8 +163,9 @@ def test_convert_mov_to_mp4_aac(mock_execute_fallback, finaliser_with_aac):
     )
     mock_execute_fallback.assert_called_once_with(expected_gpu_cmd, expected_cpu_cmd, "Converting MOV video to MP4")
 
+@patch.object(KaraokeFinalise, 'probe_concat_stream_params', return_value=None)
 @patch.object(KaraokeFinalise, 'execute_command_with_fallback')
-def test_convert_mov_to_mp4_aac_at(mock_execute_fallback, finaliser_with_aac_at):
+def test_convert_mov_to_mp4_aac_at(mock_execute_fallback, mock_probe, finaliser_with_aac_at):
     """Test convert_mov_to_mp4 command with aac_at codec (CPU encoding since NVENC disabled)."""
     finaliser_with_aac_at.convert_mov_to_mp4(WITH_VOCALS_MOV, OUTPUT_FILES["with_vocals_mp4"])
     
@@ -390,8 +408,9 @@ def test_remux_and_encode_skip_overwrite(
 
 # --- GPU-Accelerated Encoding Tests ---
 
+@patch.object(KaraokeFinalise, 'probe_concat_stream_params', return_value=None)
 @patch.object(KaraokeFinalise, 'execute_command_with_fallback')
-def test_convert_mov_to_mp4_aac_nvenc(mock_execute_fallback, finaliser_with_nvenc_aac):
+def test_convert_mov_to_mp4_aac_nvenc(mock_execute_fallback, mock_probe, finaliser_with_nvenc_aac):
     """Test convert_mov_to_mp4 command with basic aac codec and NVENC acceleration."""
     finaliser_with_nvenc_aac.convert_mov_to_mp4(WITH_VOCALS_MOV, OUTPUT_FILES["with_vocals_mp4"])
     
@@ -405,8 +424,9 @@ def test_convert_mov_to_mp4_aac_nvenc(mock_execute_fallback, finaliser_with_nven
     )
     mock_execute_fallback.assert_called_once_with(expected_gpu_cmd, expected_cpu_cmd, "Converting MOV video to MP4")
 
+@patch.object(KaraokeFinalise, 'probe_concat_stream_params', return_value=None)
 @patch.object(KaraokeFinalise, 'execute_command_with_fallback')
-def test_convert_mov_to_mp4_aac_at_nvenc(mock_execute_fallback, finaliser_with_nvenc_aac_at):
+def test_convert_mov_to_mp4_aac_at_nvenc(mock_execute_fallback, mock_probe, finaliser_with_nvenc_aac_at):
     """Test convert_mov_to_mp4 command with aac_at codec and NVENC acceleration."""
     finaliser_with_nvenc_aac_at.convert_mov_to_mp4(WITH_VOCALS_MOV, OUTPUT_FILES["with_vocals_mp4"])
     
@@ -481,3 +501,310 @@ def test_encode_720p_version_aac_at_nvenc(mock_execute_fallback, finaliser_with_
         f'-c:a aac_at -b:a 128k {finaliser_with_nvenc_aac_at.mp4_flags} "{OUTPUT_FILES["final_karaoke_lossy_720p_mp4"]}"'
     )
     mock_execute_fallback.assert_called_once_with(expected_gpu_cmd, expected_cpu_cmd, "Encoding 720p version of the final video")
+
+
+# --- Single-pass Encoding Tests ---
+
+@patch.object(KaraokeFinalise, 'execute_command_with_fallback')
+def test_encode_all_outputs_single_pass(mock_execute_fallback, finaliser_with_aac):
+    """Test the single-pass command decodes once and feeds every output from the same filter graph."""
+    ffmpeg_filter = '-filter_complex "[0:v:0][0:a:0][1:v:0][1:a:0]concat=n=2:v=1:a=1[outv][outa]"'
+
+    finaliser_with_aac.encode_all_outputs_single_pass("'title.mov'", "'karaoke.mp4'", "", ffmpeg_filter, OUTPUT_FILES)
+
+    gpu_cmd, cpu_cmd, description = mock_execute_fallback.call_args[0]
+    assert description == "Encoding all final video versions in a single pass"
+    assert cpu_cmd.count(" -i ") == 2
+    assert (
+        '-filter_complex "[0:v:0][0:a:0][1:v:0][1:a:0]concat=n=2:v=1:a=1[outv][outa];'
+        '[outv]split=2[v4k][v720in];[v720in]scale=1280:720[v720];[outa]asplit=4[apcm][aaac][aflac][a720]"'
+    ) in cpu_cmd
+    # One video encode shared by the three 4K outputs via the tee muxer, each with its own audio codec
+    assert cpu_cmd.count("-c:v libx264") == 2
+    assert "-c:a:0 pcm_s16le -c:a:1 aac -b:a:1 320k -c:a:2 flac" in cpu_cmd
+    assert "-f tee" in cpu_cmd
+    assert f"]{OUTPUT_FILES['final_karaoke_lossless_mp4']}|" in cpu_cmd
+    assert f"]{OUTPUT_FILES['final_karaoke_lossy_mp4']}|" in cpu_cmd
+    assert f"]{OUTPUT_FILES['final_karaoke_lossless_mkv']}" in cpu_cmd
+    assert cpu_cmd.endswith(
+        f'-c:v libx264 -b:v 2000k -preset medium -tune animation -c:a aac -b:a 128k {finaliser_with_aac.mp4_flags} '
+        f'"{OUTPUT_FILES["final_karaoke_lossy_720p_mp4"]}"'
+    )
+
+def test_escape_tee_output_path(finaliser_with_aac):
+    """Test characters with special meaning to the tee muxer are escaped in output paths."""
+    assert finaliser_with_aac.escape_tee_output_path("Guns N' Roses - Song [Live] | Remix.mp4") == "Guns N\\' Roses - Song \\[Live\\] \\| Remix.mp4"
+
+@patch('os.path.isfile', return_value=False)
+@patch.object(KaraokeFinalise, 'remux_with_instrumental')
+@patch.object(KaraokeFinalise, 'encode_all_outputs_single_pass')
+@patch.object(KaraokeFinalise, 'encode_lossless_mp4')
+@patch.object(KaraokeFinalise, 'encode_lossy_mp4')
+@patch.object(KaraokeFinalise, 'encode_lossless_mkv')
+@patch.object(KaraokeFinalise, 'encode_720p_version')
+def test_remux_and_encode_single_pass(
+    mock_encode_720p, mock_encode_mkv, mock_encode_lossy, mock_encode_lossless,
+    mock_single_pass, mock_remux, mock_isfile, finaliser_with_aac):
+    """Test the single-pass encode replaces the per-version encodes when enabled."""
+    finaliser_with_aac.single_pass_encode = True
+
+    finaliser_with_aac.remux_and_encode_output_video_files(f"{BASE_NAME} (With Vocals).mp4", INPUT_FILES, OUTPUT_FILES)
+
+    mock_single_pass.assert_called_once()
+    mock_encode_lossless.assert_not_called()
+    mock_encode_lossy.assert_not_called()
+    mock_encode_mkv.assert_not_called()
+    mock_encode_720p.assert_not_called()
+
+@patch('os.path.isfile', return_value=False)
+@patch.object(KaraokeFinalise, 'remux_with_instrumental')
+@patch.object(KaraokeFinalise, 'encode_all_outputs_single_pass', side_effect=Exception("tee muxer unavailable"))
+@patch.object(KaraokeFinalise, 'encode_lossless_mp4')
+@patch.object(KaraokeFinalise, 'encode_lossy_mp4')
+@patch.object(KaraokeFinalise, 'encode_lossless_mkv')
+@patch.object(KaraokeFinalise, 'encode_720p_version')
+def test_remux_and_encode_single_pass_fallback(
+    mock_encode_720p, mock_encode_mkv, mock_encode_lossy, mock_encode_lossless,
+    mock_single_pass, mock_remux, mock_isfile, finaliser_with_aac):
+    """Test a failed single-pass encode falls back to encoding each version separately."""
+    finaliser_with_aac.single_pass_encode = True
+
+    finaliser_with_aac.remux_and_encode_output_video_files(f"{BASE_NAME} (With Vocals).mp4", INPUT_FILES, OUTPUT_FILES)
+
+    mock_single_pass.assert_called_once()
+    mock_encode_lossless.assert_called_once()
+    mock_encode_lossy.assert_called_once_with(OUTPUT_FILES["final_karaoke_lossless_mp4"], OUTPUT_FILES["final_karaoke_lossy_mp4"])
+    mock_encode_mkv.assert_called_once_with(OUTPUT_FILES["final_karaoke_lossless_mp4"], OUTPUT_FILES["final_karaoke_lossless_mkv"])
+    mock_encode_720p.assert_called_once_with(OUTPUT_FILES["final_karaoke_lossless_mp4"], OUTPUT_FILES["final_karaoke_lossy_720p_mp4"])
+
+
+# --- Stream Copy Concat Tests ---
+
+KARAOKE_STREAM_PARAMS = {
+    "video_codec": "h264",
+    "profile": "High",
+    "level": 51,
+    "refs": 4,
+    "width": 3840,
+    "height": 2160,
+    "pix_fmt": "yuv420p",
+    "time_base": "1/15360",
+    "r_frame_rate": "30/1",
+    "extradata_size": 47,
+    "extradata_hash": "SHA256:0f1e2d",
+    "audio_codec": "pcm_s16le",
+    "sample_rate": "44100",
+    "channels": 2,
+}
+
+@patch('subprocess.run')
+def test_probe_concat_stream_params(mock_subprocess_run, finaliser_with_aac):
+    """Test the stream parameters needed for stream copy concat are read from ffprobe output."""
+    mock_subprocess_run.return_value = subprocess.CompletedProcess(
+        args="ffprobe",
+        returncode=0,
+        stdout='{"streams": [{"codec_type": "video", "codec_name": "h264", "profile": "High", "level": 51, "refs": 4, "width": 3840, "height": 2160, '
+        '"pix_fmt": "yuv420p", "time_base": "1/15360", "r_frame_rate": "30/1", "extradata_size": 47, "extradata_hash": "SHA256:0f1e2d"}, '
+        '{"codec_type": "audio", "codec_name": "pcm_s16le", "sample_rate": "44100", "channels": 2}]}',
+        stderr="",
+    )
+
+    assert finaliser_with_aac.probe_concat_stream_params(OUTPUT_FILES["karaoke_mp4"]) == KARAOKE_STREAM_PARAMS
+    assert "-show_data_hash sha256" in mock_subprocess_run.call_args[0][0]
+
+    mock_subprocess_run.return_value = subprocess.CompletedProcess(args="ffprobe", returncode=1, stdout="", stderr="error")
+    assert finaliser_with_aac.probe_concat_stream_params(OUTPUT_FILES["karaoke_mp4"]) is None
+
+@patch.object(KaraokeFinalise, 'execute_command')
+def test_render_concat_card(mock_execute, finaliser_with_aac):
+    """Test title/end cards are encoded with the karaoke video's parameters."""
+    finaliser_with_aac.render_concat_card(TITLE_MOV, KARAOKE_STREAM_PARAMS, "card.mp4")
+
+    expected_cmd = (
+        f'{finaliser_with_aac.ffmpeg_base_command} -i "{TITLE_MOV}" -vf "scale=3840:2160,fps=30/1" '
+        f'-c:v libx264 -profile:v high -level:v 51 -refs 4 -pix_fmt yuv420p -video_track_timescale 15360 '
+        f'-c:a pcm_s16le -ar 44100 -ac 2 "card.mp4"'
+    )
+    mock_execute.assert_called_once_with(expected_cmd, f"Rendering {TITLE_MOV} to match the karaoke video")
+
+@patch.object(KaraokeFinalise, 'execute_command')
+@patch.object(KaraokeFinalise, 'render_concat_card')
+@patch.object(KaraokeFinalise, 'probe_concat_stream_params', return_value=KARAOKE_STREAM_PARAMS)
+def test_encode_lossless_mp4_stream_copy(mock_probe, mock_render_card, mock_execute, finaliser_with_aac, tmp_path):
+    """Test matching cards are joined to the karaoke video with the concat demuxer, without re-encoding it."""
+    end_mov = tmp_path / END_MOV
+    end_mov.write_text("end")
+    input_files = {"title_mov": TITLE_MOV, "end_mov": str(end_mov)}
+    karaoke_mp4 = str(tmp_path / OUTPUT_FILES["karaoke_mp4"])
+    output_file = str(tmp_path / OUTPUT_FILES["final_karaoke_lossless_mp4"])
+
+    concat_lists = []
+    def capture_concat_list(command, description):
+        concat_list_file = command.split('-i "', 1)[1].split('"', 1)[0]
+        with open(concat_list_file) as f:
+            concat_lists.append(f.read())
+    mock_execute.side_effect = capture_concat_list
+
+    assert finaliser_with_aac.encode_lossless_mp4_stream_copy(input_files, karaoke_mp4, output_file) is True
+
+    assert mock_render_card.call_count == 2
+    assert mock_render_card.call_args_list[0][0][:2] == (TITLE_MOV, KARAOKE_STREAM_PARAMS)
+    assert mock_render_card.call_args_list[1][0][:2] == (str(end_mov), KARAOKE_STREAM_PARAMS)
+    command, description = mock_execute.call_args[0]
+    assert "-f concat -safe 0" in command and "-c:v copy -c:a pcm_s16le" in command
+    assert command.endswith(f'"{output_file}"')
+    segments = [line.split("'", 1)[1].rsplit("'", 1)[0] for line in concat_lists[0].splitlines()]
+    assert segments[1] == karaoke_mp4
+    assert len(segments) == 3
+    # Temporary cards are cleaned up
+    assert not any(name.startswith(".concat-") for name in os.listdir(tmp_path))
+
+@patch.object(KaraokeFinalise, 'execute_command')
+@patch.object(KaraokeFinalise, 'render_concat_card')
+@patch.object(KaraokeFinalise, 'probe_concat_stream_params')
+def test_encode_lossless_mp4_stream_copy_mismatch(mock_probe, mock_render_card, mock_execute, finaliser_with_aac, tmp_path):
+    """Test stream copy is abandoned if a rendered card doesn't match the karaoke video."""
+    mock_probe.side_effect = [KARAOKE_STREAM_PARAMS, dict(KARAOKE_STREAM_PARAMS, time_base="1/30")]
+    output_file = str(tmp_path / OUTPUT_FILES["final_karaoke_lossless_mp4"])
+
+    assert finaliser_with_aac.encode_lossless_mp4_stream_copy(INPUT_FILES, OUTPUT_FILES["karaoke_mp4"], output_file) is False
+    mock_execute.assert_not_called()
+
+@patch.object(KaraokeFinalise, 'execute_command')
+@patch.object(KaraokeFinalise, 'render_concat_card')
+@patch.object(KaraokeFinalise, 'probe_concat_stream_params')
+def test_encode_lossless_mp4_stream_copy_extradata_mismatch(mock_probe, mock_render_card, mock_execute, finaliser_with_aac, tmp_path):
+    """Test stream copy is abandoned if a card's codec extradata (SPS/PPS) differs, even when everything else matches."""
+    mock_probe.side_effect = [KARAOKE_STREAM_PARAMS, dict(KARAOKE_STREAM_PARAMS, extradata_hash="SHA256:a1b2c3")]
+    output_file = str(tmp_path / OUTPUT_FILES["final_karaoke_lossless_mp4"])
+
+    assert finaliser_with_aac.encode_lossless_mp4_stream_copy(INPUT_FILES, OUTPUT_FILES["karaoke_mp4"], output_file) is False
+    mock_execute.assert_not_called()
+
+@patch.object(KaraokeFinalise, 'render_concat_card')
+@patch.object(KaraokeFinalise, 'probe_concat_stream_params', return_value=dict(KARAOKE_STREAM_PARAMS, video_codec="prores"))
+def test_encode_lossless_mp4_stream_copy_unsupported_codec(mock_probe, mock_render_card, finaliser_with_aac, tmp_path):
+    """Test stream copy isn't attempted for karaoke videos whose codec the cards can't be encoded to."""
+    output_file = str(tmp_path / OUTPUT_FILES["final_karaoke_lossless_mp4"])
+
+    assert finaliser_with_aac.encode_lossless_mp4_stream_copy(INPUT_FILES, OUTPUT_FILES["karaoke_mp4"], output_file) is False
+    mock_render_card.assert_not_called()
+
+@patch('os.path.isfile', return_value=False)
+@patch.object(KaraokeFinalise, 'remux_with_instrumental')
+@patch.object(KaraokeFinalise, 'encode_lossless_mp4_stream_copy', return_value=True)
+@patch.object(KaraokeFinalise, 'encode_lossless_mp4')
+@patch.object(KaraokeFinalise, 'encode_lossy_mp4')
+@patch.object(KaraokeFinalise, 'encode_lossless_mkv')
+@patch.object(KaraokeFinalise, 'encode_720p_version')
+def test_remux_and_encode_concat_stream_copy(
+    mock_encode_720p, mock_encode_mkv, mock_encode_lossy, mock_encode_lossless,
+    mock_stream_copy, mock_remux, mock_isfile, finaliser_with_aac):
+    """Test the concat filter encode is skipped when the stream copy concat succeeds."""
+    finaliser_with_aac.concat_stream_copy = True
+
+    finaliser_with_aac.remux_and_encode_output_video_files(f"{BASE_NAME} (With Vocals).mp4", INPUT_FILES, OUTPUT_FILES)
+
+    mock_stream_copy.assert_called_once_with(INPUT_FILES, OUTPUT_FILES["karaoke_mp4"], OUTPUT_FILES["final_karaoke_lossless_mp4"])
+    mock_encode_lossless.assert_not_called()
+    mock_encode_lossy.assert_called_once()
+    mock_encode_mkv.assert_called_once()
+    mock_encode_720p.assert_called_once()
+
+@patch.object(KaraokeFinalise, 'encode_720p_version')
+@patch.object(KaraokeFinalise, 'encode_lossless_mkv')
+@patch.object(KaraokeFinalise, 'encode_lossy_mp4')
+def test_encode_derived_outputs_small_cpu_budget(mock_lossy, mock_mkv, mock_720p, finaliser_with_aac):
+    """Test a budget smaller than the number of encodes runs them one at a time, never using more threads than budgeted."""
+    finaliser_with_aac.cpu_budget = 2
+    running = []
+    max_threads_running = []
+    lock = threading.Lock()
+
+    def fake_encode(input_file, output_file, threads=None):
+        with lock:
+            running.append(threads)
+            max_threads_running.append(sum(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(threads)
+
+    for mock_encode in (mock_lossy, mock_mkv, mock_720p):
+        mock_encode.side_effect = fake_encode
+
+    finaliser_with_aac.encode_derived_outputs_in_parallel(OUTPUT_FILES)
+
+    for mock_encode in (mock_lossy, mock_mkv, mock_720p):
+        assert mock_encode.call_args.kwargs["threads"] == 2
+    assert max(max_threads_running) == 2
+
+@patch.object(KaraokeFinalise, 'execute_command_with_fallback')
+@patch.object(KaraokeFinalise, 'execute_command')
+def test_encode_derived_outputs_in_parallel(mock_execute, mock_execute_fallback, finaliser_with_aac):
+    """Test the lossy MP4, MKV and 720p versions are encoded from the lossless MP4 with threads shared from the CPU budget."""
+    finaliser_with_aac.cpu_budget = 8
+
+    finaliser_with_aac.encode_derived_outputs_in_parallel(OUTPUT_FILES)
+
+    lossless_mp4 = OUTPUT_FILES["final_karaoke_lossless_mp4"]
+    executed_commands = [c.args[0] for c in mock_execute.call_args_list]
+    assert any(f'-threads 1 {finaliser_with_aac.mp4_flags} "{OUTPUT_FILES["final_karaoke_lossy_mp4"]}"' in cmd for cmd in executed_commands)
+    assert any(f'-c:a flac -threads 1 "{OUTPUT_FILES["final_karaoke_lossless_mkv"]}"' in cmd for cmd in executed_commands)
+    assert all(f'-i "{lossless_mp4}"' in cmd for cmd in executed_commands)
+
+    gpu_cmd, cpu_cmd, _ = mock_execute_fallback.call_args.args
+    assert f'-threads 6 {finaliser_with_aac.mp4_flags} "{OUTPUT_FILES["final_karaoke_lossy_720p_mp4"]}"' in cpu_cmd
+    assert "-threads 6" in gpu_cmd
+
+@patch.object(KaraokeFinalise, 'encode_720p_version')
+@patch.object(KaraokeFinalise, 'encode_lossless_mkv', side_effect=Exception("MKV failed"))
+@patch.object(KaraokeFinalise, 'encode_lossy_mp4', side_effect=Exception("MP4 failed"))
+def test_encode_derived_outputs_in_parallel_aggregates_errors(mock_lossy, mock_mkv, mock_720p, finaliser_with_aac):
+    """Test every encode runs to completion and all failures are reported together."""
+    with pytest.raises(Exception, match="Failed to encode 2 final video version"):
+        finaliser_with_aac.encode_derived_outputs_in_parallel(OUTPUT_FILES)
+
+    mock_720p.assert_called_once()
+    assert finaliser_with_aac.logger.error.call_count == 2
+
+H264_STREAM_PARAMS = {
+    "video_codec": "h264", "profile": "High", "width": 3840, "height": 2160, "pix_fmt": "yuv420p",
+    "time_base": "1/15360", "r_frame_rate": "30/1", "audio_codec": "flac", "sample_rate": "44100", "channels": 2,
+}
+
+@patch.object(KaraokeFinalise, 'execute_command_with_fallback')
+@patch.object(KaraokeFinalise, 'execute_command')
+@patch.object(KaraokeFinalise, 'probe_concat_stream_params', return_value=H264_STREAM_PARAMS)
+def test_convert_mov_to_mp4_remuxes_h264(mock_probe, mock_execute, mock_execute_fallback, finaliser_with_aac):
+    """Test H.264 video is copied into the MP4 and only the audio is encoded."""
+    finaliser_with_aac.convert_mov_to_mp4(WITH_VOCALS_MOV, OUTPUT_FILES["with_vocals_mp4"])
+
+    expected_cmd = (
+        f'{finaliser_with_aac.ffmpeg_base_command} -i "{WITH_VOCALS_MOV}" -map 0:v:0 -map 0:a:0 '
+        f'-c:v copy -c:a aac {finaliser_with_aac.mp4_movflags} "{OUTPUT_FILES["with_vocals_mp4"]}"'
+    )
+    mock_execute.assert_called_once_with(expected_cmd, "Remuxing h264 video to MP4 without re-encoding")
+    mock_execute_fallback.assert_not_called()
+
+@patch.object(KaraokeFinalise, 'execute_command_with_fallback')
+@patch.object(KaraokeFinalise, 'execute_command')
+@patch.object(KaraokeFinalise, 'probe_concat_stream_params', return_value={**H264_STREAM_PARAMS, "video_codec": "prores"})
+def test_convert_mov_to_mp4_encodes_incompatible_codec(mock_probe, mock_execute, mock_execute_fallback, finaliser_with_aac):
+    """Test video which can't go in an MP4 as-is is re-encoded."""
+    finaliser_with_aac.convert_mov_to_mp4(WITH_VOCALS_MOV, OUTPUT_FILES["with_vocals_mp4"])
+
+    mock_execute.assert_not_called()
+    mock_execute_fallback.assert_called_once()
+
+@patch('os.remove')
+@patch('os.path.isfile', return_value=True)
+@patch.object(KaraokeFinalise, 'execute_command_with_fallback')
+@patch.object(KaraokeFinalise, 'execute_command', side_effect=Exception("Remux failed"))
+@patch.object(KaraokeFinalise, 'probe_concat_stream_params', return_value={**H264_STREAM_PARAMS, "video_codec": "hevc", "audio_codec": "aac"})
+def test_convert_mov_to_mp4_remux_failure_falls_back(mock_probe, mock_execute, mock_execute_fallback, mock_isfile, mock_remove, finaliser_with_aac):
+    """Test a failed remux removes the partial output and falls back to re-encoding."""
+    finaliser_with_aac.convert_mov_to_mp4(WITH_VOCALS_MOV, OUTPUT_FILES["with_vocals_mp4"])
+
+    assert "-c:v copy -tag:v hvc1 -c:a copy" in mock_execute.call_args.args[0]
+    mock_remove.assert_called_once_with(OUTPUT_FILES["with_vocals_mp4"])
+    mock_execute_fallback.assert_called_once()
@@ -1,5 +1,6 @@
 import pytest
 import os
+import shlex
 import shutil
 import subprocess
 import time
@@ -75,6 +76,24 @@ def test_get_next_brand_code_dir_missing(mock_isdir, finaliser_for_org):
     with pytest.raises(Exception, match=f"Target directory does not exist: {ORGANISED_DIR}"):
         finaliser_for_org.get_next_brand_code()
 
+@patch('os.listdir')
+@patch('os.path.isdir', return_value=True)
+def test_get_next_brand_code_from_ledger(mock_isdir, mock_listdir, finaliser_for_org):
+    """Test brand codes are reserved from the ledger, which only scans the organised dir to build or rebuild itself."""
+    mock_listdir.return_value = [f"{BRAND_PREFIX}-0005 - Another Artist - Song"]
+    finaliser_for_org.brand_code_ledger = MagicMock()
+    finaliser_for_org.brand_code_ledger.allocate.return_value = 6
+    finaliser_for_org.rebuild_brand_code_ledger = True
+
+    assert finaliser_for_org.get_next_brand_code() == f"{BRAND_PREFIX}-0006"
+
+    brand_prefix, scan_existing_numbers = finaliser_for_org.brand_code_ledger.allocate.call_args.args
+    assert brand_prefix == BRAND_PREFIX
+    assert finaliser_for_org.brand_code_ledger.allocate.call_args.kwargs == {"rebuild": True}
+    assert scan_existing_numbers() == [5]
+    # The rebuild only happens once per instance
+    assert finaliser_for_org.rebuild_brand_code_ledger is False
+
 @patch('os.getcwd', return_value=f"/some/path/{BRAND_PREFIX}-0010 - {ARTIST} - {TITLE}")
 @patch('os.path.basename', return_value=f"{BRAND_PREFIX}-0010 - {ARTIST} - {TITLE}")
 def test_get_existing_brand_code_success(mock_basename, mock_getcwd, finaliser_for_org):
@@ -258,10 +277,11 @@ def test_sync_public_share_dir_to_rclone(mock_quote, mock_execute, mock_join, mo
         call(RCLONE_DEST)
     ], any_order=True)
 
+@patch('time.monotonic', return_value=0)
 @patch('time.sleep')
 @patch('subprocess.run')
 @patch('shlex.quote', side_effect=lambda x: f"'{x}'") # Simple quote mock
-def test_generate_organised_folder_sharing_link(mock_quote, mock_run, mock_sleep, finaliser_for_org):
+def test_generate_organised_folder_sharing_link(mock_quote, mock_run, mock_sleep, mock_monotonic, finaliser_for_org):
     """Test generating the organised folder sharing link."""
     brand_code = f"{BRAND_PREFIX}-0001"
     finaliser_for_org.new_brand_code_dir = f"{brand_code} - {ARTIST} - {TITLE}" # Set this as if move happened
@@ -275,23 +295,56 @@ def test_generate_organised_folder_sharing_link(mock_quote, mock_run, mock_sleep
     expected_rclone_path = f"{ORGANISED_RCLONE_ROOT}/{finaliser_for_org.new_brand_code_dir}"
     expected_cmd = f"rclone link '{expected_rclone_path}'"
 
-    mock_sleep.assert_called_once_with(5)
+    # The link was available straight away, so there's no waiting
+    mock_sleep.assert_not_called()
     mock_quote.assert_called_once_with(expected_rclone_path)
-    mock_run.assert_called_once_with(expected_cmd, shell=True, check=True, capture_output=True, text=True)
+    mock_run.assert_called_once_with(expected_cmd, shell=True, check=True, capture_output=True, text=True, timeout=60)
+    assert finaliser_for_org.brand_code_dir_sharing_link == expected_link
+
+@patch('time.sleep')
+@patch('subprocess.run')
+def test_generate_organised_folder_sharing_link_retries_with_backoff(mock_run, mock_sleep, finaliser_for_org):
+    """Test rclone link is retried with increasing delays until the link is available."""
+    finaliser_for_org.new_brand_code_dir = f"{BRAND_PREFIX}-0001 - {ARTIST} - {TITLE}"
+    expected_link = "https://example.com/share_link"
+    mock_run.side_effect = [
+        subprocess.CalledProcessError(1, "cmd", stderr="not found"),
+        subprocess.CalledProcessError(1, "cmd", stderr="not found"),
+        subprocess.CompletedProcess(args="cmd", returncode=0, stdout=expected_link + "\n", stderr=""),
+    ]
+
+    finaliser_for_org.generate_organised_folder_sharing_link()
+
     assert finaliser_for_org.brand_code_dir_sharing_link == expected_link
+    assert mock_run.call_count == 3
+    assert mock_sleep.call_args_list == [call(0.5), call(1)]
 
+@patch('time.monotonic')
 @patch('time.sleep')
-@patch('subprocess.run', side_effect=subprocess.CalledProcessError(1, "cmd", stderr="Link failed"))
+@patch('subprocess.run')
 @patch('shlex.quote', side_effect=lambda x: f"'{x}'")
-def test_generate_organised_folder_sharing_link_failure(mock_quote, mock_run, mock_sleep, finaliser_for_org):
+def test_generate_organised_folder_sharing_link_failure(mock_quote, mock_run, mock_sleep, mock_monotonic, finaliser_for_org):
     """Test handling failure during sharing link generation."""
     brand_code = f"{BRAND_PREFIX}-0001"
     finaliser_for_org.new_brand_code_dir = f"{brand_code} - {ARTIST} - {TITLE}"
 
-    # No exception expected, should log error
+    # Each rclone run takes 5 seconds, which counts towards the deadline as well as the time spent sleeping
+    clock = [0.0]
+    mock_monotonic.side_effect = lambda: clock[0]
+    mock_sleep.side_effect = lambda seconds: clock.__setitem__(0, clock[0] + seconds)
+
+    def failing_run(*args, **kwargs):
+        clock[0] += 5
+        raise subprocess.CalledProcessError(1, "cmd", stderr="Link failed")
+
+    mock_run.side_effect = failing_run
+
+    # No exception expected, should log error once the retries run out
     finaliser_for_org.generate_organised_folder_sharing_link()
 
     assert finaliser_for_org.brand_code_dir_sharing_link is None
+    assert clock[0] <= 60
+    assert all(c.kwargs["timeout"] <= 60 for c in mock_run.call_args_list)
     # Check that the log message contains the expected error text
     error_log_found = any("Failed to get organised folder sharing link" in call_args[0][0] for call_args in finaliser_for_org.logger.error.call_args_list)
     assert error_log_found, "Expected error log message for failed link generation not found."
@@ -300,6 +353,33 @@ def test_generate_organised_folder_sharing_link_failure(mock_quote, mock_run, mo
     assert stderr_log_found, "Expected stderr log message 'Command output (stderr): Link failed' not found."
 
 
+@patch('time.sleep')
+@patch('subprocess.run', side_effect=subprocess.TimeoutExpired("cmd", 60))
+def test_generate_organised_folder_sharing_link_timeout(mock_run, mock_sleep, finaliser_for_org):
+    """Test a hung rclone link is killed at the deadline and logged rather than blocking finalisation."""
+    finaliser_for_org.new_brand_code_dir = f"{BRAND_PREFIX}-0001 - {ARTIST} - {TITLE}"
+
+    finaliser_for_org.generate_organised_folder_sharing_link()
+
+    assert finaliser_for_org.brand_code_dir_sharing_link is None
+    mock_run.assert_called_once()
+    mock_sleep.assert_not_called()
+    assert any("timed out" in c[0][0] for c in finaliser_for_org.logger.error.call_args_list)
+
+
+@patch('time.sleep')
+@patch('subprocess.run', side_effect=subprocess.TimeoutExpired("cmd", 60))
+def test_generate_organised_folder_sharing_link_server_side_timeout(mock_run, mock_sleep, finaliser_for_org):
+    """Test a hung rclone link in server-side mode is logged rather than failing the whole finalisation."""
+    remote_path = f"{ORGANISED_RCLONE_ROOT}/{BRAND_PREFIX}-0001 - {ARTIST} - {TITLE}"
+
+    finaliser_for_org.generate_organised_folder_sharing_link_server_side(remote_path)
+
+    assert finaliser_for_org.brand_code_dir_sharing_link is None
+    mock_run.assert_called_once()
+    assert any("timed out" in c[0][0] for c in finaliser_for_org.logger.error.call_args_list)
+
+
 @patch('time.sleep')
 @patch('subprocess.run')
 @patch('shlex.quote')
@@ -317,3 +397,115 @@ def test_generate_organised_folder_sharing_link_dry_run(mock_quote, mock_run, mo
     # Check that the log message contains the expected dry run text
     dry_run_log_found = any("DRY RUN: Would get sharing link with:" in call_args[0][0] for call_args in finaliser_for_org.logger.info.call_args_list)
     assert dry_run_log_found, "Expected dry run log message for sharing link not found."
+
+def test_get_upload_manifest(tmp_path, finaliser_for_org):
+    """Test only files in the configured deliverable classes are listed for upload."""
+    base_name = f"{ARTIST} - {TITLE}"
+    for suffix in ("final_karaoke_lossless_mp4", "final_karaoke_lossy_720p_mp4", "final_karaoke_cdg_zip", "karaoke_mp4", "title_mov"):
+        (tmp_path / f"{base_name}{finaliser_for_org.suffixes[suffix]}").write_bytes(b"data")
+    (tmp_path / f"{base_name} (Instrumental model_bs_roformer).flac").write_bytes(b"data")
+    (tmp_path / "stems").mkdir()
+    (tmp_path / "stems" / f"{base_name} (Bass htdemucs).flac").write_bytes(b"data")
+
+    finaliser_for_org.upload_deliverables = ["final_videos", "packages"]
+    assert finaliser_for_org.get_upload_manifest(str(tmp_path)) == [
+        f"{base_name} (Final Karaoke CDG).zip",
+        f"{base_name} (Final Karaoke Lossless 4k).mp4",
+        f"{base_name} (Final Karaoke Lossy 720p).mp4",
+    ]
+
+    finaliser_for_org.upload_deliverables = ["stems"]
+    assert finaliser_for_org.get_upload_manifest(str(tmp_path)) == [
+        f"{base_name} (Instrumental model_bs_roformer).flac",
+        os.path.join("stems", f"{base_name} (Bass htdemucs).flac"),
+    ]
+
+@patch.object(KaraokeFinalise, 'generate_organised_folder_sharing_link_server_side')
+@patch.object(KaraokeFinalise, 'execute_command')
+def test_upload_deliverables_server_side(mock_execute, mock_link, tmp_path, finaliser_for_org):
+    """Test the selective upload uses a manifest, checksum comparison and the configured parallelism."""
+    finaliser_for_org.upload_deliverables = ["final_videos"]
+    finaliser_for_org.rclone_transfers = 8
+    finaliser_for_org.rclone_checkers = 16
+    uploaded_manifest = []
+    mock_execute.side_effect = lambda cmd, description: uploaded_manifest.extend(open(shlex.split(cmd)[5]).read().splitlines())
+
+    with patch.object(KaraokeFinalise, 'get_upload_manifest', return_value=["a (Final Karaoke Lossless 4k).mp4"]), \
+         patch('os.getcwd', return_value=str(tmp_path)):
+        finaliser_for_org.upload_files_to_organized_folder_server_side(f"{BRAND_PREFIX}-0001", ARTIST, TITLE)
+
+    command = mock_execute.call_args.args[0]
+    assert command.startswith("rclone copy -v --checksum --files-from ")
+    assert "--transfers 8 --checkers 16" in command
+    assert uploaded_manifest == ["a (Final Karaoke Lossless 4k).mp4"]
+    assert not os.path.exists(shlex.split(command)[5])
+
+@patch.object(KaraokeFinalise, 'execute_command')
+def test_incremental_public_share_sync(mock_execute, tmp_path, finaliser_for_org):
+    """Test only journaled files are synced, the journal is cleared on success and kept for a retry on failure."""
+    share_dir = tmp_path / "share"
+    for subdir in ("MP4", "MP4-720p", "CDG"):
+        (share_dir / subdir).mkdir(parents=True)
+    output_files = {}
+    for key in ("final_karaoke_lossy_mp4", "final_karaoke_lossy_720p_mp4", "final_karaoke_cdg_zip"):
+        output_files[key] = str(tmp_path / f"{key}.bin")
+        (tmp_path / f"{key}.bin").write_bytes(b"data")
+    finaliser_for_org.public_share_dir = str(share_dir)
+    finaliser_for_org.enable_cdg = True
+    finaliser_for_org.incremental_public_share_sync = True
+    journal_path = share_dir / ".karaoke-gen-sync-journal"
+
+    finaliser_for_org.copy_final_files_to_public_share_dirs(f"{BRAND_PREFIX}-0001", f"{ARTIST} - {TITLE}", output_files)
+    expected_entries = [
+        os.path.join("MP4", f"{BRAND_PREFIX}-0001 - {ARTIST} - {TITLE}.mp4"),
+        os.path.join("MP4-720p", f"{BRAND_PREFIX}-0001 - {ARTIST} - {TITLE}.mp4"),
+        os.path.join("CDG", f"{BRAND_PREFIX}-0001 - {ARTIST} - {TITLE}.zip"),
+    ]
+    assert journal_path.read_text().splitlines() == expected_entries
+
+    mock_execute.side_effect = Exception("rclone failed")
+    with pytest.raises(Exception, match="rclone failed"):
+        finaliser_for_org.sync_public_share_dir_to_rclone_destination()
+    assert journal_path.read_text().splitlines() == expected_entries
+
+    synced_entries = []
+    mock_execute.side_effect = lambda cmd, description: synced_entries.extend(open(shlex.split(cmd)[4]).read().splitlines())
+    finaliser_for_org.sync_public_share_dir_to_rclone_destination()
+
+    command = mock_execute.call_args.args[0]
+    assert command.startswith("rclone copy -v --files-from ")
+    assert command.endswith(f"{shlex.quote(str(share_dir))} {shlex.quote(RCLONE_DEST)}")
+    assert synced_entries == expected_entries
+    assert not journal_path.exists()
+    assert sorted(os.listdir(share_dir)) == [".karaoke-gen-sync-journal.lock", "CDG", "MP4", "MP4-720p"]
+
+def test_public_share_journal_concurrent_and_interrupted_syncs(tmp_path, finaliser_for_org):
+    """Test concurrent syncs take separate journal copies, and a copy left by a crashed sync is retried by the next one."""
+    share_dir = tmp_path / "share"
+    share_dir.mkdir()
+    finaliser_for_org.public_share_dir = str(share_dir)
+    journal_path = share_dir / ".karaoke-gen-sync-journal"
+
+    journal_path.write_text("first.mp4\n")
+    first = finaliser_for_org.take_public_share_journal()
+    journal_path.write_text("second.mp4\n")
+    second = finaliser_for_org.take_public_share_journal()
+
+    assert first.name != second.name
+    assert first.read() == "first.mp4\n"
+    assert second.read() == "second.mp4\n"
+
+    # Another sync while these run leaves their copies alone
+    assert finaliser_for_org.take_public_share_journal() is None
+    assert os.path.exists(first.name) and os.path.exists(second.name)
+
+    finaliser_for_org.release_public_share_journal(first)
+    assert not os.path.exists(first.name)
+
+    # Closing the copy without removing it, as when the process crashes, releases its lock
+    second.close()
+    recovered = finaliser_for_org.take_public_share_journal()
+    assert recovered.read() == "second.mp4\n"
+    assert not os.path.exists(second.name)
+    finaliser_for_org.restore_public_share_journal(recovered)
+    assert journal_path.read_text() == "second.mp4\n"
@@ -2,6 +2,7 @@ import pytest
 import logging
 import os
 import sys
+import time
 from unittest.mock import patch, MagicMock, mock_open
 
 # Adjust the import path based on your project structure
@@ -173,3 +174,38 @@ def test_detect_best_aac_codec_none_found(mock_popen, mock_logger):
     finaliser = KaraokeFinalise(logger=mock_logger, **MINIMAL_CONFIG)
     assert finaliser.aac_codec == "aac"
     mock_logger.info.assert_any_call("Using built-in aac codec (basic quality)")
+
+@patch('karaoke_gen.encoder_probe_cache.get_ffmpeg_version', return_value="ffmpeg version 7.1")
+def test_encoder_probe_results_cached(mock_ffmpeg_version, mock_logger, tmp_path):
+    """Test AAC and NVENC probes run once, then later instances reuse the cached results."""
+    cache_dir = str(tmp_path / "encoders")
+    with patch.object(KaraokeFinalise, 'detect_best_aac_codec', return_value='libfdk_aac') as mock_aac, \
+         patch.object(KaraokeFinalise, 'detect_nvenc_support', return_value=False) as mock_nvenc:
+        KaraokeFinalise(logger=mock_logger, encoder_probe_cache_dir=cache_dir, **MINIMAL_CONFIG)
+        finaliser = KaraokeFinalise(logger=mock_logger, encoder_probe_cache_dir=cache_dir, **MINIMAL_CONFIG)
+
+        assert mock_aac.call_count == 1
+        assert mock_nvenc.call_count == 1
+        assert finaliser.aac_codec == "libfdk_aac"
+        assert finaliser.nvenc_available is False
+
+        KaraokeFinalise(logger=mock_logger, encoder_probe_cache_dir=cache_dir, refresh_encoder_probe=True, **MINIMAL_CONFIG)
+        assert mock_aac.call_count == 2
+
+@patch('karaoke_gen.encoder_probe_cache.get_ffmpeg_version', return_value="ffmpeg version 7.1")
+def test_negative_nvenc_probe_result_expires(mock_ffmpeg_version, mock_logger, tmp_path):
+    """Test a cached 'NVENC unavailable' result is probed again once its short TTL passes, while a positive one is kept."""
+    cache_dir = str(tmp_path / "encoders")
+    with patch.object(KaraokeFinalise, 'detect_best_aac_codec', return_value='aac'), \
+         patch.object(KaraokeFinalise, 'detect_nvenc_support', return_value=False) as mock_nvenc:
+        KaraokeFinalise(logger=mock_logger, encoder_probe_cache_dir=cache_dir, **MINIMAL_CONFIG)
+
+        with patch('karaoke_gen.encoder_probe_cache.time.time', return_value=time.time() + 2 * 60 * 60):
+            mock_nvenc.return_value = True
+            finaliser = KaraokeFinalise(logger=mock_logger, encoder_probe_cache_dir=cache_dir, **MINIMAL_CONFIG)
+            assert mock_nvenc.call_count == 2
+            assert finaliser.nvenc_available is True
+
+        with patch('karaoke_gen.encoder_probe_cache.time.time', return_value=time.time() + 30 * 24 * 60 * 60):
+            KaraokeFinalise(logger=mock_logger, encoder_probe_cache_dir=cache_dir, **MINIMAL_CONFIG)
+            assert mock_nvenc.call_count == 2
@@ -1,5 +1,6 @@
 import pytest
 import os
+import threading
 from unittest.mock import patch, MagicMock, call, ANY
 
 # Adjust the import path
@@ -169,6 +170,75 @@ def test_execute_optional_features_youtube_fails(mock_input, mock_discord, mock_
     assert finaliser_for_process.youtube_url == f"https://www.youtube.com/watch?v=manual_video_id"
     mock_discord.assert_called_once() # Discord should still be called after manual ID entry
 
+@patch.object(KaraokeFinalise, 'get_next_brand_code', return_value=f"{BRAND_PREFIX}-0001")
+def test_execute_optional_features_concurrently(mock_get_next, finaliser_for_process):
+    """Test distribution steps overlap where independent, wait on their dependencies and have their timings recorded."""
+    finaliser_for_process.concurrent_distribution = True
+    finaliser_for_process.keep_brand_code = False
+    finaliser_for_process.new_brand_code_dir_path = os.path.join(ORGANISED_DIR, f"{BRAND_PREFIX}-0001 - {ARTIST} - {TITLE}")
+    # The YouTube upload and sharing link only get past the barrier if they run at the same time
+    overlap = threading.Barrier(2, timeout=5)
+    events = []
+
+    def record(name, wait_for_overlap=False):
+        def step(*args, **kwargs):
+            if wait_for_overlap:
+                overlap.wait()
+            events.append(name)
+        return step
+
+    input_files = dict(ALL_INPUT_FILES)
+    youtube_input_files = []
+
+    def upload_youtube(artist, title, input_files, output_files, replace_existing):
+        youtube_input_files.append(dict(input_files))
+        record("youtube", True)()
+
+    with patch.object(KaraokeFinalise, 'move_files_to_brand_code_folder', side_effect=record("move")), \
+        patch.object(KaraokeFinalise, 'upload_final_mp4_to_youtube_with_title_thumbnail', side_effect=upload_youtube), \
+        patch.object(KaraokeFinalise, 'generate_organised_folder_sharing_link', side_effect=record("link", True)), \
+        patch.object(KaraokeFinalise, 'post_discord_notification', side_effect=record("discord")), \
+        patch.object(KaraokeFinalise, 'copy_final_files_to_public_share_dirs', side_effect=record("copy")), \
+        patch.object(KaraokeFinalise, 'sync_public_share_dir_to_rclone_destination', side_effect=record("sync")):
+        finaliser_for_process.execute_optional_features(ARTIST, TITLE, BASE_NAME, input_files, ALL_OUTPUT_FILES, False)
+
+    assert sorted(events) == ["copy", "discord", "link", "move", "sync", "youtube"]
+    # The upload happens after the move, so it must read the thumbnail from the new folder
+    assert youtube_input_files[0]["title_jpg"] == os.path.join(finaliser_for_process.new_brand_code_dir_path, os.path.basename(ALL_INPUT_FILES["title_jpg"]))
+    assert events[0] == "move"
+    assert events.index("youtube") < events.index("discord")
+    assert events.index("copy") < events.index("sync")
+    assert finaliser_for_process.brand_code == f"{BRAND_PREFIX}-0001"
+
+    results = finaliser_for_process.distribution_step_results
+    assert set(results) == {"organise_files", "sharing_link", "public_share_copy", "public_share_sync", "youtube_upload", "discord_notification"}
+    assert all(result["status"] == "succeeded" and result["duration_seconds"] >= 0 for result in results.values())
+
+@patch.object(KaraokeFinalise, 'upload_final_mp4_to_youtube_with_title_thumbnail')
+@patch.object(KaraokeFinalise, 'post_discord_notification')
+@patch.object(KaraokeFinalise, 'get_next_brand_code', return_value=f"{BRAND_PREFIX}-0001")
+@patch.object(KaraokeFinalise, 'move_files_to_brand_code_folder')
+@patch.object(KaraokeFinalise, 'copy_final_files_to_public_share_dirs', side_effect=Exception("Share unavailable"))
+@patch.object(KaraokeFinalise, 'sync_public_share_dir_to_rclone_destination')
+@patch.object(KaraokeFinalise, 'generate_organised_folder_sharing_link')
+def test_execute_optional_features_concurrently_step_fails(
+    mock_gen_link, mock_sync, mock_copy, mock_move, mock_get_next, mock_discord, mock_youtube, finaliser_for_process):
+    """Test a failed distribution step is recorded and its dependants skipped, while the other steps still run."""
+    finaliser_for_process.concurrent_distribution = True
+    finaliser_for_process.keep_brand_code = False
+    finaliser_for_process.new_brand_code_dir_path = os.path.join(ORGANISED_DIR, f"{BRAND_PREFIX}-0001 - {ARTIST} - {TITLE}")
+
+    finaliser_for_process.execute_optional_features(ARTIST, TITLE, BASE_NAME, ALL_INPUT_FILES, ALL_OUTPUT_FILES, False)
+
+    results = finaliser_for_process.distribution_step_results
+    assert results["public_share_copy"]["status"] == "failed"
+    assert results["public_share_copy"]["error"] == "Share unavailable"
+    assert results["public_share_sync"]["status"] == "skipped"
+    mock_sync.assert_not_called()
+    mock_youtube.assert_called_once()
+    mock_discord.assert_called_once()
+    mock_gen_link.assert_called_once()
+
 # --- process Method Tests ---
 
 @patch.object(KaraokeFinalise, 'validate_input_parameters_for_features')
@@ -205,7 +275,7 @@ def test_process_full_success(
     mock_prep_out.assert_called_once_with(BASE_NAME)
     mock_create_cdg.assert_called_once_with(ALL_INPUT_FILES, ALL_OUTPUT_FILES, ARTIST, TITLE)
     mock_create_txt.assert_called_once_with(ALL_INPUT_FILES, ALL_OUTPUT_FILES)
-    mock_remux_encode.assert_called_once_with(WITH_VOCALS_MOV, ALL_INPUT_FILES, ALL_OUTPUT_FILES)
+    mock_remux_encode.assert_called_once_with(ALL_INPUT_FILES["with_vocals_mov"], ALL_INPUT_FILES, ALL_OUTPUT_FILES)
     mock_exec_opt.assert_called_once_with(ARTIST, TITLE, BASE_NAME, ALL_INPUT_FILES, ALL_OUTPUT_FILES, replace_existing)
     mock_draft_email.assert_called_once_with(ARTIST, TITLE, "mock_yt_url", "mock_share_link")
 
@@ -301,3 +371,28 @@ def test_process_dry_run(
     mock_remux_encode.assert_called_once()
     mock_exec_opt.assert_called_once()
     mock_draft_email.assert_called_once()
+
+def test_create_packages_runs_alongside_video_encode(finaliser_for_process):
+    """Test CDG/TXT packages are created while the videos encode, with the TXT ZIP waiting for the CDG step's MP3."""
+    finaliser_for_process.non_interactive = True
+    encode_started = threading.Event()
+    calls = []
+
+    def create_cdg(*args):
+        assert encode_started.wait(timeout=5), "CDG creation should run while the videos are encoding"
+        calls.append("cdg")
+
+    def create_txt(*args):
+        calls.append("txt")
+
+    def encode(*args):
+        encode_started.set()
+        calls.append("encode")
+
+    with patch.object(KaraokeFinalise, 'create_cdg_zip_file', side_effect=create_cdg), \
+         patch.object(KaraokeFinalise, 'create_txt_zip_file', side_effect=create_txt), \
+         patch.object(KaraokeFinalise, 'remux_and_encode_output_video_files', side_effect=encode):
+        finaliser_for_process.create_packages_and_encode_videos(WITH_VOCALS_MOV, ALL_INPUT_FILES, ALL_OUTPUT_FILES, ARTIST, TITLE)
+
+    assert sorted(calls) == ["cdg", "encode", "txt"]
+    assert calls.index("cdg") < calls.index("txt")
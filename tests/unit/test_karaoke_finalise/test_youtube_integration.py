@@ -5,6 +5,7 @@ from unittest.mock import patch, MagicMock, mock_open, call, ANY
 
 # Adjust the import path
 from karaoke_gen.karaoke_finalise.karaoke_finalise import KaraokeFinalise
+from karaoke_gen.youtube_channel_index import YouTubeChannelIndex
 from .test_initialization import mock_logger, basic_finaliser, MINIMAL_CONFIG # Reuse fixtures
 from .test_file_input_validation import BASE_NAME, ARTIST, TITLE, TITLE_JPG # Reuse constants
 from .test_ffmpeg_commands import OUTPUT_FILES as FFMPEG_OUTPUT_FILES # Reuse constants
@@ -394,6 +395,57 @@ def test_check_if_video_title_exists_not_found(mock_auth, finaliser_for_yt, mock
     assert finaliser_for_yt.youtube_url is None # Check initial state remains None
     assert finaliser_for_yt.skip_notifications is False
 
+@patch.object(KaraokeFinalise, 'authenticate_youtube')
+@patch('thefuzz.fuzz.ratio')
+def test_check_if_video_title_exists_from_channel_index(mock_fuzz_ratio, mock_auth, finaliser_for_yt, mock_youtube_service, tmp_path):
+    """Test the local channel index is matched instead of searching, best match first, and deleting a video removes it."""
+    finaliser_for_yt.non_interactive = True
+    finaliser_for_yt.youtube_channel_index = YouTubeChannelIndex(str(tmp_path), finaliser_for_yt.logger)
+    mock_auth.return_value = mock_youtube_service
+    youtube_title = f"{ARTIST} - {TITLE} (Karaoke)"
+    mock_youtube_service.channels.return_value.list.return_value.execute.return_value = {
+        "items": [{"id": "UC_test_channel_id", "contentDetails": {"relatedPlaylists": {"uploads": "UU_test_uploads"}}}]
+    }
+    mock_youtube_service.playlistItems.return_value.list.return_value.execute.return_value = {
+        "items": [
+            {"snippet": {"title": f"{ARTIST} - {TITLE} (Live) (Karaoke)", "resourceId": {"videoId": "close_video_id"}}},
+            {"snippet": {"title": youtube_title, "resourceId": {"videoId": "exact_video_id"}}},
+            {"snippet": {"title": "Completely Different Title", "resourceId": {"videoId": "other_video_id"}}},
+        ]
+    }
+    mock_fuzz_ratio.side_effect = lambda a, b: {youtube_title.lower(): 100, "completely different title": 30}.get(b, 80)
+
+    exists = finaliser_for_yt.check_if_video_title_exists_on_youtube_channel(youtube_title)
+
+    assert exists is True
+    assert finaliser_for_yt.youtube_video_id == "exact_video_id"
+    assert finaliser_for_yt.skip_notifications is True
+    mock_youtube_service.search.assert_not_called()
+
+    assert finaliser_for_yt.delete_youtube_video("exact_video_id") is True
+    assert ("exact_video_id", youtube_title) not in finaliser_for_yt.youtube_channel_index.get_videos("UC_test_channel_id")
+
+@patch.object(KaraokeFinalise, 'authenticate_youtube')
+@patch('thefuzz.fuzz.ratio', return_value=100)
+def test_check_if_video_title_exists_skips_deleted_index_match(mock_fuzz_ratio, mock_auth, finaliser_for_yt, mock_youtube_service, tmp_path):
+    """Test a match from the channel index which has since been deleted on YouTube isn't auto-confirmed, and is dropped."""
+    finaliser_for_yt.non_interactive = True
+    finaliser_for_yt.youtube_channel_index = YouTubeChannelIndex(str(tmp_path), finaliser_for_yt.logger)
+    finaliser_for_yt.youtube_channel_index.add_video("UC_test_channel_id", "deleted_video_id", f"{ARTIST} - {TITLE} (Karaoke)")
+    mock_auth.return_value = mock_youtube_service
+    mock_youtube_service.channels.return_value.list.return_value.execute.return_value = {
+        "items": [{"id": "UC_test_channel_id", "contentDetails": {"relatedPlaylists": {"uploads": "UU_test_uploads"}}}]
+    }
+    mock_youtube_service.playlistItems.return_value.list.return_value.execute.return_value = {"items": []}
+    mock_youtube_service.videos.return_value.list.return_value.execute.return_value = {"items": []}
+
+    exists = finaliser_for_yt.check_if_video_title_exists_on_youtube_channel(f"{ARTIST} - {TITLE} (Karaoke)")
+
+    assert exists is False
+    assert getattr(finaliser_for_yt, 'youtube_video_id', None) is None
+    mock_youtube_service.videos.return_value.list.assert_called_once_with(part="id", id="deleted_video_id")
+    assert finaliser_for_yt.youtube_channel_index.get_videos("UC_test_channel_id") == []
+
 # --- Delete / Upload Tests ---
 
 @patch.object(KaraokeFinalise, 'authenticate_youtube')
@@ -548,6 +600,37 @@ def test_upload_youtube_exists_replace_delete_fails(mock_delete, mock_check_exis
     assert finaliser_for_yt.youtube_video_id == "existing_id"
     assert finaliser_for_yt.youtube_url == "http://youtube.com/existing_id"
 
+
+@patch('builtins.open', new_callable=mock_open, read_data="Desc")
+@patch('karaoke_gen.karaoke_finalise.karaoke_finalise.MediaFileUpload')
+@patch('karaoke_gen.karaoke_finalise.karaoke_finalise.AuthorizedSession')
+@patch('karaoke_gen.karaoke_finalise.karaoke_finalise.ResumableUpload')
+@patch.object(KaraokeFinalise, 'authenticate_youtube')
+@patch.object(KaraokeFinalise, 'check_if_video_title_exists_on_youtube_channel', return_value=False)
+def test_upload_youtube_resumable(mock_check_exists, mock_auth, mock_uploader_cls, mock_session_cls, mock_media_upload_cls, mock_open_desc, finaliser_for_yt, mock_youtube_service):
+    """Test the video is sent by the chunked resumable uploader, with its session saved next to the MKV, when enabled."""
+    finaliser_for_yt.youtube_resumable_upload = True
+    finaliser_for_yt.youtube_upload_chunk_mb = 16
+    finaliser_for_yt.youtube_credentials = MagicMock()
+    mock_auth.return_value = mock_youtube_service
+    mock_uploader_cls.return_value.upload.return_value = {"id": "resumed_video_id"}
+
+    finaliser_for_yt.upload_final_mp4_to_youtube_with_title_thumbnail(ARTIST, TITLE, INPUT_FILES_YT, OUTPUT_FILES_YT)
+
+    mock_session_cls.assert_called_once_with(finaliser_for_yt.youtube_credentials)
+    uploader_kwargs = mock_uploader_cls.call_args[1]
+    assert uploader_kwargs["session"] == mock_session_cls.return_value
+    assert uploader_kwargs["file_path"] == OUTPUT_FILES_YT["final_karaoke_lossless_mkv"]
+    assert uploader_kwargs["state_file"] == f'{OUTPUT_FILES_YT["final_karaoke_lossless_mkv"]}.youtube-upload.json'
+    assert uploader_kwargs["chunk_size"] == 16 * 1024 * 1024
+    assert uploader_kwargs["metadata"]["snippet"]["title"] == f"{ARTIST} - {TITLE} (Karaoke)"
+
+    mock_youtube_service.videos().insert.assert_not_called()
+    mock_media_upload_cls.assert_called_once_with(INPUT_FILES_YT["title_jpg"], mimetype="image/jpeg")
+    assert finaliser_for_yt.youtube_video_id == "resumed_video_id"
+    assert finaliser_for_yt.youtube_url == "https://www.youtube.com/watch?v=resumed_video_id"
+
+
 @patch.object(KaraokeFinalise, 'authenticate_youtube')
 @patch.object(KaraokeFinalise, 'check_if_video_title_exists_on_youtube_channel', return_value=False)
 def test_upload_youtube_dry_run(mock_check_exists, mock_auth, finaliser_for_yt, mock_youtube_service):
@@ -78,6 +78,23 @@ class TestLyrics:
         # Each line should be 36 characters or less
         for p in processed:
             assert len(p) <= 36
+
+    def test_process_lyrics_matches_process_line(self, basic_karaoke_gen):
+        """Test processing a whole lyrics document gives the same lines as processing each line in turn."""
+        lyrics_processor = basic_karaoke_gen.lyrics_processor
+        lines = [
+            "This is a short line",
+            "",
+            "This is a line with (some parenthetical text), that should be split",
+            "This is a test line and this is the second part of the sentence",
+            "This is a very long line that needs to be split into multiple lines because it exceeds the maximum length",
+        ]
+
+        expected = [processed for line in lines for processed in lyrics_processor.process_line(line)]
+
+        assert lyrics_processor.process_lyrics("\n".join(lines)) == expected
+        assert lyrics_processor.process_lyrics(lines) == expected
+        assert all(len(line) <= 36 for line in expected)
     
     def test_transcribe_lyrics_existing_files_parent_dir(self, basic_karaoke_gen, temp_dir):
         """Test transcribing lyrics when files already exist in parent directory."""
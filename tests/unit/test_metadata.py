@@ -3,6 +3,8 @@ from unittest.mock import MagicMock, patch, call
 # Import the specific class for patching is not needed if we patch the target correctly
 # from yt_dlp import YoutubeDL 
 from karaoke_gen.karaoke_gen import KaraokePrep
+from karaoke_gen.metadata import extract_playlist_info_lazily
+from karaoke_gen.metadata_cache import MetadataCache
 
 class TestMetadata:
     def test_extract_info_for_online_media_with_url(self, basic_karaoke_gen):
@@ -300,3 +302,45 @@ class TestMetadata:
         
         with pytest.raises(Exception, match="Failed to extract artist and title from the input media metadata"):
             basic_karaoke_gen.parse_single_track_metadata(None, None)
+
+    def test_extract_playlist_info_lazily(self, basic_karaoke_gen):
+        """Test lazy playlist extraction returns entries as a generator without resolving them."""
+        def flat_entries():
+            yield {"_type": "url", "url": "https://example.com/1", "id": "1", "title": "Track 1"}
+            yield None
+            yield {"_type": "url", "url": "https://example.com/2", "id": "2", "title": "Track 2"}
+
+        mock_ydl_instance = MagicMock()
+        mock_ydl_instance.extract_info.return_value = {"_type": "playlist", "id": "PL123", "entries": flat_entries()}
+
+        with patch('karaoke_gen.metadata.ydl', return_value=mock_ydl_instance) as mock_ydl:
+            info = extract_playlist_info_lazily("https://example.com/playlist", basic_karaoke_gen.logger)
+
+            ydl_opts = mock_ydl.call_args[0][0]
+            assert ydl_opts["extract_flat"] == "in_playlist"
+            mock_ydl_instance.extract_info.assert_called_once_with("https://example.com/playlist", download=False, process=False)
+            assert not isinstance(info["entries"], list)
+            # The yt-dlp instance stays open until the last entry has been fetched
+            mock_ydl_instance.__exit__.assert_not_called()
+            assert [entry["id"] for entry in info["entries"]] == ["1", "2"]
+            mock_ydl_instance.__exit__.assert_called_once()
+
+    def test_extract_playlist_info_lazily_single_video(self, basic_karaoke_gen, tmp_path):
+        """Test a single video is processed from the lazy extraction rather than extracted again, then cached."""
+        unprocessed_info = {"_type": "video", "id": "12345", "title": "Test Artist - Test Title", "webpage_url": "https://example.com/video", "extractor_key": "Youtube"}
+        processed_info = {**unprocessed_info, "url": "https://cdn.example.com/12345.m4a", "formats": []}
+
+        mock_ydl_instance = MagicMock()
+        mock_ydl_instance.extract_info.return_value = unprocessed_info
+        mock_ydl_instance.process_ie_result.return_value = processed_info
+        metadata_cache = MetadataCache(str(tmp_path), basic_karaoke_gen.logger)
+
+        with patch('karaoke_gen.metadata.ydl', return_value=mock_ydl_instance):
+            info = extract_playlist_info_lazily("https://example.com/video", basic_karaoke_gen.logger, metadata_cache=metadata_cache)
+            cached_info = extract_playlist_info_lazily("https://example.com/video", basic_karaoke_gen.logger, metadata_cache=metadata_cache)
+
+        assert info == processed_info
+        mock_ydl_instance.extract_info.assert_called_once_with("https://example.com/video", download=False, process=False)
+        mock_ydl_instance.process_ie_result.assert_called_once_with(unprocessed_info, download=False)
+        mock_ydl_instance.__exit__.assert_called_once()
+        assert cached_info["webpage_url"] == "https://example.com/video"
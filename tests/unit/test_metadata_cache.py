@@ -0,0 +1,106 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from karaoke_gen.metadata import extract_info_for_online_media, parse_track_metadata
+from karaoke_gen.metadata_cache import MetadataCache, normalise_search_query, normalise_url
+
+
+@pytest.fixture
+def mock_logger():
+    return MagicMock()
+
+
+@pytest.fixture
+def metadata_cache(tmp_path, mock_logger):
+    return MetadataCache(str(tmp_path / "metadata-cache"), mock_logger)
+
+
+class TestMetadataCache:
+    def test_normalise_url(self):
+        """Test equivalent links share a cache key."""
+        assert normalise_url("https://youtu.be/dQw4w9WgXcQ?si=abc") == "youtube:dQw4w9WgXcQ"
+        assert normalise_url("https://www.youtube.com/watch?v=dQw4w9WgXcQ&feature=share") == "youtube:dQw4w9WgXcQ"
+        assert normalise_url("HTTPS://Example.com/video/?b=2&a=1") == "https://example.com/video?a=1&b=2"
+        # Playlist links keep their list parameter
+        assert "list=PL123" in normalise_url("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123")
+
+    def test_normalise_search_query(self):
+        """Test searches differing only in case and whitespace share a cache key."""
+        assert normalise_search_query(" ABBA ", "Waterloo  ") == normalise_search_query("abba", "waterloo")
+
+    def test_put_and_get(self, metadata_cache):
+        """Test only the fields needed to process the track are cached, with a flat search result's url kept as its page URL."""
+        cache_key = metadata_cache.get_cache_key(None, "ABBA", "Waterloo")
+        assert metadata_cache.get(cache_key) is None
+
+        metadata_cache.put(cache_key, {"url": "https://example.com/video", "ie_key": "Youtube", "id": "12345", "title": "ABBA - Waterloo", "formats": [1, 2, 3]})
+
+        info, error, error_type = metadata_cache.get(cache_key)
+        assert info == {"webpage_url": "https://example.com/video", "ie_key": "Youtube", "id": "12345", "title": "ABBA - Waterloo"}
+        assert error is None and error_type is None
+
+    def test_direct_media_url_not_cached(self, metadata_cache, mock_logger):
+        """Test a resolved video's expiring direct media URL isn't cached, so a cache hit is parsed to its page URL."""
+        cache_key = metadata_cache.get_cache_key("https://vimeo.com/12345", None, None)
+        metadata_cache.put(
+            cache_key,
+            {"url": "https://cdn.example.com/12345.mp4?expires=1700000000&sig=abc", "webpage_url": "https://vimeo.com/12345", "extractor_key": "Vimeo", "id": "12345", "title": "ABBA - Waterloo"},
+        )
+
+        info, _, _ = metadata_cache.get(cache_key)
+        assert "url" not in info
+        assert parse_track_metadata(info, None, None, None, mock_logger)["url"] == "https://vimeo.com/12345"
+
+    def test_entries_expire(self, tmp_path, mock_logger):
+        """Test expired entries are treated as misses and can be cleared."""
+        metadata_cache = MetadataCache(str(tmp_path / "metadata-cache"), mock_logger, search_ttl_seconds=-1)
+        cache_key = metadata_cache.get_cache_key(None, "ABBA", "Waterloo")
+
+        metadata_cache.put(cache_key, {"url": "https://example.com/video"})
+
+        assert metadata_cache.get(cache_key) is None
+        assert metadata_cache.clear_expired() == 1
+
+    def test_extract_info_uses_cache(self, metadata_cache, mock_logger):
+        """Test a repeated lookup is answered from the cache without calling yt-dlp."""
+        mock_search_result = {"entries": [{"title": "ABBA - Waterloo", "ie_key": "Youtube", "id": "12345", "url": "https://example.com/video"}]}
+        mock_ydl_instance = MagicMock()
+        mock_ydl_instance.extract_info.return_value = mock_search_result
+
+        with patch("karaoke_gen.metadata.ydl") as mock_ydl_context:
+            mock_ydl_context.return_value.__enter__.return_value = mock_ydl_instance
+
+            first = extract_info_for_online_media(None, "ABBA", "Waterloo", mock_logger, metadata_cache=metadata_cache)
+            second = extract_info_for_online_media(None, "abba", "waterloo", mock_logger, metadata_cache=metadata_cache)
+
+        mock_ydl_instance.extract_info.assert_called_once()
+        assert first == mock_search_result["entries"][0]
+        assert second == {"title": "ABBA - Waterloo", "ie_key": "Youtube", "id": "12345", "webpage_url": "https://example.com/video"}
+
+    def test_extract_info_caches_not_found(self, metadata_cache, mock_logger):
+        """Test a search with no results is cached and raised again without calling yt-dlp."""
+        mock_ydl_instance = MagicMock()
+        mock_ydl_instance.extract_info.return_value = {"entries": []}
+
+        with patch("karaoke_gen.metadata.ydl") as mock_ydl_context:
+            mock_ydl_context.return_value.__enter__.return_value = mock_ydl_instance
+
+            with pytest.raises(IndexError):
+                extract_info_for_online_media(None, "Nobody", "Nothing", mock_logger, metadata_cache=metadata_cache)
+            with pytest.raises(IndexError):
+                extract_info_for_online_media(None, "Nobody", "Nothing", mock_logger, metadata_cache=metadata_cache)
+
+        mock_ydl_instance.extract_info.assert_called_once()
+
+    def test_extract_info_does_not_cache_transient_errors(self, metadata_cache, mock_logger):
+        """Test errors which don't mean the media is missing are retried on the next lookup."""
+        mock_ydl_instance = MagicMock()
+        mock_ydl_instance.extract_info.side_effect = Exception("Sign in to confirm you're not a bot")
+
+        with patch("karaoke_gen.metadata.ydl") as mock_ydl_context:
+            mock_ydl_context.return_value.__enter__.return_value = mock_ydl_instance
+
+            for _ in range(2):
+                with pytest.raises(Exception):
+                    extract_info_for_online_media("https://youtu.be/dQw4w9WgXcQ", None, None, mock_logger, metadata_cache=metadata_cache)
+
+        assert mock_ydl_instance.extract_info.call_count == 2
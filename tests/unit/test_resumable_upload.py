@@ -0,0 +1,209 @@
+import os
+import re
+import json
+import threading
+import pytest
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+from karaoke_gen.resumable_upload import ResumableUpload, ResumableUploadError, CHUNK_SIZE_MULTIPLE
+
+
+class FakeUploadServer:
+    """A local stand-in for the YouTube resumable upload endpoint, which can be told to fail chunk PUTs."""
+
+    def __init__(self):
+        self.received = bytearray()
+        self.total_size = None
+        self.sessions_started = 0
+        self.fail_next_chunks = 0
+        self.fail_chunks_from_offset = None
+        self.fail_next_sessions = 0
+        self.stall_chunks = False
+        self.expired = False
+        self.metadata = None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _respond(self, status, headers=None, body=None):
+                payload = json.dumps(body).encode("utf-8") if body is not None else b""
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _read_body(self):
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def do_POST(self):
+                body = self._read_body()
+                if server.fail_next_sessions:
+                    server.fail_next_sessions -= 1
+                    return self._respond(503)
+                server.metadata = json.loads(body)
+                server.total_size = int(self.headers["X-Upload-Content-Length"])
+                server.received = bytearray()
+                server.sessions_started += 1
+                server.expired = False
+                self._respond(200, {"Location": f"{server.url}/session/{server.sessions_started}"})
+
+            def do_PUT(self):
+                body = self._read_body()
+                if server.expired:
+                    return self._respond(404)
+
+                content_range = self.headers["Content-Range"]
+                if not content_range.startswith("bytes */"):
+                    if server.fail_next_chunks:
+                        server.fail_next_chunks -= 1
+                        return self._respond(503)
+                    if server.fail_chunks_from_offset is not None and len(server.received) >= server.fail_chunks_from_offset:
+                        return self._respond(503)
+                    start = int(re.match(r"bytes (\d+)-", content_range).group(1))
+                    assert start == len(server.received)
+                    if not server.stall_chunks:
+                        server.received.extend(body)
+
+                if len(server.received) == server.total_size:
+                    return self._respond(200, body={"id": "video123"})
+                headers = {"Range": f"bytes=0-{len(server.received) - 1}"} if server.received else {}
+                self._respond(308, headers)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def upload_server():
+    server = FakeUploadServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = tmp_path / "video.mkv"
+    path.write_bytes(os.urandom(CHUNK_SIZE_MULTIPLE * 2 + 1000))
+    return str(path)
+
+
+def make_upload(upload_server, video_file, **kwargs):
+    return ResumableUpload(
+        session=requests.Session(),
+        upload_url=f"{upload_server.url}/upload",
+        params={"part": "snippet,status"},
+        metadata={"snippet": {"title": "Artist - Title (Karaoke)"}},
+        file_path=video_file,
+        mimetype="video/x-matroska",
+        state_file=f"{video_file}.youtube-upload.json",
+        logger=MagicMock(),
+        **{"chunk_size": CHUNK_SIZE_MULTIPLE, **kwargs},
+    )
+
+
+class TestResumableUpload:
+    def test_upload_in_chunks_with_progress(self, upload_server, video_file):
+        """Test the file is sent in chunks, progress is reported after each one and the state file is removed at the end."""
+        progress = []
+        result = make_upload(upload_server, video_file, progress_callback=lambda sent, total: progress.append(sent)).upload()
+
+        file_size = os.path.getsize(video_file)
+        assert result == {"id": "video123"}
+        assert bytes(upload_server.received) == open(video_file, "rb").read()
+        assert upload_server.metadata == {"snippet": {"title": "Artist - Title (Karaoke)"}}
+        assert progress == [CHUNK_SIZE_MULTIPLE, CHUNK_SIZE_MULTIPLE * 2, file_size]
+        assert not os.path.exists(f"{video_file}.youtube-upload.json")
+
+    @patch("karaoke_gen.resumable_upload.time.sleep")
+    def test_interrupted_upload_resumes_from_saved_session(self, mock_sleep, upload_server, video_file):
+        """Test an upload which gives up part way through continues from the server's offset on the next run."""
+        upload_server.fail_chunks_from_offset = CHUNK_SIZE_MULTIPLE
+        with pytest.raises(ResumableUploadError):
+            make_upload(upload_server, video_file, max_retries=2).upload()
+
+        with open(f"{video_file}.youtube-upload.json") as f:
+            assert json.load(f)["offset"] == CHUNK_SIZE_MULTIPLE
+
+        upload_server.fail_chunks_from_offset = None
+        progress = []
+        result = make_upload(upload_server, video_file, progress_callback=lambda sent, total: progress.append(sent)).upload()
+
+        assert result == {"id": "video123"}
+        assert upload_server.sessions_started == 1
+        assert bytes(upload_server.received) == open(video_file, "rb").read()
+        assert progress[0] == CHUNK_SIZE_MULTIPLE * 2
+
+    @patch("karaoke_gen.resumable_upload.time.sleep")
+    def test_transient_errors_are_retried(self, mock_sleep, upload_server, video_file):
+        """Test 5xx responses to chunk PUTs are retried with backoff within the same session."""
+        upload_server.fail_next_chunks = 2
+
+        assert make_upload(upload_server, video_file).upload() == {"id": "video123"}
+        assert upload_server.sessions_started == 1
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [2, 4]
+
+    @patch("karaoke_gen.resumable_upload.time.sleep")
+    def test_chunks_without_progress_count_as_retries(self, mock_sleep, upload_server, video_file):
+        """Test a server which keeps answering 308 without storing anything fails the upload rather than looping forever."""
+        upload_server.stall_chunks = True
+
+        with pytest.raises(ResumableUploadError, match="no bytes received"):
+            make_upload(upload_server, video_file, max_retries=3).upload()
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [2, 4, 8]
+
+    @patch("karaoke_gen.resumable_upload.time.sleep")
+    def test_start_session_retries_transient_errors(self, mock_sleep, upload_server, video_file):
+        """Test 5xx responses and connection errors when creating the session are retried with backoff."""
+        upload_server.fail_next_sessions = 1
+        upload = make_upload(upload_server, video_file)
+        real_post = upload.session.post
+        connection_errors = [requests.ConnectionError("connection reset")]
+
+        def flaky_post(*args, **kwargs):
+            if connection_errors:
+                raise connection_errors.pop()
+            return real_post(*args, **kwargs)
+
+        upload.session.post = MagicMock(side_effect=flaky_post)
+
+        assert upload.upload() == {"id": "video123"}
+        assert upload.session.post.call_count == 3
+        assert upload_server.sessions_started == 1
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [2, 4]
+
+    def test_expired_session_starts_again(self, upload_server, video_file):
+        """Test a saved session the server no longer knows about is replaced by a new one."""
+        upload = make_upload(upload_server, video_file)
+        upload.save_state(f"{upload_server.url}/session/old", CHUNK_SIZE_MULTIPLE)
+        upload_server.expired = True
+
+        assert upload.upload() == {"id": "video123"}
+        assert upload_server.sessions_started == 1
+        assert bytes(upload_server.received) == open(video_file, "rb").read()
+
+    def test_state_for_changed_file_is_ignored(self, upload_server, video_file):
+        """Test a saved session isn't resumed once the file it was for has changed."""
+        upload = make_upload(upload_server, video_file)
+        upload.save_state(f"{upload_server.url}/session/old", CHUNK_SIZE_MULTIPLE)
+
+        with open(video_file, "ab") as f:
+            f.write(b"more")
+
+        assert upload.load_state() is None
+
+    def test_chunk_size_must_be_multiple_of_256k(self, upload_server, video_file):
+        """Test chunk sizes the protocol would reject are refused up front."""
+        with pytest.raises(ValueError):
+            make_upload(upload_server, video_file, chunk_size=1000)
@@ -0,0 +1,74 @@
+import threading
+import pytest
+from unittest.mock import MagicMock
+from karaoke_gen.step_executor import run_steps_concurrently
+
+
+@pytest.fixture
+def mock_logger():
+    return MagicMock()
+
+
+class TestRunStepsConcurrently:
+    def test_steps_wait_for_dependencies(self, mock_logger):
+        """Test each step starts only after its dependencies, and missing dependencies count as met."""
+        events = []
+        lock = threading.Lock()
+
+        def record(name):
+            def step():
+                with lock:
+                    events.append(name)
+            return step
+
+        results = run_steps_concurrently(
+            [
+                ("notify", record("notify"), ["upload"]),
+                ("upload", record("upload"), []),
+                ("link", record("link"), ["organise"]),
+                ("organise", record("organise"), ["not_enabled"]),
+            ],
+            mock_logger,
+        )
+
+        assert events.index("upload") < events.index("notify")
+        assert events.index("organise") < events.index("link")
+        assert {name: result["status"] for name, result in results.items()} == {
+            "notify": "succeeded", "upload": "succeeded", "link": "succeeded", "organise": "succeeded"
+        }
+
+    def test_independent_steps_overlap(self, mock_logger):
+        """Test steps without dependencies between them run at the same time."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        results = run_steps_concurrently([("a", barrier.wait, []), ("b", barrier.wait, [])], mock_logger)
+
+        assert results["a"]["status"] == results["b"]["status"] == "succeeded"
+
+    def test_failure_skips_dependants_only(self, mock_logger):
+        """Test a failing step is recorded, everything depending on it (directly or not) is skipped and the rest still run."""
+        ran = []
+
+        def fail():
+            raise Exception("rclone failed")
+
+        results = run_steps_concurrently(
+            [
+                ("copy", fail, []),
+                ("link", lambda: ran.append("link"), ["sync"]),
+                ("sync", lambda: ran.append("sync"), ["copy"]),
+                ("youtube", lambda: ran.append("youtube"), []),
+            ],
+            mock_logger,
+        )
+
+        assert ran == ["youtube"]
+        assert results["copy"] == {"status": "failed", "duration_seconds": results["copy"]["duration_seconds"], "error": "rclone failed"}
+        assert results["sync"]["status"] == "skipped"
+        assert results["link"]["status"] == "skipped"
+        assert results["youtube"]["status"] == "succeeded"
+
+    def test_circular_dependencies_are_rejected(self, mock_logger):
+        """Test steps which can never start raise rather than hanging."""
+        with pytest.raises(ValueError):
+            run_steps_concurrently([("a", lambda: None, ["b"]), ("b", lambda: None, ["a"])], mock_logger)
@@ -0,0 +1,95 @@
+import os
+import pytest
+from unittest.mock import MagicMock
+from lyrics_transcriber.types import TranscriptionData, TranscriptionResult
+from karaoke_gen.transcription_cache import LocalDirectoryTranscriptionCacheStorage, TranscriptionCache
+
+
+@pytest.fixture
+def mock_logger():
+    return MagicMock()
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    audio_path = tmp_path / "audio.flac"
+    audio_path.write_bytes(b"fake audio data")
+    return str(audio_path)
+
+
+def make_transcriber(transcription_results):
+    """Build a mock LyricsTranscriber whose transcribe() populates the given results."""
+    transcriber = MagicMock()
+    transcriber.transcribers = {"audioshake": {"instance": MagicMock(), "priority": 1}}
+    transcriber.results.transcription_results = []
+
+    def transcribe():
+        transcriber.results.transcription_results = list(transcription_results)
+
+    transcriber.transcribe = MagicMock(side_effect=transcribe)
+    return transcriber
+
+
+class TestTranscriptionCache:
+    def test_local_directory_storage_round_trip(self, tmp_path, mock_logger):
+        """Test stored data can be read back and missing or corrupt entries are treated as misses."""
+        storage = LocalDirectoryTranscriptionCacheStorage(str(tmp_path / "cache"), mock_logger)
+
+        assert storage.get("missing") is None
+
+        storage.put("key", {"transcription_results": []})
+        assert storage.get("key") == {"transcription_results": []}
+
+        with open(os.path.join(tmp_path, "cache", "transcription_corrupt.json"), "w") as f:
+            f.write("{not json")
+        assert storage.get("corrupt") is None
+        mock_logger.warning.assert_called_once()
+
+    def test_cache_key_depends_on_audio_and_transcribers(self, mock_logger):
+        """Test the cache key changes with the audio hash and the configured transcribers."""
+        cache = TranscriptionCache(MagicMock(), mock_logger)
+        transcribers = {"audioshake": {"instance": MagicMock(), "priority": 1}}
+
+        key = cache.get_cache_key("audio-hash", transcribers)
+
+        assert key == cache.get_cache_key("audio-hash", transcribers)
+        assert key != cache.get_cache_key("other-audio-hash", transcribers)
+        assert key != cache.get_cache_key("audio-hash", {"whisper": {"instance": MagicMock(), "priority": 2}})
+
+    def test_attach_stores_then_reuses_transcription(self, tmp_path, mock_logger, audio_file):
+        """Test the first run transcribes and stores the result, and a second run reuses it without transcribing."""
+        cache = TranscriptionCache(LocalDirectoryTranscriptionCacheStorage(str(tmp_path / "cache"), mock_logger), mock_logger)
+        transcription = TranscriptionData(segments=[], words=[], text="hello world", source="audioshake")
+
+        first_transcriber = make_transcriber([TranscriptionResult(name="audioshake", priority=1, result=transcription)])
+        original_first_transcribe = first_transcriber.transcribe
+        cache.attach(first_transcriber, audio_file)
+        first_transcriber.transcribe()
+        original_first_transcribe.assert_called_once()
+
+        second_transcriber = make_transcriber([])
+        original_second_transcribe = second_transcriber.transcribe
+        cache.attach(second_transcriber, audio_file)
+        second_transcriber.transcribe()
+
+        original_second_transcribe.assert_not_called()
+        cached_results = second_transcriber.results.transcription_results
+        assert len(cached_results) == 1
+        assert cached_results[0].name == "audioshake"
+        assert cached_results[0].priority == 1
+        assert cached_results[0].result.text == "hello world"
+
+    def test_attach_without_transcribers_runs_original(self, tmp_path, mock_logger, audio_file):
+        """Test nothing is cached when no transcribers are configured."""
+        storage = MagicMock()
+        cache = TranscriptionCache(storage, mock_logger)
+        transcriber = make_transcriber([])
+        transcriber.transcribers = {}
+        original_transcribe = transcriber.transcribe
+
+        cache.attach(transcriber, audio_file)
+        transcriber.transcribe()
+
+        original_transcribe.assert_called_once()
+        storage.get.assert_not_called()
+        storage.put.assert_not_called()
@@ -3,7 +3,10 @@ import pytest
 from unittest.mock import MagicMock, patch, call, mock_open
 from PIL import Image, ImageDraw, ImageFont
 import json
+import subprocess
+import time
 from karaoke_gen.karaoke_gen import KaraokePrep
+from karaoke_gen.video_generator import RENDER_CACHE_MAX_AGE_SECONDS
 
 class TestVideo:
     def test_create_video_with_defaults(self, basic_karaoke_gen, temp_dir):
@@ -17,7 +20,7 @@ class TestVideo:
              patch('PIL.ImageDraw.Draw') as mock_draw, \
              patch('PIL.Image.open'), \
              patch('PIL.ImageFont.truetype') as mock_truetype, \
-             patch('os.system'):
+             patch('subprocess.run'):
             
             # Configure mock font
             mock_font = MagicMock()
@@ -79,7 +82,7 @@ class TestVideo:
         # Mock dependencies
         with patch('PIL.Image.open') as mock_image_open, \
              patch('shutil.copy2') as mock_copy, \
-             patch('os.system') as mock_os_system: # Assign patch to variable
+             patch('subprocess.run') as mock_subprocess_run:
             
             # Configure mock_image_open to return a mock image
             mock_image = MagicMock()
@@ -101,8 +104,8 @@ class TestVideo:
             # Verify shutil.copy2 was called with correct arguments
             mock_copy.assert_called_once_with(existing_image, output_image_filepath_noext + ".png")
             
-            # Verify os.system was called to create the video
-            mock_os_system.assert_called_once() # Check the patch object directly
+            # Verify ffmpeg was run to create the video
+            mock_subprocess_run.assert_called_once()
     
     def test_create_video_with_background_image(self, basic_karaoke_gen, temp_dir):
         """Test creating a video with a background image."""
@@ -124,7 +127,7 @@ class TestVideo:
              patch('PIL.ImageDraw.Draw') as mock_draw, \
              patch('PIL.ImageFont.truetype') as mock_truetype, \
              patch('os.path.exists', return_value=True), \
-             patch('os.system') as mock_os_system: # Assign patch
+             patch('subprocess.run') as mock_subprocess_run:
             
             # Configure mock font
             mock_font = MagicMock()
@@ -159,8 +162,8 @@ class TestVideo:
             # Verify image.save was called for both PNG and JPG
             assert mock_image.save.call_count == 2 # PNG and JPG
             
-            # Verify os.system was called to create the video
-            mock_os_system.assert_called_once() # Check the patch object
+            # Verify ffmpeg was run to create the video
+            mock_subprocess_run.assert_called_once()
     
     def test_create_video_with_no_output_images(self, basic_karaoke_gen, temp_dir):
         """Test creating a video without saving output images."""
@@ -175,7 +178,7 @@ class TestVideo:
         with patch('PIL.Image.new') as mock_image_new, \
              patch('PIL.ImageDraw.Draw') as mock_draw, \
              patch('PIL.ImageFont.truetype') as mock_truetype, \
-             patch('os.system') as mock_os_system: # Assign patch
+             patch('subprocess.run') as mock_subprocess_run:
             
             # Configure mock font
             mock_font = MagicMock()
@@ -207,8 +210,8 @@ class TestVideo:
             # Verify image.save was not called
             assert mock_image.save.call_count == 0 # No PNG or JPG output
             
-            # Verify os.system was called to create the video
-            mock_os_system.assert_called_once() # Check the patch object
+            # Verify ffmpeg was run to create the video
+            mock_subprocess_run.assert_called_once()
     
     def test_create_video_with_zero_duration(self, basic_karaoke_gen, temp_dir):
         """Test creating a video with zero duration (no video, just images)."""
@@ -220,7 +223,7 @@ class TestVideo:
         with patch('PIL.Image.new') as mock_image_new, \
              patch('PIL.ImageDraw.Draw') as mock_draw, \
              patch('PIL.ImageFont.truetype') as mock_truetype, \
-             patch('os.system') as mock_os_system: # Assign patch
+             patch('subprocess.run') as mock_subprocess_run:
             
             # Configure mock font
             mock_font = MagicMock()
@@ -252,8 +255,8 @@ class TestVideo:
             # Verify image.save was called for both PNG and JPG
             assert mock_image.save.call_count == 2 # PNG and JPG
             
-            # Verify os.system was not called to create the video
-            mock_os_system.assert_not_called() # Check the patch object
+            # Verify ffmpeg was not run to create the video
+            mock_subprocess_run.assert_not_called()
     
     def test_create_title_video(self, basic_karaoke_gen, temp_dir):
         """Test creating a title video."""
@@ -347,3 +350,184 @@ class TestVideo:
         
         # Test None input
         assert basic_karaoke_gen.video_generator._transform_text(None, "uppercase") is None
+    
+    def test_create_gradient_mask(self, basic_karaoke_gen):
+        """Test the gradient mask ramps between start and stop in the configured direction."""
+        gradient = {"color1": "#ff0000", "color2": "#0000ff", "direction": "horizontal", "start": 0.25, "stop": 0.75}
+
+        # Test horizontal gradient
+        mask = basic_karaoke_gen.video_generator._create_gradient_mask((100, 10), gradient)
+        assert mask.mode == "L"
+        assert mask.size == (100, 10)
+        assert mask.getpixel((0, 5)) == 0
+        assert mask.getpixel((50, 5)) == int(255 * (0.5 - 0.25) / 0.5)
+        assert mask.getpixel((99, 5)) == 255
+        assert mask.getpixel((50, 0)) == mask.getpixel((50, 9))
+
+        # Test vertical gradient
+        gradient["direction"] = "vertical"
+        mask = basic_karaoke_gen.video_generator._create_gradient_mask((10, 100), gradient)
+        assert mask.getpixel((5, 0)) == 0
+        assert mask.getpixel((5, 99)) == 255
+        assert mask.getpixel((0, 50)) == mask.getpixel((9, 50))
+    
+    def test_create_video_from_image_encodes_single_still_frame(self, basic_karaoke_gen, temp_dir):
+        """Test the still image clip is decoded once and repeated cheaply rather than re-encoded per frame."""
+        image_path = os.path.join(temp_dir, "output.png")
+        video_path = os.path.join(temp_dir, "output.mov")
+
+        with patch('subprocess.run') as mock_subprocess_run:
+            basic_karaoke_gen.video_generator._create_video_from_image(image_path, video_path, 5, (3840, 2160))
+
+        mock_subprocess_run.assert_called_once()
+        ffmpeg_command = mock_subprocess_run.call_args[0][0]
+        assert f'-i "{image_path}"' in ffmpeg_command
+        assert mock_subprocess_run.call_args[1]["check"] is True
+        assert "-loop 1" not in ffmpeg_command
+        assert "scale=3840:2160,format=yuv420p,loop=loop=149:size=1:start=0" in ffmpeg_command
+        assert "-tune stillimage" in ffmpeg_command
+        assert "-r 30 -frames:v 150" in ffmpeg_command
+        assert "anullsrc=channel_layout=stereo:sample_rate=44100" in ffmpeg_command
+        assert ffmpeg_command.endswith(f'"{video_path}"')
+
+    def test_create_video_from_frame_pipes_raw_rgb(self, basic_karaoke_gen, temp_dir):
+        """Test the rendered frame is streamed to ffmpeg as raw RGB rather than re-read from a PNG."""
+        video_path = os.path.join(temp_dir, "output.mov")
+        frame = Image.new("RGB", (64, 36), (255, 0, 0))
+
+        with patch('subprocess.run') as mock_subprocess_run:
+            mock_subprocess_run.return_value.returncode = 0
+            basic_karaoke_gen.video_generator._create_video_from_frame(frame, video_path, 5, (3840, 2160))
+
+        mock_subprocess_run.assert_called_once()
+        ffmpeg_command = mock_subprocess_run.call_args[0][0]
+        assert "-f rawvideo -pix_fmt rgb24 -s 64x36 -framerate 1 -i pipe:0" in ffmpeg_command
+        assert "scale=3840:2160,format=yuv420p,loop=loop=149:size=1:start=0" in ffmpeg_command
+        assert ffmpeg_command.endswith(f'"{video_path}"')
+        assert mock_subprocess_run.call_args[1]["input"] == frame.tobytes()
+        assert mock_subprocess_run.call_args[1]["check"] is True
+
+    def test_save_output_files_without_png_still_creates_video(self, basic_karaoke_gen, temp_dir):
+        """Test the video no longer depends on the PNG being written."""
+        video_generator = basic_karaoke_gen.video_generator
+        video_generator.output_png = False
+        video_generator.output_jpg = True
+        output_image_filepath_noext = os.path.join(temp_dir, "output")
+        frame = Image.new("RGB", (64, 36), (0, 0, 255))
+
+        with patch.object(video_generator, '_create_video_from_frame') as mock_create_video_from_frame:
+            video_generator._save_output_files(frame, output_image_filepath_noext, os.path.join(temp_dir, "output.mov"), 5, (64, 36))
+
+        mock_create_video_from_frame.assert_called_once()
+        assert not os.path.exists(f"{output_image_filepath_noext}.png")
+        assert os.path.exists(f"{output_image_filepath_noext}.jpg")
+
+    def test_render_cache_store_and_restore(self, basic_karaoke_gen, temp_dir):
+        """Test a rendered screen is stored in the render cache and restored on a later identical render."""
+        video_generator = basic_karaoke_gen.video_generator
+        video_generator.render_cache_dir = os.path.join(temp_dir, "render-cache")
+        video_generator.output_png = True
+        video_generator.output_jpg = False
+
+        format = {"font": None, "background_color": "#000000", "background_image": None, "title_region": "370,200,3100,480", "artist_region": None}
+        cache_key = video_generator._get_render_cache_key("", "Title", "Artist", format, None, (3840, 2160), 5)
+        assert cache_key == video_generator._get_render_cache_key("", "Title", "Artist", format, None, (3840, 2160), 5)
+        assert cache_key != video_generator._get_render_cache_key("", "Other Title", "Artist", format, None, (3840, 2160), 5)
+
+        # Test cache miss
+        first_noext = os.path.join(temp_dir, "first")
+        first_video = os.path.join(temp_dir, "first.mov")
+        assert not video_generator._restore_from_render_cache(cache_key, first_noext, first_video, 5)
+
+        # Test store
+        with open(f"{first_noext}.png", "wb") as f:
+            f.write(b"png data")
+        with open(first_video, "wb") as f:
+            f.write(b"mov data")
+        video_generator._store_in_render_cache(cache_key, first_noext, first_video, 5)
+
+        # Test cache hit
+        second_noext = os.path.join(temp_dir, "second")
+        second_video = os.path.join(temp_dir, "second.mov")
+        assert video_generator._restore_from_render_cache(cache_key, second_noext, second_video, 5)
+        with open(f"{second_noext}.png", "rb") as f:
+            assert f.read() == b"png data"
+        with open(second_video, "rb") as f:
+            assert f.read() == b"mov data"
+
+    def test_render_cache_key_ignores_text_not_drawn(self, basic_karaoke_gen, temp_dir):
+        """Test an end screen which doesn't draw the title or artist is rendered once and reused for every track."""
+        video_generator = basic_karaoke_gen.video_generator
+        video_generator.render_cache_dir = os.path.join(temp_dir, "render-cache")
+        video_generator.output_png = True
+        video_generator.output_jpg = False
+        end_format = {
+            "font": None,
+            "background_color": "#000000",
+            "background_image": None,
+            "title_region": None,
+            "artist_region": None,
+            "extra_text": "THANK YOU FOR SINGING!",
+            "extra_text_region": "0,1200,3840,650",
+        }
+
+        with patch.object(video_generator, '_create_background', wraps=video_generator._create_background) as mock_create_background, \
+             patch.object(video_generator, '_create_video_from_frame', side_effect=lambda frame, path, *args, **kwargs: open(path, "wb").close()):
+            for i, (artist, title) in enumerate([("ABBA", "Waterloo"), ("Queen", "Bohemian Rhapsody")]):
+                video_generator.create_end_video(
+                    artist, title, {**end_format, "title_text_transform": None, "artist_text_transform": None},
+                    os.path.join(temp_dir, f"end{i}"), os.path.join(temp_dir, f"end{i}.mov"), None, 5,
+                )
+
+        mock_create_background.assert_called_once()
+        assert os.path.isfile(os.path.join(temp_dir, "end1.png"))
+        assert os.path.isfile(os.path.join(temp_dir, "end1.mov"))
+        assert len([name for name in os.listdir(video_generator.render_cache_dir) if not name.startswith(".")]) == 1
+
+    def test_render_cache_skipped_when_ffmpeg_fails(self, basic_karaoke_gen, temp_dir):
+        """Test a failed video encode raises, removes the partial clip and stores nothing in the render cache."""
+        video_generator = basic_karaoke_gen.video_generator
+        video_generator.render_cache_dir = os.path.join(temp_dir, "render-cache")
+        video_generator.output_png = True
+        video_generator.output_jpg = False
+        format = {"font": None, "background_color": "#000000", "background_image": None, "title_region": None, "artist_region": None, "extra_text": None}
+        output_video_filepath = os.path.join(temp_dir, "output.mov")
+
+        def failing_ffmpeg(command, **kwargs):
+            open(output_video_filepath, "wb").close()
+            raise subprocess.CalledProcessError(1, command)
+
+        with patch('subprocess.run', side_effect=failing_ffmpeg), pytest.raises(Exception, match="ffmpeg exited with code 1"):
+            video_generator.create_video("", "Title", "Artist", format, os.path.join(temp_dir, "output"), output_video_filepath, duration=5)
+
+        assert not os.path.exists(output_video_filepath)
+        assert not os.path.isdir(video_generator.render_cache_dir) or os.listdir(video_generator.render_cache_dir) == []
+
+    def test_render_cache_key_includes_encoder_settings(self, basic_karaoke_gen):
+        """Test changing the still video encoder settings invalidates previously cached screens."""
+        video_generator = basic_karaoke_gen.video_generator
+        format = {"font": None, "background_color": "#000000", "background_image": None, "title_region": None, "artist_region": None}
+        cache_key = video_generator._get_render_cache_key("", "Title", "Artist", format, None, (3840, 2160), 5)
+
+        with patch.dict("karaoke_gen.video_generator.STILL_VIDEO_ENCODER_SETTINGS", {"preset": "veryfast"}):
+            assert video_generator._get_render_cache_key("", "Title", "Artist", format, None, (3840, 2160), 5) != cache_key
+
+    def test_render_cache_evicts_stale_entries(self, basic_karaoke_gen, temp_dir):
+        """Test storing a screen removes cache entries which haven't been used for longer than the maximum age."""
+        video_generator = basic_karaoke_gen.video_generator
+        video_generator.render_cache_dir = os.path.join(temp_dir, "render-cache")
+        video_generator.output_png = True
+        video_generator.output_jpg = False
+        stale_entry = os.path.join(video_generator.render_cache_dir, "stale")
+        recent_entry = os.path.join(video_generator.render_cache_dir, "recent")
+        os.makedirs(stale_entry)
+        os.makedirs(recent_entry)
+        stale_time = time.time() - RENDER_CACHE_MAX_AGE_SECONDS - 60
+        os.utime(stale_entry, (stale_time, stale_time))
+
+        output_image_filepath_noext = os.path.join(temp_dir, "output")
+        with open(f"{output_image_filepath_noext}.png", "wb") as f:
+            f.write(b"png data")
+        video_generator._store_in_render_cache("new", output_image_filepath_noext, None, 0)
+
+        assert sorted(os.listdir(video_generator.render_cache_dir)) == ["new", "recent"]
@@ -0,0 +1,114 @@
+import os
+import pytest
+from unittest.mock import MagicMock
+from karaoke_gen.youtube_channel_index import YouTubeChannelIndex
+
+CHANNEL_ID = "UC_test_channel_id"
+
+
+@pytest.fixture
+def mock_logger():
+    return MagicMock()
+
+
+def playlist_item(video_id, title):
+    return {"snippet": {"title": title, "resourceId": {"kind": "youtube#video", "videoId": video_id}}}
+
+
+def create_youtube_service(pages):
+    """Return a mocked YouTube service whose uploads playlist returns pages, a list of lists of (video_id, title)."""
+    youtube = MagicMock()
+    youtube.channels.return_value.list.return_value.execute.return_value = {
+        "items": [{"id": CHANNEL_ID, "contentDetails": {"relatedPlaylists": {"uploads": "UU_test_uploads"}}}]
+    }
+    set_playlist_pages(youtube, pages)
+    return youtube
+
+
+def set_playlist_pages(youtube, pages):
+    responses = []
+    for i, page in enumerate(pages):
+        response = {"items": [playlist_item(video_id, title) for video_id, title in page]}
+        if i < len(pages) - 1:
+            response["nextPageToken"] = f"page{i + 1}"
+        responses.append(response)
+    youtube.playlistItems.return_value.list.return_value.execute.side_effect = responses
+    youtube.playlistItems.return_value.list.reset_mock()
+
+
+class TestYouTubeChannelIndex:
+    def test_first_sync_pages_through_uploads(self, tmp_path, mock_logger):
+        """Test the first sync reads every page of the uploads playlist and the index is saved for later runs."""
+        youtube = create_youtube_service([[("v3", "Three"), ("v2", "Two")], [("v1", "One")]])
+        index = YouTubeChannelIndex(str(tmp_path), mock_logger)
+
+        index.sync(youtube, CHANNEL_ID)
+
+        assert sorted(index.get_videos(CHANNEL_ID)) == [("v1", "One"), ("v2", "Two"), ("v3", "Three")]
+        youtube.channels.return_value.list.assert_called_once_with(part="contentDetails", id=CHANNEL_ID)
+        assert youtube.playlistItems.return_value.list.call_count == 2
+        youtube.playlistItems.return_value.list.assert_called_with(part="snippet", playlistId="UU_test_uploads", maxResults=50, pageToken="page1")
+        assert os.path.isfile(os.path.join(tmp_path, f"youtube_channel_{CHANNEL_ID}.json"))
+        assert sorted(YouTubeChannelIndex(str(tmp_path), mock_logger).get_videos(CHANNEL_ID)) == sorted(index.get_videos(CHANNEL_ID))
+
+    def test_later_sync_stops_at_last_synced_upload(self, tmp_path, mock_logger):
+        """Test a later run only reads uploads newer than the last sync, without looking up the uploads playlist again."""
+        youtube = create_youtube_service([[("v2", "Two"), ("v1", "One")]])
+        YouTubeChannelIndex(str(tmp_path), mock_logger).sync(youtube, CHANNEL_ID)
+
+        youtube = create_youtube_service([[("v4", "Four"), ("v3", "Three"), ("v2", "Two")], [("v1", "One")]])
+        index = YouTubeChannelIndex(str(tmp_path), mock_logger)
+        index.sync(youtube, CHANNEL_ID)
+
+        youtube.channels.return_value.list.assert_not_called()
+        youtube.playlistItems.return_value.list.assert_called_once()
+        assert sorted(index.get_videos(CHANNEL_ID)) == [("v1", "One"), ("v2", "Two"), ("v3", "Three"), ("v4", "Four")]
+
+        # Nothing new since the last sync
+        set_playlist_pages(youtube, [[("v4", "Four"), ("v3", "Three")]])
+        index.sync(youtube, CHANNEL_ID)
+        assert len(index.get_videos(CHANNEL_ID)) == 4
+
+    def test_add_and_remove_video(self, tmp_path, mock_logger):
+        """Test our own uploads and deletions are recorded, and an added upload doesn't stop the next sync early."""
+        youtube = create_youtube_service([[("v1", "One")]])
+        index = YouTubeChannelIndex(str(tmp_path), mock_logger)
+        index.sync(youtube, CHANNEL_ID)
+
+        index.add_video(CHANNEL_ID, "v3", "Three")
+        index.remove_video(CHANNEL_ID, "v1")
+        assert YouTubeChannelIndex(str(tmp_path), mock_logger).get_videos(CHANNEL_ID) == [("v3", "Three")]
+
+        set_playlist_pages(youtube, [[("v3", "Three"), ("v2", "Two"), ("v1", "One")]])
+        index.sync(youtube, CHANNEL_ID)
+        assert sorted(index.get_videos(CHANNEL_ID)) == [("v2", "Two"), ("v3", "Three")]
+
+    def test_refresh_rebuilds_index(self, tmp_path, mock_logger):
+        """Test refresh=True ignores the saved index, dropping videos deleted on YouTube, and corrupt indexes are rebuilt."""
+        YouTubeChannelIndex(str(tmp_path), mock_logger).sync(create_youtube_service([[("v2", "Two"), ("v1", "One")]]), CHANNEL_ID)
+
+        index = YouTubeChannelIndex(str(tmp_path), mock_logger, refresh=True)
+        index.sync(create_youtube_service([[("v2", "Two")]]), CHANNEL_ID)
+        assert index.get_videos(CHANNEL_ID) == [("v2", "Two")]
+
+        with open(os.path.join(tmp_path, f"youtube_channel_{CHANNEL_ID}.json"), "w") as f:
+            f.write("{not json")
+        index = YouTubeChannelIndex(str(tmp_path), mock_logger)
+        assert index.get_videos(CHANNEL_ID) == []
+        mock_logger.warning.assert_called_once()
+
+    def test_concurrent_instances_keep_each_others_changes(self, tmp_path, mock_logger):
+        """Test instances sharing an index directory (e.g. server jobs) re-read it, so a removal by one isn't undone by another."""
+        youtube = create_youtube_service([[("v2", "Two"), ("v1", "One")]])
+        first = YouTubeChannelIndex(str(tmp_path), mock_logger)
+        second = YouTubeChannelIndex(str(tmp_path), mock_logger)
+        first.sync(youtube, CHANNEL_ID)
+        assert len(second.get_videos(CHANNEL_ID)) == 2
+
+        first.remove_video(CHANNEL_ID, "v1")
+        second.add_video(CHANNEL_ID, "v3", "Three")
+        set_playlist_pages(youtube, [[("v3", "Three"), ("v2", "Two")]])
+        second.sync(youtube, CHANNEL_ID)
+
+        assert sorted(first.get_videos(CHANNEL_ID)) == [("v2", "Two"), ("v3", "Three")]
+        assert os.path.isfile(os.path.join(tmp_path, f"youtube_channel_{CHANNEL_ID}.json.lock"))